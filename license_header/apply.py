@@ -19,14 +19,24 @@ and atomic file writes. Supports multi-language comment wrapping and
 header transition/upgrade functionality.
 """
 
+import codecs
+import itertools
 import logging
 import os
 import re
-import tempfile
+import time
 from dataclasses import dataclass, field
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Optional, Tuple
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
 
+from .cache import (
+    check_cache_key,
+    check_cache_path,
+    load_check_cache,
+    merge_check_cache_entries,
+    save_check_cache,
+)
 from .config import Config, get_header_content
 from .languages import (
     CommentStyle,
@@ -38,12 +48,19 @@ from .languages import (
     PYTHON_STYLE,
     C_STYLE,
 )
-from .scanner import scan_repository
+from .scanner import ScanResult, iter_eligible_files
 from .utils import (
+    BOM_UTF8,
+    atomic_write_bytes,
+    decode_prefix_with_encoding,
+    detect_bom_in_bytes,
+    encode_file_content,
     extract_shebang,
     has_shebang,
-    read_file_with_encoding,
-    write_file_with_encoding,
+    parallel_map,
+    read_file_bytes,
+    read_file_prefix,
+    release_page_cache,
 )
 
 logger = logging.getLogger(__name__)
@@ -56,8 +73,25 @@ FALLBACK_STYLES = {
     'none': None,
 }
 
+# Line comment prefix with at most one following space, as stripped from header bodies
+_LINE_COMMENT_PREFIX_RE = re.compile(r'(?://|#|--|;) ?')
+
+# Locates the start of the first line that is neither blank nor a comment,
+# using the same line boundaries as str.splitlines()
+_LINE_BREAKS = r'\n\r\v\f\x1c\x1d\x1e\x85\u2028\u2029'
+_HEADER_BOUNDARY_RE = re.compile(
+    rf'(?:^|(?<=[{_LINE_BREAKS}]))[^\S{_LINE_BREAKS}]*'
+    r'(?!#|//|/\*|\*|--|;|<!--)\S'
+)
+
+# Minimum number of leading bytes read when checking compliance from a prefix
+QUICK_CHECK_BYTES = 4096
+
+# Largest leading comment block whose normalized form is memoized
+BODY_CACHE_MAX_CHARS = 16 * 1024
+
 
-@dataclass
+@dataclass(slots=True)
 class ApplyResult:
     """Result of applying headers to files."""
     
@@ -65,6 +99,8 @@ class ApplyResult:
     already_compliant: List[Path] = field(default_factory=list)
     skipped_files: List[Path] = field(default_factory=list)
     failed_files: List[Path] = field(default_factory=list)
+    # (st_mtime_ns, st_size) of each modified file as written, before any later edit
+    written_stats: Dict[Path, Tuple[int, int]] = field(default_factory=dict)
     
     def total_processed(self) -> int:
         """Return total number of files processed."""
@@ -92,6 +128,24 @@ def normalize_header(header: str) -> str:
     return header.rstrip() + '\n'
 
 
+@lru_cache(maxsize=64)
+def _normalized_header_forms(header: str) -> Tuple[str, bytes]:
+    """
+    Normalize a header once and keep its text and UTF-8 forms.
+    
+    A run compares every file against a handful of distinct headers, so the
+    per-file matchers look these up instead of rebuilding them each call.
+    
+    Args:
+        header: Header text to normalize
+        
+    Returns:
+        Tuple of (normalized header text, its UTF-8 encoding)
+    """
+    normalized = normalize_header(header)
+    return normalized, normalized.encode('utf-8')
+
+
 def detect_newline_style(content: str) -> str:
     """
     Detect the predominant newline style in content.
@@ -102,6 +156,11 @@ def detect_newline_style(content: str) -> str:
     Returns:
         '\r\n' for CRLF, '\n' for LF
     """
+    # Fast path: without any CR there can be no CRLF, so a single memchr-style
+    # scan settles the common LF-only case without counting
+    if '\r' not in content:
+        return '\n'
+    
     # Count occurrences of each newline style
     crlf_count = content.count('\r\n')
     lf_count = content.count('\n') - crlf_count  # Subtract CRLF to get pure LF count
@@ -183,6 +242,55 @@ def prepare_header_for_file(
     return wrapped
 
 
+def build_header_lookup(
+    raw_header: str,
+    wrap_comments: bool = True,
+    fallback_style_name: str = 'hash',
+    use_block_comments: bool = False
+) -> Callable[[Path], str]:
+    """
+    Build a memoized per-file header resolver.
+    
+    The prepared header depends only on the file extension once the run
+    settings are fixed, so each distinct extension is wrapped exactly once
+    and every other file is a dict lookup.
+    
+    Args:
+        raw_header: Raw header text without comment markers
+        wrap_comments: If True, wrap header with comments; if False, use as-is
+        fallback_style_name: Fallback comment style name ('hash', 'slash', 'none')
+        use_block_comments: If True, use block comments instead of line comments
+        
+    Returns:
+        Callable mapping a file path to its prepared header text
+    """
+    if not wrap_comments:
+        # Every file gets the raw header; no per-extension work at all
+        def raw_lookup(file_path: Path) -> str:
+            return raw_header
+        
+        return raw_lookup
+    
+    cache: Dict[str, str] = {}
+    
+    def lookup(file_path: Path) -> str:
+        # Comment style lookup is case-insensitive, so key on the lowercase suffix
+        extension = file_path.suffix.lower()
+        header = cache.get(extension)
+        if header is None:
+            header = prepare_header_for_file(
+                raw_header=raw_header,
+                file_path=file_path,
+                wrap_comments=wrap_comments,
+                fallback_style_name=fallback_style_name,
+                use_block_comments=use_block_comments
+            )
+            cache[extension] = header
+        return header
+    
+    return lookup
+
+
 def has_header(content: str, header: str) -> bool:
     """
     Check if content already has the header.
@@ -198,7 +306,7 @@ def has_header(content: str, header: str) -> bool:
         True if content has the header, False otherwise
     """
     # Normalize header for comparison (convert to LF-only)
-    normalized_header = normalize_header(header)
+    normalized_header = _normalized_header_forms(header)[0]
     
     # Extract shebang if present
     shebang, remaining = extract_shebang(content)
@@ -211,23 +319,159 @@ def has_header(content: str, header: str) -> bool:
     if normalized_remaining.startswith(normalized_header):
         return True
     
+    # Without leading whitespace there are no blank lines to skip
+    if not normalized_remaining[:1].isspace():
+        return False
+    
     # Also check with various whitespace variations around the header
-    # to handle cases where there might be extra blank lines
-    lines = normalized_remaining.split('\n')
+    # to handle cases where there might be extra blank lines. The first
+    # non-blank line starts just after the last newline preceding the first
+    # non-whitespace character; compare in place instead of split/rejoin.
+    first_text_idx = len(normalized_remaining) - len(normalized_remaining.lstrip())
+    line_start = normalized_remaining.rfind('\n', 0, first_text_idx) + 1
+    return normalized_remaining.startswith(normalized_header, line_start)
+
+
+def _prefix_decides_header(prefix: str, header: str) -> bool:
+    """
+    Return True if has_header gives the same answer on a prefix as on the file.
+    
+    has_header only looks at the text from the first non-blank line after
+    any shebang. Once the prefix holds that line start plus more than a
+    header's worth of characters, the rest of the file cannot change the
+    result.
     
-    # Skip leading empty lines
-    start_idx = 0
-    while start_idx < len(lines) and lines[start_idx].strip() == '':
-        start_idx += 1
+    Args:
+        prefix: Decoded leading part of the file
+        header: Header text to look for
+        
+    Returns:
+        True if the prefix is long enough to rule the header in or out
+    """
+    # A shebang cut off mid-line leaves nothing to inspect
+    shebang, remaining = extract_shebang(prefix)
+    remaining = remaining.replace('\r\n', '\n')
     
-    # Reconstruct content without leading whitespace
-    if start_idx < len(lines):
-        content_without_leading_ws = '\n'.join(lines[start_idx:])
-        # Use exact match with the full normalized header (including trailing newline)
-        if content_without_leading_ws.startswith(normalized_header):
-            return True
+    first_text_idx = len(remaining) - len(remaining.lstrip())
+    if first_text_idx == len(remaining):
+        return False
+    line_start = remaining.rfind('\n', 0, first_text_idx) + 1
     
-    return False
+    # Strictly longer, so a trailing '\r' cannot pair with a '\n' beyond it
+    return len(remaining) - line_start > len(_normalized_header_forms(header)[0])
+
+
+# Characters str.isspace() accepts within ASCII, for byte-level whitespace skips
+_ASCII_WHITESPACE = b' \t\n\r\x0b\x0c\x1c\x1d\x1e\x1f'
+_ASCII_WHITESPACE_RUN_RE = re.compile(rb'[ \t\n\r\x0b\x0c\x1c-\x1f]*')
+
+
+def has_header_bytes(content: bytes, header: str) -> bool:
+    """
+    Check if pure-ASCII content already has the header, without decoding it.
+    
+    Byte-level equivalent of has_header: the same shebang, CRLF and
+    leading blank line rules apply, using offsets into the buffer instead
+    of sliced copies where possible.
+    
+    Args:
+        content: File content as ASCII bytes
+        header: Header text to look for
+        
+    Returns:
+        True if content has the header, False otherwise
+    """
+    normalized_header = _normalized_header_forms(header)[1]
+    
+    # Skip shebang if present
+    start = 0
+    if content.startswith(b'#!'):
+        start = content.find(b'\n') + 1
+        if not start:
+            return False
+    
+    # Normalize content to LF-only only when it has carriage returns
+    if b'\r' in content:
+        content = content[start:].replace(b'\r\n', b'\n')
+        start = 0
+    
+    if content.startswith(normalized_header, start):
+        return True
+    
+    # Without leading whitespace there are no blank lines to skip
+    if start >= len(content) or content[start] not in _ASCII_WHITESPACE:
+        return False
+    
+    # Compare from the start of the first non-blank line
+    first_text_idx = _ASCII_WHITESPACE_RUN_RE.match(content, start).end()
+    newline_idx = content.rfind(b'\n', start, first_text_idx)
+    line_start = newline_idx + 1 if newline_idx != -1 else start
+    return content.startswith(normalized_header, line_start)
+
+
+@lru_cache(maxsize=64)
+def _header_byte_variants(header: str) -> Tuple[bytes, ...]:
+    """
+    Encode the byte sequences a compliant UTF-8 file can start with.
+    
+    Covers LF and CRLF line endings, each with and without a UTF-8 BOM.
+    Headers that could be confused with a shebang or BOM, or that carry
+    their own carriage returns, get no variants so callers fall back to
+    the decoded comparison in has_header.
+    
+    Args:
+        header: Header text to encode
+        
+    Returns:
+        Tuple of candidate byte prefixes (possibly empty)
+    """
+    normalized = normalize_header(header)
+    if '\r' in normalized or normalized.startswith(('#!', '\ufeff')):
+        return ()
+    
+    lf_bytes = normalized.encode('utf-8')
+    crlf_bytes = normalized.replace('\n', '\r\n').encode('utf-8')
+    return (lf_bytes, crlf_bytes, BOM_UTF8 + lf_bytes, BOM_UTF8 + crlf_bytes)
+
+
+def _quick_compliance_check(file_path: Path, header: str) -> Optional[bool]:
+    """
+    Decide compliance from the first few KiB of a file when possible.
+    
+    Reads a bounded prefix once and first compares it against the exact
+    header bytes; failing that, decodes the prefix strictly and runs
+    has_header on it, which covers shebangs, leading blank lines and BOM
+    encodings. Only positive answers are trusted, since a header that does
+    not fit in the prefix cannot be ruled out.
+    
+    Args:
+        file_path: Path to file to check
+        header: Header text to look for
+        
+    Returns:
+        True if the file already has the header, None if a full read is needed
+        
+    Raises:
+        OSError: If file cannot be read
+    """
+    nbytes = max(len(header) * 2 + 256, QUICK_CHECK_BYTES)
+    prefix = read_file_prefix(file_path, nbytes)
+    
+    variants = _header_byte_variants(header)
+    if variants and prefix.startswith(variants):
+        return True
+    
+    bom, encoding = detect_bom_in_bytes(prefix)
+    
+    try:
+        # final=False tolerates a multi-byte sequence cut at the prefix end
+        text = codecs.getincrementaldecoder(encoding)().decode(prefix, final=False)
+    except UnicodeDecodeError:
+        return None
+    
+    if has_header(text, header):
+        return True
+    return None
 
 
 def insert_header(content: str, header: str) -> str:
@@ -269,12 +513,106 @@ def insert_header(content: str, header: str) -> str:
     return new_content
 
 
+@lru_cache(maxsize=16)
+def _resolved_root_prefix(scan_root: Path) -> str:
+    """
+    Resolve a scan root once and return it as a separator-terminated prefix.
+    
+    Args:
+        scan_root: Root path used for scanning
+        
+    Returns:
+        Resolved root path ending in os.sep
+    """
+    root = str(scan_root.resolve())
+    return root if root.endswith(os.sep) else root + os.sep
+
+
+def _relative_to_scan_root(file_path: Path, scan_root: Path) -> Optional[str]:
+    """
+    Compute a file's path relative to the scan root.
+    
+    Files found under the resolved root are handled with string operations
+    alone; only paths that leave it (for example through a symlinked root)
+    fall back to resolving the file path.
+    
+    Args:
+        file_path: Path to the file
+        scan_root: Root path used for scanning
+        
+    Returns:
+        Relative path string, or None if the file is outside the scan root
+    """
+    # Key the cache on the absolute root so a changed working directory
+    # cannot reuse a stale resolution
+    prefix = _resolved_root_prefix(Path(os.path.abspath(scan_root)))
+    path = os.path.abspath(file_path)
+    if path.startswith(prefix):
+        return path[len(prefix):]
+    
+    try:
+        return str(file_path.resolve().relative_to(scan_root.resolve()))
+    except ValueError:
+        return None
+
+
+@lru_cache(maxsize=64)
+def _encoded_header(header: str, newline_style: str) -> bytes:
+    """
+    Encode a header as UTF-8 with the given newline style, once per pair.
+    
+    Args:
+        header: Header text to encode
+        newline_style: Newline style to use ('\r\n' or '\n')
+        
+    Returns:
+        Normalized header bytes
+    """
+    return convert_newlines(normalize_header(header), newline_style).encode('utf-8')
+
+
+def insert_header_bytes(content: bytes, header: str) -> bytes:
+    """
+    Insert header into UTF-8 file content without decoding it.
+    
+    Byte-level equivalent of insert_header for UTF-8 content (BOM already
+    removed): the shebang and newline style are located on the raw bytes,
+    so the rest of the file is copied rather than transcoded.
+    
+    Args:
+        content: Original file content as UTF-8 bytes
+        header: Header text to insert
+        
+    Returns:
+        New file content with header inserted
+    """
+    # Detect the newline style of the content (same rules as detect_newline_style)
+    newline_style = '\n'
+    if b'\r' in content:
+        crlf_count = content.count(b'\r\n')
+        if crlf_count > content.count(b'\n') - crlf_count:
+            newline_style = '\r\n'
+    
+    header_bytes = _encoded_header(header, newline_style)
+    
+    if not content.startswith(b'#!'):
+        return header_bytes + content
+    
+    # Insert header after shebang, ensuring the shebang ends with a newline
+    shebang_end = content.find(b'\n') + 1 or len(content)
+    shebang = content[:shebang_end]
+    if not shebang.endswith(b'\n'):
+        shebang += newline_style.encode('ascii')
+    return shebang + header_bytes + content[shebang_end:]
+
+
 def apply_header_to_file(
     file_path: Path,
     header: str,
     dry_run: bool = False,
     output_dir: Optional[Path] = None,
-    scan_root: Optional[Path] = None
+    scan_root: Optional[Path] = None,
+    drop_cache: bool = False
 ) -> bool:
     """
     Apply header to a single file.
@@ -287,6 +625,7 @@ def apply_header_to_file(
         dry_run: If True, don't actually modify files
         output_dir: If provided, write to this directory instead of in-place
         scan_root: Root path used for scanning (needed to preserve relative paths in output_dir)
+        drop_cache: If True, release the written file from the OS page cache
         
     Returns:
         True if file was modified, False if already compliant or skipped
@@ -295,31 +634,93 @@ def apply_header_to_file(
         OSError: If file cannot be read or written
         PermissionError: If file cannot be accessed
     """
-    try:
-        # Read file with encoding detection
-        content, bom, encoding = read_file_with_encoding(file_path)
+    was_modified, _ = _apply_header_with_stat(
+        file_path, header, dry_run, output_dir, scan_root, drop_cache
+    )
+    return was_modified
+
+
+def _apply_header_with_stat(
+    file_path: Path,
+    header: str,
+    dry_run: bool = False,
+    output_dir: Optional[Path] = None,
+    scan_root: Optional[Path] = None,
+    drop_cache: bool = False
+) -> Tuple[bool, Optional[Tuple[int, int]]]:
+    """
+    Apply header to a single file, also reporting what was written.
+    
+    Same as apply_header_to_file, which it implements.
+    
+    Args:
+        file_path: Path to file to modify
+        header: Header text to insert
+        dry_run: If True, don't actually modify files
+        output_dir: If provided, write to this directory instead of in-place
+        scan_root: Root path used for scanning (needed to preserve relative paths in output_dir)
+        drop_cache: If True, release the written file from the OS page cache
         
-        # Check if header already present
-        if has_header(content, header):
+    Returns:
+        Tuple of (True if file was modified, (st_mtime_ns, st_size) of the
+        content written in place, or None if nothing was written in place)
+        
+    Raises:
+        OSError: If file cannot be read or written
+        PermissionError: If file cannot be accessed
+    """
+    try:
+        # Already-compliant files can usually be settled from a short prefix
+        if _quick_compliance_check(file_path, header):
             logger.debug(f"File already has header: {file_path}")
-            return False
+            return False, None
+        
+        # Read file with encoding detection, taking the mode from the open
+        # descriptor so permissions can be preserved without a path stat
+        raw, file_mode = read_file_bytes(file_path)
+        bom, encoding = detect_bom_in_bytes(raw)
         
-        # Insert header
-        new_content = insert_header(content, header)
+        if encoding in ('utf-8', 'utf-8-sig'):
+            # The new content is spliced together from the original bytes.
+            # Pure-ASCII files (the common case) are never decoded; others are
+            # decoded only to validate them and look for the header.
+            body = raw[len(bom):] if bom else raw
+            if body.isascii():
+                already_present = has_header_bytes(body, header)
+            else:
+                already_present = has_header(body.decode('utf-8'), header)
+            
+            # Check if header already present
+            if already_present:
+                logger.debug(f"File already has header: {file_path}")
+                return False, None
+            
+            # Insert header
+            new_data = (bom or b'') + insert_header_bytes(body, header)
+        else:
+            content = raw.decode(encoding)
+            
+            # Check if header already present
+            if has_header(content, header):
+                logger.debug(f"File already has header: {file_path}")
+                return False, None
+            
+            # Insert header
+            new_data = encode_file_content(insert_header(content, header), bom, encoding)
         
         if dry_run:
-            logger.info(f"[DRY RUN] Would add header to: {file_path}")
-            return True
+            logger.debug(f"[DRY RUN] Would add header to: {file_path}")
+            return True, None
         
         # Determine output path
         if output_dir:
             # Write to output directory, preserving relative directory structure
             if scan_root:
-                try:
-                    # Preserve relative path from scan root
-                    rel_path = file_path.resolve().relative_to(scan_root.resolve())
+                # Preserve relative path from scan root
+                rel_path = _relative_to_scan_root(file_path, scan_root)
+                if rel_path is not None:
                     output_path = output_dir / rel_path
-                except ValueError:
+                else:
                     # File is not relative to scan root, use basename as fallback
                     output_path = output_dir / file_path.name
             else:
@@ -329,43 +730,16 @@ def apply_header_to_file(
         else:
             output_path = file_path
         
-        # Write atomically using temporary file
-        # Create temp file in same directory as target to ensure same filesystem
-        temp_fd, temp_path = tempfile.mkstemp(
-            dir=output_path.parent,
-            prefix=f'.{output_path.name}.',
-            suffix='.tmp'
-        )
+        # Write atomically, preserving file permissions if modifying in-place
+        written = atomic_write_bytes(output_path, new_data, None if output_dir else file_mode)
         
-        try:
-            # Close the fd, we'll use our own write function
-            os.close(temp_fd)
-            
-            # Write new content to temp file
-            write_file_with_encoding(Path(temp_path), new_content, bom, encoding)
-            
-            # Preserve file permissions if modifying in-place
-            if not output_dir:
-                try:
-                    stat_info = os.stat(file_path)
-                    os.chmod(temp_path, stat_info.st_mode)
-                except (OSError, AttributeError):
-                    # If we can't preserve permissions, continue anyway
-                    pass
-            
-            # Atomic rename
-            os.replace(temp_path, output_path)
-            
-            logger.info(f"Added header to: {file_path}")
-            return True
-            
-        except Exception as e:
-            # Clean up temp file on error
-            try:
-                os.unlink(temp_path)
-            except OSError:
-                pass
-            raise
+        if drop_cache:
+            release_page_cache(output_path)
+        
+        logger.debug(f"Added header to: {file_path}")
+        if output_dir:
+            return True, None
+        return True, (written.st_mtime_ns, written.st_size)
     
     except PermissionError as e:
         logger.error(f"Permission denied accessing {file_path}: {e}")
@@ -375,6 +749,58 @@ def apply_header_to_file(
         raise
 
 
+@dataclass(frozen=True, slots=True)
+class _ApplyOptions:
+    """Picklable per-run settings shared by every apply worker."""
+    
+    dry_run: bool
+    scan_root: Path
+    drop_cache: bool = False
+
+
+def _process_one(
+    file_path: Path,
+    header: str,
+    options: _ApplyOptions,
+    unchanged: bool = False
+) -> Tuple[str, Optional[str], Optional[Tuple[int, int]]]:
+    """
+    Apply the header to one file and report the outcome.
+    
+    Top-level so it can be pickled into a process pool. Errors are returned
+    rather than raised so the parent process can log and tally them.
+    
+    Args:
+        file_path: Path to file to process
+        header: Header text prepared for this file
+        options: Shared run settings
+        unchanged: True if the file matches a cached compliant entry
+        
+    Returns:
+        Tuple of (status, error message, written stat) where status is
+        'modified', 'compliant', or 'failed' and written stat is the
+        (st_mtime_ns, st_size) of a file written in place
+    """
+    # Cached files already had the header under the same settings and have
+    # not changed since; no need to open them
+    if unchanged:
+        return ('compliant', None, None)
+    
+    try:
+        was_modified, written = _apply_header_with_stat(
+            file_path=file_path,
+            header=header,
+            dry_run=options.dry_run,
+            output_dir=None,  # Always modify in-place
+            scan_root=options.scan_root,
+            drop_cache=options.drop_cache
+        )
+        return ('modified' if was_modified else 'compliant', None, written)
+    
+    except (PermissionError, OSError, IOError, UnicodeDecodeError) as e:
+        return ('failed', str(e), None)
+
+
 def apply_headers(config: Config) -> ApplyResult:
     """
     Apply headers to all eligible files in the repository.
@@ -398,59 +824,93 @@ def apply_headers(config: Config) -> ApplyResult:
     if not scan_path.is_absolute():
         scan_path = repo_root / scan_path
     
-    # Scan repository for eligible files
+    # Log comment wrapping configuration
+    if config.wrap_comments:
+        logger.info(f"Comment wrapping enabled (fallback: {config.fallback_comment_style}, "
+                    f"block: {config.use_block_comments})")
+    else:
+        logger.info("Comment wrapping disabled - using header as-is")
+    
+    # Prepare headers in the parent, once per extension, so workers only do file I/O
+    header_for = build_header_lookup(
+        raw_header,
+        wrap_comments=config.wrap_comments,
+        fallback_style_name=config.fallback_comment_style,
+        use_block_comments=config.use_block_comments
+    )
+    
+    # Files an earlier run found compliant are skipped while unchanged; the
+    # cache is shared with check, so a later check skips what apply wrote
+    known_compliant = None
+    if config.cache:
+        started_ns = time.time_ns()
+        cache_file = check_cache_path(repo_root)
+        cache_key = check_cache_key(config, raw_header)
+        known_compliant = load_check_cache(cache_file, cache_key)
+    
+    # Stream eligible files from the walk straight into the workers, so files
+    # are processed while the rest of the tree is still being scanned
     logger.info(f"Scanning {scan_path} for eligible files...")
-    scan_result = scan_repository(
+    scan_result = ScanResult()
+    eligible = iter_eligible_files(
         root_path=scan_path,
         include_extensions=config.include_extensions,
         exclude_patterns=config.exclude_paths,
         repo_root=repo_root,
+        result=scan_result,
+        known_text_files=known_compliant,
     )
+    files, header_files, cached_files = itertools.tee(eligible, 3)
     
-    logger.info(f"Found {len(scan_result.eligible_files)} eligible files")
-    
-    # Log comment wrapping configuration
-    if config.wrap_comments:
-        logger.info(f"Comment wrapping enabled (fallback: {config.fallback_comment_style}, "
-                    f"block: {config.use_block_comments})")
-    else:
-        logger.info("Comment wrapping disabled - using header as-is")
+    options = _ApplyOptions(
+        dry_run=config.dry_run,
+        scan_root=scan_path,
+        drop_cache=config.release_page_cache
+    )
     
     # Apply header to each eligible file (always in-place, never copying to output dir)
-    for file_path in scan_result.eligible_files:
-        try:
-            # Prepare header for this specific file (wrap with comments if enabled)
-            header = prepare_header_for_file(
-                raw_header=raw_header,
-                file_path=file_path,
-                wrap_comments=config.wrap_comments,
-                fallback_style_name=config.fallback_comment_style,
-                use_block_comments=config.use_block_comments
-            )
-            
-            was_modified = apply_header_to_file(
-                file_path=file_path,
-                header=header,
-                dry_run=config.dry_run,
-                output_dir=None,  # Always modify in-place
-                scan_root=scan_path
-            )
-            
-            if was_modified:
-                result.modified_files.append(file_path)
-            else:
-                result.already_compliant.append(file_path)
-                
-        except (PermissionError, OSError, IOError, UnicodeDecodeError) as e:
-            logger.error(f"Failed to process {file_path}: {e}")
+    # Large runs are spread across a pool; map() keeps results in scan order
+    outcomes = parallel_map(
+        _process_one,
+        config.parallel,
+        files,
+        map(header_for, header_files),
+        itertools.repeat(options),
+        map(scan_result.unchanged_files.__contains__, cached_files)
+    )
+    
+    # The walk recorded every file it yielded, in the order processed
+    eligible_files = scan_result.eligible_files
+    logger.info(f"Found {len(eligible_files)} eligible files")
+    
+    for file_path, (status, error_msg, written) in zip(eligible_files, outcomes):
+        if status == 'modified':
+            result.modified_files.append(file_path)
+            if written is not None:
+                result.written_stats[file_path] = written
+        elif status == 'compliant':
+            result.already_compliant.append(file_path)
+        else:
+            logger.error(f"Failed to process {file_path}: {error_msg}")
             result.failed_files.append(file_path)
     
+    # One summary record instead of a line per file; per-file detail is at debug level
+    prefix = "[DRY RUN] Would add" if config.dry_run else "Added"
+    logger.info(f"{prefix} header to {len(result.modified_files)} files")
+    
+    # A dry run reads the cache but leaves it as it was
+    if config.cache and not config.dry_run:
+        entries = merge_check_cache_entries(
+            known_compliant,
+            scan_result,
+            result.already_compliant,
+            started_ns,
+            written_stats=result.written_stats
+        )
+        save_check_cache(cache_file, cache_key, entries)
+    
     # Track skipped files from scan
-    result.skipped_files.extend(scan_result.skipped_binary)
-    result.skipped_files.extend(scan_result.skipped_excluded)
-    result.skipped_files.extend(scan_result.skipped_symlink)
-    result.skipped_files.extend(scan_result.skipped_permission)
-    result.skipped_files.extend(scan_result.skipped_extension)
+    result.skipped_files = scan_result.skipped_files()
     
     return result
 
@@ -460,7 +920,7 @@ def apply_headers(config: Config) -> ApplyResult:
 # ============================================================
 
 
-@dataclass
+@dataclass(slots=True)
 class UpgradeResult:
     """Result of upgrading headers in files."""
     
@@ -482,27 +942,23 @@ class UpgradeResult:
         )
 
 
-def strip_comment_markers(text: str) -> str:
+def _iter_body_lines(text: str) -> Iterator[str]:
     """
-    Strip comment markers from header text to get raw body.
+    Yield the body of each header line with comment markers removed.
     
-    This is used to compare header content regardless of comment style.
-    Handles V1 headers (with embedded comment markers) and V2 headers.
+    Shared by strip_comment_markers and normalize_body_for_comparison so
+    both consume the source lines in a single pass.
     
     Args:
         text: Header text that may have comment markers
         
-    Returns:
-        Raw header text without comment markers
+    Yields:
+        Line content without comment markers (lines inside block comments
+        are yielded even when empty)
     """
-    if not text:
-        return ''
-    
-    lines = text.strip().splitlines()
-    result_lines = []
     in_block = False
     
-    for line in lines:
+    for line in text.strip().splitlines():
         stripped = line.strip()
         
         # Handle single-line block comments like `/* ... */`
@@ -511,7 +967,7 @@ def strip_comment_markers(text: str) -> str:
             if content.startswith('*'):
                 content = content[1:].strip()
             if content:
-                result_lines.append(content)
+                yield content
             continue
         
         # Handle start of a multi-line block comment
@@ -519,7 +975,7 @@ def strip_comment_markers(text: str) -> str:
             in_block = True
             content = stripped[2:].strip()
             if content:
-                result_lines.append(content)
+                yield content
             continue
         
         # Handle end of a multi-line block comment
@@ -529,33 +985,59 @@ def strip_comment_markers(text: str) -> str:
             if content.startswith('*'):
                 content = content[1:].strip()
             if content:
-                result_lines.append(content)
+                yield content
             continue
         
         if in_block:
             # Handle lines inside a multi-line block comment
-            content = stripped
-            if content.startswith('*'):
-                content = content[1:].lstrip()
-            result_lines.append(content)
+            if stripped.startswith('*'):
+                stripped = stripped[1:].lstrip()
+            yield stripped
             continue
         
-        # Handle line comment prefixes
-        # Check for common prefixes in order of length (longer first to avoid partial matches)
-        # We check both with and without trailing space variants
-        prefixes = ['// ', '# ', '-- ', '; ', '//', '#', '--', ';']
-        found_prefix = False
-        for prefix in prefixes:
-            if stripped.startswith(prefix):
-                rest = stripped[len(prefix):]
-                result_lines.append(rest)
-                found_prefix = True
-                break
+        # Handle line comment prefixes (one optional space after the marker is
+        # part of the prefix)
+        match = _LINE_COMMENT_PREFIX_RE.match(stripped)
+        if match:
+            yield stripped[match.end():]
+        else:
+            yield stripped
+
+
+def strip_comment_markers(text: str) -> str:
+    """
+    Strip comment markers from header text to get raw body.
+    
+    This is used to compare header content regardless of comment style.
+    Handles V1 headers (with embedded comment markers) and V2 headers.
+    
+    Args:
+        text: Header text that may have comment markers
         
-        if not found_prefix:
-            result_lines.append(stripped)
+    Returns:
+        Raw header text without comment markers
+    """
+    if not text:
+        return ''
     
-    return '\n'.join(result_lines).strip() + '\n' if result_lines else ''
+    result_lines = list(_iter_body_lines(text))
+    if not result_lines:
+        return ''
+    
+    # Trim blank lines at either end by index instead of stripping the
+    # joined text; non-empty lines already end in a non-space character
+    first, last = 0, len(result_lines)
+    while first < last and not result_lines[first]:
+        first += 1
+    while last > first and not result_lines[last - 1]:
+        last -= 1
+    if first == last:
+        return '\n'
+    
+    body = result_lines[first:last]
+    body[0] = body[0].lstrip()
+    body.append('')
+    return '\n'.join(body)
 
 
 def normalize_body_for_comparison(text: str) -> str:
@@ -563,7 +1045,8 @@ def normalize_body_for_comparison(text: str) -> str:
     Normalize header body text for comparison.
     
     Strips comment markers, normalizes whitespace, and lowercases for
-    fuzzy matching during header detection.
+    fuzzy matching during header detection. Runs as one pass over the
+    source lines rather than materializing the stripped body first.
     
     Args:
         text: Header text to normalize
@@ -571,17 +1054,31 @@ def normalize_body_for_comparison(text: str) -> str:
     Returns:
         Normalized text for comparison
     """
-    # Strip comment markers first
-    stripped = strip_comment_markers(text)
-    
-    # Normalize whitespace, remove empty lines, lowercase in single pass
+    # Strip markers, collapse whitespace, drop empty lines, and lowercase per line
     result_lines = []
-    for line in stripped.splitlines():
+    for line in _iter_body_lines(text):
         normalized = ' '.join(line.split())
         if normalized:
             result_lines.append(normalized.lower())
     
-    return '\n'.join(result_lines).strip()
+    return '\n'.join(result_lines)
+
+
+@lru_cache(maxsize=256)
+def _normalized_body_cached(text: str) -> str:
+    """
+    Cached normalize_body_for_comparison.
+    
+    Used for the configured header and for the comment blocks found at the
+    top of files, which in a consistently licensed tree repeat verbatim.
+    
+    Args:
+        text: Header text to normalize
+        
+    Returns:
+        Normalized text for comparison
+    """
+    return normalize_body_for_comparison(text)
 
 
 def detect_header_in_content(
@@ -608,8 +1105,9 @@ def detect_header_in_content(
     if not content or not header_text:
         return (False, -1, -1)
     
-    # Normalize header for comparison
-    header_body = normalize_body_for_comparison(header_text)
+    # Normalize header for comparison (cached; the same header is checked
+    # against every file)
+    header_body = _normalized_body_cached(header_text)
     
     # Extract shebang if present
     shebang, remaining = extract_shebang(content)
@@ -617,45 +1115,30 @@ def detect_header_in_content(
     
     # Try to find where the header ends
     # Look for the first significant code line (not comment, not empty)
-    lines = remaining.splitlines(keepends=True)
-    header_end_idx = 0
-    potential_header_lines = []
-    
-    for i, line in enumerate(lines):
-        stripped = line.strip()
-        
-        # Skip empty lines
-        if not stripped:
-            header_end_idx += len(line)
-            potential_header_lines.append(line)
-            continue
-        
-        # Check if this looks like a comment
-        is_comment = any(stripped.startswith(p) for p in ['#', '//', '/*', '*', '--', ';', '<!--'])
-        
-        if is_comment:
-            header_end_idx += len(line)
-            potential_header_lines.append(line)
-        else:
-            # First non-comment, non-empty line - end of potential header
-            break
-    
-    # Extract potential header block
-    potential_header = ''.join(potential_header_lines)
+    boundary = _HEADER_BOUNDARY_RE.search(remaining)
+    header_end_idx = boundary.start() if boundary else len(remaining)
+    potential_header = remaining[:header_end_idx]
     
     if not potential_header.strip():
         return (False, -1, -1)
     
-    # Normalize potential header
-    content_body = normalize_body_for_comparison(potential_header)
+    # Normalize potential header (only header-sized blocks go through the
+    # cache, so comment-only files don't pin large strings in memory)
+    if len(potential_header) <= BODY_CACHE_MAX_CHARS:
+        content_body = _normalized_body_cached(potential_header)
+    else:
+        content_body = normalize_body_for_comparison(potential_header)
     
     # Compare
     if header_body == content_body:
         return (True, start_offset, start_offset + header_end_idx)
     
     # Also try exact match (for V2 headers)
+    # Each normalized character comes from at most two raw ones, so only a
+    # bounded prefix needs its line endings normalized
     normalized_header = normalize_header(header_text)
-    normalized_remaining = remaining.replace('\r\n', '\n')
+    prefix_len = 2 * len(normalized_header) + 1
+    normalized_remaining = remaining[:prefix_len].replace('\r\n', '\n')
     
     if normalized_remaining.startswith(normalized_header):
         return (True, start_offset, start_offset + len(normalized_header))
@@ -692,6 +1175,42 @@ def remove_header_from_content(
     return (new_content, True)
 
 
+def _locate_source_header(
+    content: str,
+    from_header: str,
+    to_header: str,
+    file_extension: str = '.py'
+) -> Tuple[str, int, int]:
+    """
+    Decide whether content needs an upgrade and find the header to replace.
+    
+    Args:
+        content: File content
+        from_header: Source header to remove
+        to_header: Target header to insert
+        file_extension: File extension for comment style detection
+        
+    Returns:
+        Tuple of (status, start_pos, end_pos) where status is 'upgraded',
+        'already_target', or 'no_source', and the positions span the source
+        header when status is 'upgraded' (-1 otherwise)
+    """
+    # First check if file already has target header
+    if has_header(content, to_header):
+        return ('already_target', -1, -1)
+    
+    # Try to find the source header. Files without a leading comment block
+    # are rejected as soon as the boundary search reaches their first line.
+    found, start_pos, end_pos = detect_header_in_content(
+        content, from_header, file_extension
+    )
+    
+    if not found:
+        return ('no_source', -1, -1)
+    
+    return ('upgraded', start_pos, end_pos)
+
+
 def upgrade_header_in_content(
     content: str,
     from_header: str,
@@ -714,25 +1233,15 @@ def upgrade_header_in_content(
         - 'no_source': Source header not found
         - 'error:message': An error occurred
     """
-    # First check if file already has target header
-    if has_header(content, to_header):
-        return (content, 'already_target')
-    
-    # Try to find and remove source header
-    found, start_pos, end_pos = detect_header_in_content(
-        content, from_header, file_extension
+    status, start_pos, end_pos = _locate_source_header(
+        content, from_header, to_header, file_extension
     )
+    if status != 'upgraded':
+        return (content, status)
     
-    if not found:
-        return (content, 'no_source')
-    
-    # Remove source header
-    content_without_header, removed = remove_header_from_content(
-        content, from_header, file_extension
-    )
-    
-    if not removed:
-        return (content, 'error:Failed to remove source header')
+    # Remove source header using the span already found, rather than
+    # running detection a second time via remove_header_from_content
+    content_without_header = content[:start_pos] + content[end_pos:]
     
     # Insert target header
     new_content = insert_header(content_without_header, to_header)
@@ -740,11 +1249,53 @@ def upgrade_header_in_content(
     return (new_content, 'upgraded')
 
 
+# The boundary regex's negative lookahead reads at most this many
+# characters past a match ('<!--')
+_BOUNDARY_LOOKAHEAD_CHARS = 4
+
+
+def _upgrade_status_from_prefix(prefix: str, from_header: str, to_header: str) -> Optional[str]:
+    """
+    Decide an upgrade that leaves the file untouched from its leading text.
+    
+    has_header and detect_header_in_content only inspect the start of a
+    file: up to a header's length past the first non-blank line, and up to
+    the first line that is not a comment. When the prefix covers all of
+    that, the rest of the file cannot change their answers.
+    
+    Args:
+        prefix: Decoded leading part of the file
+        from_header: Source header to replace
+        to_header: Target header to insert
+        
+    Returns:
+        'already_target' or 'no_source' when the prefix decides it, None if
+        the whole file is needed
+    """
+    if not _prefix_decides_header(prefix, to_header):
+        return None
+    if has_header(prefix, to_header):
+        return 'already_target'
+    
+    # The comment block must end inside the prefix, with room for the
+    # boundary match's lookahead, and the exact-match window must fit
+    _, remaining = extract_shebang(prefix)
+    boundary = _HEADER_BOUNDARY_RE.search(remaining)
+    if boundary is None or boundary.end() + _BOUNDARY_LOOKAHEAD_CHARS > len(remaining):
+        return None
+    if len(remaining) <= 2 * len(normalize_header(from_header)) + 1:
+        return None
+    
+    found, _, _ = detect_header_in_content(prefix, from_header)
+    return None if found else 'no_source'
+
+
 def upgrade_header_in_file(
     file_path: Path,
     from_header: str,
     to_header: str,
-    dry_run: bool = False
+    dry_run: bool = False,
+    file_mode: Optional[int] = None
 ) -> str:
     """
     Upgrade header in a single file.
@@ -754,6 +1305,8 @@ def upgrade_header_in_file(
         from_header: Source header to replace
         to_header: Target header to insert
         dry_run: If True, don't actually modify the file
+        file_mode: st_mode recorded by the scanner; the file is stat'ed
+            for its permissions when None
         
     Returns:
         Status string: 'upgraded', 'already_target', 'no_source', or 'error:message'
@@ -762,11 +1315,35 @@ def upgrade_header_in_file(
         OSError: If file cannot be read or written
     """
     try:
-        # Read file
-        content, bom, encoding = read_file_with_encoding(file_path)
+        # Headers sit at the top of a file, so most files that need no
+        # rewrite are decided from a prefix without reading the rest
+        need = max(QUICK_CHECK_BYTES, 4 * (len(from_header) + len(to_header)))
+        data = read_file_prefix(file_path, need + 1)
+        
+        if len(data) <= need:
+            # The prefix is the whole file
+            raw = data
+        else:
+            try:
+                prefix, _, _ = decode_prefix_with_encoding(data, final=False)
+            except UnicodeDecodeError:
+                # Let the full read below report the decode error
+                prefix = None
+            
+            if prefix is not None:
+                status = _upgrade_status_from_prefix(prefix, from_header, to_header)
+                if status is not None:
+                    return status
+            
+            raw, open_mode = read_file_bytes(file_path)
+            if file_mode is None:
+                file_mode = open_mode
+        
+        bom, encoding = detect_bom_in_bytes(raw)
+        content = raw.decode(encoding)
         
         # Perform upgrade
-        new_content, status = upgrade_header_in_content(
+        status, start_pos, end_pos = _locate_source_header(
             content, from_header, to_header, file_path.suffix
         )
         
@@ -774,39 +1351,80 @@ def upgrade_header_in_file(
             return status
         
         if dry_run:
-            logger.info(f"[DRY RUN] Would upgrade header in: {file_path}")
+            logger.debug(f"[DRY RUN] Would upgrade header in: {file_path}")
             return 'upgraded'
         
-        # Write atomically using temporary file
-        temp_fd, temp_path = tempfile.mkstemp(
-            dir=file_path.parent,
-            prefix=f'.{file_path.name}.',
-            suffix='.tmp'
-        )
+        if encoding in ('utf-8', 'utf-8-sig'):
+            # Splice the original bytes around the source header, so only the
+            # header-sized head of the file is re-encoded and the target
+            # header's bytes come from the per-header cache
+            body = raw[len(bom):] if bom else raw
+            start_byte = len(content[:start_pos].encode('utf-8'))
+            end_byte = start_byte + len(content[start_pos:end_pos].encode('utf-8'))
+            new_data = (bom or b'') + insert_header_bytes(
+                body[:start_byte] + body[end_byte:], to_header
+            )
+        else:
+            new_content = insert_header(content[:start_pos] + content[end_pos:], to_header)
+            new_data = encode_file_content(new_content, bom, encoding)
         
-        try:
-            os.close(temp_fd)
-            write_file_with_encoding(Path(temp_path), new_content, bom, encoding)
-            
-            # Preserve permissions
-            try:
-                stat_info = os.stat(file_path)
-                os.chmod(temp_path, stat_info.st_mode)
-            except (OSError, AttributeError):
-                pass
-            
-            # Atomic rename
-            os.replace(temp_path, file_path)
-            logger.info(f"Upgraded header in: {file_path}")
-            return 'upgraded'
-            
-        except Exception as e:
+        # Preserve permissions
+        if file_mode is None:
             try:
-                os.unlink(temp_path)
+                file_mode = os.stat(file_path).st_mode
             except OSError:
-                pass
-            raise
-            
+                file_mode = None
+        
+        # Write atomically using temporary file
+        atomic_write_bytes(file_path, new_data, file_mode)
+        logger.debug(f"Upgraded header in: {file_path}")
+        return 'upgraded'
+    
     except (PermissionError, OSError, IOError, UnicodeDecodeError) as e:
         logger.error(f"Error upgrading {file_path}: {e}")
         return f'error:{e}'
+
+
+@dataclass(frozen=True, slots=True)
+class _UpgradeOptions:
+    """Picklable per-run settings shared by every upgrade worker."""
+    
+    from_header: str
+    dry_run: bool = False
+
+
+def _upgrade_one(
+    file_path: Path,
+    to_header: str,
+    options: _UpgradeOptions,
+    file_mode: Optional[int] = None
+) -> Tuple[str, Optional[str]]:
+    """
+    Upgrade the header in one file and report the outcome.
+    
+    Top-level so it can be pickled into a process pool. Unexpected errors
+    are returned rather than raised so the parent process can log and tally
+    them.
+    
+    Args:
+        file_path: Path to file to process
+        to_header: Target header prepared for this file
+        options: Shared run settings
+        file_mode: st_mode recorded by the scanner, if known
+        
+    Returns:
+        Tuple of (status, error message) where status is one of the
+        upgrade_header_in_file statuses, or 'failed' for unexpected errors
+    """
+    try:
+        status = upgrade_header_in_file(
+            file_path=file_path,
+            from_header=options.from_header,
+            to_header=to_header,
+            dry_run=options.dry_run,
+            file_mode=file_mode
+        )
+        return (status, None)
+    
+    except Exception as e:
+        return ('failed', str(e))
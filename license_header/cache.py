@@ -0,0 +1,201 @@
+# Copyright 2025 John Brosnihan
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Cache module for license-header tool.
+
+Persists the files found compliant (or given a header) by a run, keyed by
+modification time and size, so later runs with the same header settings
+can skip reading files that have not changed.
+"""
+
+import hashlib
+import json
+import logging
+from pathlib import Path
+from typing import Dict, Iterable, Mapping, Optional, Tuple
+
+from . import __version__
+from .config import Config
+from .scanner import ScanResult
+from .utils import atomic_write_bytes
+
+logger = logging.getLogger(__name__)
+
+# Cache location under the repository root; the format version is part of
+# the path so an incompatible layout is simply never read
+CACHE_DIR_NAME = '.license-header-cache'
+CACHE_FORMAT_VERSION = 'v1'
+CHECK_CACHE_FILE = 'check.ndjson'
+
+# Files modified this close to the start of a run are not cached: on
+# filesystems with coarse timestamps a later edit could keep the same mtime
+RACY_MTIME_WINDOW_NS = 2_000_000_000
+
+
+def check_cache_path(repo_root: Path) -> Path:
+    """
+    Return the location of the check cache for a repository.
+    
+    Args:
+        repo_root: Repository root path
+        
+    Returns:
+        Path of the versioned check cache file
+    """
+    return repo_root / CACHE_DIR_NAME / CACHE_FORMAT_VERSION / CHECK_CACHE_FILE
+
+
+def check_cache_key(config: Config, raw_header: str) -> str:
+    """
+    Build the key that ties cached results to the settings that produced them.
+    
+    Any change to the header text, comment wrapping settings, or tool
+    version yields a different key and invalidates the cache.
+    
+    Args:
+        config: Configuration used for the run
+        raw_header: Raw header text without comment markers
+        
+    Returns:
+        Hex digest identifying the header settings
+    """
+    settings = [
+        __version__,
+        raw_header,
+        config.wrap_comments,
+        config.fallback_comment_style,
+        config.use_block_comments,
+        sorted(config.language_comment_overrides.items()),
+    ]
+    return hashlib.sha256(json.dumps(settings).encode('utf-8')).hexdigest()
+
+
+def load_check_cache(cache_file: Path, key: str) -> Dict[str, Tuple[int, int]]:
+    """
+    Load cached compliant files written by an earlier run.
+    
+    A missing, unreadable, or malformed cache, or one written with a
+    different key, is treated as empty.
+    
+    Args:
+        cache_file: Path of the cache file
+        key: Expected cache key for the current settings
+        
+    Returns:
+        Mapping of path string to (st_mtime_ns, st_size)
+    """
+    try:
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            meta = json.loads(f.readline())
+            if meta.get('version') != CACHE_FORMAT_VERSION or meta.get('key') != key:
+                logger.info("Check cache is stale; rebuilding")
+                return {}
+            
+            entries = {}
+            for line in f:
+                record = json.loads(line)
+                entries[record['path']] = (record['mtime'], record['size'])
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+        logger.warning(f"Ignoring unreadable check cache {cache_file}: {e}")
+        return {}
+    
+    logger.info(f"Loaded {len(entries)} cached compliant files")
+    return entries
+
+
+def merge_check_cache_entries(
+    previous: Mapping[str, Tuple[int, int]],
+    scan_result: ScanResult,
+    compliant_files: Iterable[Path],
+    started_ns: int,
+    written_stats: Optional[Mapping[Path, Tuple[int, int]]] = None
+) -> Dict[str, Tuple[int, int]]:
+    """
+    Fold the results of a run into the previously cached entries.
+    
+    Entries for files outside this run's scan are kept as they were; every
+    file eligible in this run is replaced by its new result. Compliant files
+    use the stat taken during the scan and are left out if modified within
+    RACY_MTIME_WINDOW_NS of the run's start, since on filesystems with
+    coarse timestamps a later edit could keep the same mtime. Files the run
+    wrote itself are recorded with the stat taken on the written content
+    before it was renamed into place, so an edit made since the write is
+    seen as a change rather than cached; no window applies to them, as
+    their mtime is always from this run.
+    
+    Args:
+        previous: Entries loaded at the start of the run
+        scan_result: Scan of this run, with eligible file sizes and mtimes
+        compliant_files: Files found compliant without being written
+        started_ns: Wall-clock time (time.time_ns()) when the run started
+        written_stats: (st_mtime_ns, st_size) of each file the run gave a
+            header, as written
+        
+    Returns:
+        Mapping of path string to (st_mtime_ns, st_size)
+    """
+    entries = dict(previous)
+    for file_path in scan_result.eligible_files:
+        entries.pop(str(file_path), None)
+    
+    cutoff = started_ns - RACY_MTIME_WINDOW_NS
+    for file_path in compliant_files:
+        mtime = scan_result.file_mtimes[file_path]
+        if mtime < cutoff:
+            entries[str(file_path)] = (mtime, scan_result.file_sizes[file_path])
+    
+    for file_path, written in (written_stats or {}).items():
+        entries[str(file_path)] = written
+    
+    return entries
+
+
+def save_check_cache(
+    cache_file: Path,
+    key: str,
+    entries: Mapping[str, Tuple[int, int]]
+) -> None:
+    """
+    Write cached compliant files as newline-delimited JSON.
+    
+    The first line holds the format version and key; each following line
+    holds one file. Failures are logged and otherwise ignored, since the
+    cache only ever saves work.
+    
+    Args:
+        cache_file: Path of the cache file
+        key: Cache key for the current settings
+        entries: Mapping of path string to (st_mtime_ns, st_size)
+    """
+    lines = [json.dumps({'version': CACHE_FORMAT_VERSION, 'key': key})]
+    lines.extend(
+        json.dumps({'path': path, 'mtime': mtime, 'size': size})
+        for path, (mtime, size) in entries.items()
+    )
+    
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        # A catch-all .gitignore keeps the cache out of version control
+        # without editing the repository's own ignore rules
+        gitignore = cache_file.parent.parent / '.gitignore'
+        if not gitignore.exists():
+            gitignore.write_text('*\n', encoding='utf-8')
+        atomic_write_bytes(cache_file, ('\n'.join(lines) + '\n').encode('utf-8'), 0o644)
+    except OSError as e:
+        logger.warning(f"Could not write check cache {cache_file}: {e}")
+        return
+    
+    logger.info(f"Cached {len(entries)} compliant files in {cache_file}")
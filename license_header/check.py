@@ -18,20 +18,47 @@ Implements header compliance checking without modifying files.
 Supports multi-language comment wrapping detection.
 """
 
+import itertools
 import logging
+import mmap
+import os
+import time
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import List
+from typing import Callable, List, Optional, Tuple
 
+from .cache import (
+    check_cache_key,
+    check_cache_path,
+    load_check_cache,
+    merge_check_cache_entries,
+    save_check_cache,
+)
 from .config import Config, get_header_content
-from .scanner import scan_repository
-from .apply import has_header, prepare_header_for_file
-from .utils import read_file_with_encoding
+from .scanner import ScanResult, iter_eligible_files
+from .apply import (
+    _ASCII_WHITESPACE_RUN_RE,
+    _header_byte_variants,
+    _normalized_header_forms,
+    _prefix_decides_header,
+    build_header_lookup,
+    has_header,
+    has_header_bytes,
+)
+from .utils import (
+    BOM_UTF8,
+    MMAP_THRESHOLD,
+    _READ_OPEN_FLAGS,
+    decode_prefix_with_encoding,
+    parallel_map,
+    read_file_prefix,
+    read_file_with_encoding,
+)
 
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+@dataclass(slots=True)
 class CheckResult:
     """Result of checking files for license headers."""
     
@@ -39,29 +66,77 @@ class CheckResult:
     non_compliant_files: List[Path] = field(default_factory=list)
     skipped_files: List[Path] = field(default_factory=list)
     failed_files: List[Path] = field(default_factory=list)
+    # Non-compliant files handed to a sink instead of kept in non_compliant_files
+    streamed_non_compliant: int = 0
+    
+    def non_compliant_count(self) -> int:
+        """Return number of non-compliant files, listed or streamed."""
+        return len(self.non_compliant_files) + self.streamed_non_compliant
     
     def total_eligible(self) -> int:
         """Return total number of eligible files checked."""
-        return len(self.compliant_files) + len(self.non_compliant_files) + len(self.failed_files)
+        return len(self.compliant_files) + self.non_compliant_count() + len(self.failed_files)
     
     def total_scanned(self) -> int:
         """Return total number of files scanned."""
-        return (
-            len(self.compliant_files)
-            + len(self.non_compliant_files)
-            + len(self.skipped_files)
-            + len(self.failed_files)
-        )
+        return self.total_eligible() + len(self.skipped_files)
     
     def is_compliant(self) -> bool:
         """Return True if all eligible files are compliant."""
-        return len(self.non_compliant_files) == 0 and len(self.failed_files) == 0
+        return self.non_compliant_count() == 0 and len(self.failed_files) == 0
+
+
+# Bytes read beyond the encoded header to cover a shebang and blank lines
+PREFIX_SLACK_BYTES = 256
+
+
+def _read_header_window(file_path: Path, nbytes: int) -> Optional[Tuple[bytes, bool]]:
+    """
+    Read a large file up to nbytes past its shebang and leading blank lines.
+    
+    The file is memory-mapped so the blank run is skipped in place; only the
+    returned window is copied out.
+    
+    Args:
+        file_path: Path to file to read
+        nbytes: Number of bytes to include after the first non-blank byte
+        
+    Returns:
+        Tuple of (window bytes, True if the window covers the whole file),
+        or None if the file is below MMAP_THRESHOLD or its shebang line
+        never ends
+        
+    Raises:
+        OSError: If the file cannot be read
+    """
+    fd = os.open(file_path, _READ_OPEN_FLAGS)
+    try:
+        size = os.fstat(fd).st_size
+        if size < MMAP_THRESHOLD:
+            return None
+        with mmap.mmap(fd, 0, access=mmap.ACCESS_READ) as mm:
+            start = len(BOM_UTF8) if mm[:len(BOM_UTF8)] == BOM_UTF8 else 0
+            if mm[start:start + 2] == b'#!':
+                newline_idx = mm.find(b'\n', start)
+                if newline_idx == -1:
+                    return None
+                start = newline_idx + 1
+            end = _ASCII_WHITESPACE_RUN_RE.match(mm, start).end() + nbytes
+            return mm[:end], end >= size
+    finally:
+        os.close(fd)
 
 
 def check_file_header(file_path: Path, header: str) -> bool:
     """
     Check if a file has the required header.
     
+    Only a header-sized prefix is read. Files starting with the exact
+    header bytes, and short pure-ASCII files, are decided without decoding.
+    When leading blank lines push the header past the prefix, large files
+    are mapped and read only up to the header. The whole file is read when
+    none of this settles the answer or the prefix does not decode.
+    
     Args:
         file_path: Path to file to check
         header: Expected header text
@@ -73,6 +148,46 @@ def check_file_header(file_path: Path, header: str) -> bool:
         OSError: If file cannot be read
         UnicodeDecodeError: If file encoding cannot be determined
     """
+    # Twice the UTF-8 length also covers the header encoded as UTF-16; the
+    # cached normalized form saves encoding the header again for every file
+    need = len(_normalized_header_forms(header)[1]) * 2 + PREFIX_SLACK_BYTES
+    try:
+        # One extra byte tells a file of exactly need bytes apart from a longer one
+        data = read_file_prefix(file_path, need + 1)
+    except (OSError, IOError) as e:
+        logger.error(f"Error reading file {file_path}: {e}")
+        raise
+    
+    # bytes.startswith compares in C, so a compliant file never reaches the
+    # decoder or any per-line Python code
+    if data.startswith(_header_byte_variants(header)):
+        return True
+    
+    complete = len(data) <= need
+    data = data[:need]
+    if complete and data.isascii():
+        return has_header_bytes(data, header)
+    
+    try:
+        prefix, bom, encoding = decode_prefix_with_encoding(data, final=complete)
+        if complete or _prefix_decides_header(prefix, header):
+            return has_header(prefix, header)
+        
+        # Leading blank lines pushed the header past the prefix; large files
+        # are mapped and only the pages up to the first text are touched
+        window = _read_header_window(file_path, need)
+        if window is not None:
+            data, complete = window
+            prefix, bom, encoding = decode_prefix_with_encoding(data, final=complete)
+            if complete or _prefix_decides_header(prefix, header):
+                return has_header(prefix, header)
+    except UnicodeDecodeError:
+        # Let the full read below report the decode error
+        pass
+    except (OSError, IOError) as e:
+        logger.error(f"Error reading file {file_path}: {e}")
+        raise
+    
     try:
         # Read file with encoding detection
         content, bom, encoding = read_file_with_encoding(file_path)
@@ -85,7 +200,50 @@ def check_file_header(file_path: Path, header: str) -> bool:
         raise
 
 
-def check_headers(config: Config) -> CheckResult:
+def _check_one(
+    file_path: Path,
+    header: str,
+    size: Optional[int] = None,
+    unchanged: bool = False
+) -> Tuple[str, Optional[str]]:
+    """
+    Check one file for the header and report the outcome.
+    
+    Top-level so it can be pickled into a process pool. Errors are returned
+    rather than raised so the parent process can log and tally them.
+    
+    Args:
+        file_path: Path to file to check
+        header: Header text prepared for this file
+        size: File size recorded by the scanner, if known
+        unchanged: True if the file matches a cached compliant entry
+        
+    Returns:
+        Tuple of (status, error message) where status is 'compliant',
+        'non_compliant', or 'failed'
+    """
+    # Cached files were compliant under the same settings and have not
+    # changed since; no need to open them
+    if unchanged:
+        return ('compliant', None)
+    
+    # An empty file cannot hold a non-empty header; no need to open it
+    if size == 0 and header:
+        return ('non_compliant', None)
+    
+    try:
+        if check_file_header(file_path, header):
+            return ('compliant', None)
+        return ('non_compliant', None)
+    
+    except (PermissionError, OSError, IOError, UnicodeDecodeError) as e:
+        return ('failed', str(e))
+
+
+def check_headers(
+    config: Config,
+    non_compliant_sink: Optional[Callable[[Path], None]] = None
+) -> CheckResult:
     """
     Check all eligible files for required license headers.
     
@@ -95,6 +253,9 @@ def check_headers(config: Config) -> CheckResult:
     
     Args:
         config: Configuration object with header and scanning settings
+        non_compliant_sink: Optional callback receiving each non-compliant
+            path in scan order. When given, those paths are only counted in
+            the result, which keeps memory flat on very large trees.
         
     Returns:
         CheckResult with statistics about compliant and non-compliant files
@@ -110,54 +271,93 @@ def check_headers(config: Config) -> CheckResult:
     if not scan_path.is_absolute():
         scan_path = repo_root / scan_path
     
-    # Scan repository for eligible files
+    # Log comment wrapping configuration
+    if config.wrap_comments:
+        logger.info(f"Comment wrapping enabled (fallback: {config.fallback_comment_style}, "
+                    f"block: {config.use_block_comments})")
+    else:
+        logger.info("Comment wrapping disabled - checking for raw header")
+    
+    # Prepare headers once per extension rather than once per file
+    header_for = build_header_lookup(
+        raw_header,
+        wrap_comments=config.wrap_comments,
+        fallback_style_name=config.fallback_comment_style,
+        use_block_comments=config.use_block_comments
+    )
+    
+    # Files found compliant by an earlier run with the same settings are
+    # skipped while their mtime and size are unchanged
+    known_compliant = None
+    if config.cache:
+        started_ns = time.time_ns()
+        cache_file = check_cache_path(repo_root)
+        cache_key = check_cache_key(config, raw_header)
+        known_compliant = load_check_cache(cache_file, cache_key)
+    
+    # Stream eligible files from the walk straight into the checks, so files
+    # are read while the rest of the tree is still being scanned
     logger.info(f"Scanning {scan_path} for eligible files...")
-    scan_result = scan_repository(
+    scan_result = ScanResult()
+    eligible = iter_eligible_files(
         root_path=scan_path,
         include_extensions=config.include_extensions,
         exclude_patterns=config.exclude_paths,
         repo_root=repo_root,
+        result=scan_result,
+        known_text_files=known_compliant,
     )
+    files, header_files, size_files, cached_files = itertools.tee(eligible, 4)
     
-    logger.info(f"Found {len(scan_result.eligible_files)} eligible files")
+    # Check header in each eligible file
+    # Large runs are spread across a pool; results come back in scan order
+    outcomes = parallel_map(
+        _check_one,
+        config.parallel,
+        files,
+        map(header_for, header_files),
+        map(scan_result.file_sizes.get, size_files),
+        map(scan_result.unchanged_files.__contains__, cached_files)
+    )
     
-    # Log comment wrapping configuration
-    if config.wrap_comments:
-        logger.info(f"Comment wrapping enabled (fallback: {config.fallback_comment_style}, "
-                    f"block: {config.use_block_comments})")
-    else:
-        logger.info("Comment wrapping disabled - checking for raw header")
+    # The walk recorded every file it yielded, in the order checked
+    eligible_files = scan_result.eligible_files
+    logger.info(f"Found {len(eligible_files)} eligible files")
     
-    # Check header in each eligible file
-    for file_path in scan_result.eligible_files:
-        try:
-            # Prepare header for this specific file (wrap with comments if enabled)
-            header = prepare_header_for_file(
-                raw_header=raw_header,
-                file_path=file_path,
-                wrap_comments=config.wrap_comments,
-                fallback_style_name=config.fallback_comment_style,
-                use_block_comments=config.use_block_comments
-            )
-            
-            has_required_header = check_file_header(file_path, header)
-            
-            if has_required_header:
-                result.compliant_files.append(file_path)
+    # Per-file records are only built when debug logging is on; the
+    # missing files are listed by the caller, so info gets one summary
+    debug_enabled = logger.isEnabledFor(logging.DEBUG)
+    for file_path, (status, error_msg) in zip(eligible_files, outcomes):
+        if status == 'compliant':
+            result.compliant_files.append(file_path)
+            if debug_enabled:
                 logger.debug(f"File is compliant: {file_path}")
+        elif status == 'non_compliant':
+            if non_compliant_sink is not None:
+                non_compliant_sink(file_path)
+                result.streamed_non_compliant += 1
             else:
                 result.non_compliant_files.append(file_path)
-                logger.info(f"File is missing header: {file_path}")
-                
-        except (PermissionError, OSError, IOError, UnicodeDecodeError) as e:
-            logger.error(f"Failed to check {file_path}: {e}")
+            if debug_enabled:
+                logger.debug(f"File is missing header: {file_path}")
+        else:
+            logger.error(f"Failed to check {file_path}: {error_msg}")
             result.failed_files.append(file_path)
     
+    if result.non_compliant_count():
+        logger.info(f"Missing header in {result.non_compliant_count()} files")
+    
+    if scan_result.unchanged_files:
+        logger.info(f"Skipped {len(scan_result.unchanged_files)} unchanged files from the cache")
+    
+    # A dry run reads the cache but leaves it as it was
+    if config.cache and not config.dry_run:
+        entries = merge_check_cache_entries(
+            known_compliant, scan_result, result.compliant_files, started_ns
+        )
+        save_check_cache(cache_file, cache_key, entries)
+    
     # Track skipped files from scan
-    result.skipped_files.extend(scan_result.skipped_binary)
-    result.skipped_files.extend(scan_result.skipped_excluded)
-    result.skipped_files.extend(scan_result.skipped_symlink)
-    result.skipped_files.extend(scan_result.skipped_permission)
-    result.skipped_files.extend(scan_result.skipped_extension)
+    result.skipped_files = scan_result.skipped_files()
     
     return result
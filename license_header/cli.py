@@ -15,30 +15,31 @@
 CLI module for license-header tool.
 """
 
+import itertools
 import logging
+import os
 import sys
+from pathlib import Path
+from typing import Callable, Iterable, Optional, Sequence
+
 import click
 
-from .config import merge_config, get_header_content, find_repo_root, load_header_content
-from .apply import (
-    apply_headers,
-    UpgradeResult,
-    prepare_header_for_file,
-    upgrade_header_in_file,
+from .config import (
+    DEFAULT_EXCLUDE_PATHS,
+    DEFAULT_INCLUDE_EXTENSIONS,
+    find_repo_root,
+    get_header_content,
+    load_header_content,
+    merge_config,
 )
-from .check import check_headers
-from .reports import generate_reports
-from .scanner import scan_repository
 
 
-# Configure structured logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    datefmt='%Y-%m-%d %H:%M:%S'
-)
 logger = logging.getLogger(__name__)
 
+# Files counted between progress bar redraws, so a large upgrade is not
+# slowed by one terminal write per file
+PROGRESS_MIN_STEPS = 50
+
 
 def check_python_version():
     """Check if Python version meets minimum requirement."""
@@ -54,6 +55,76 @@ def check_python_version():
         sys.exit(1)
 
 
+# The interpreter version cannot change while the process runs, so it is
+# checked once on import rather than on every command dispatch
+check_python_version()
+
+
+def _init_logging() -> None:
+    """
+    Configure structured logging for a command run.
+    
+    Called at the start of each command rather than on import, so --help,
+    --version, and shell completion never set up handlers. basicConfig
+    leaves an already configured root logger alone, so repeated calls
+    are harmless.
+    """
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        datefmt='%Y-%m-%d %H:%M:%S'
+    )
+
+
+def _echo_lines(lines: Iterable[str]) -> None:
+    """
+    Echo a sequence of lines with a single write.
+    
+    Long file listings otherwise cost one write (and, on a terminal, one
+    flush) per line. Nothing is written for an empty sequence.
+    
+    Args:
+        lines: Lines to print, without trailing newlines
+    """
+    text = "\n".join(lines)
+    if text:
+        click.echo(text)
+
+
+def _echo_preview(items: Sequence[Path], limit: Optional[int], format_item: Callable[[Path], str]) -> None:
+    """
+    Echo the first few items of a file list and a count of the rest.
+    
+    Only the shown items are visited, so the cost does not grow with the
+    length of the list.
+    
+    Args:
+        items: Files to preview
+        limit: Maximum number of files to list, or None to list them all
+        format_item: Formats one file as an output line
+    """
+    lines = [format_item(item) for item in itertools.islice(items, limit)]
+    hidden = len(items) - len(lines)
+    if hidden > 0:
+        lines.append(f"  ... and {hidden} more")
+    _echo_lines(lines)
+
+
+def _display_path(file_path: Path, root_prefix: str) -> str:
+    """
+    Format a path for display relative to the repository root.
+    
+    Args:
+        file_path: Path to display
+        root_prefix: Repository root as a separator-terminated string
+        
+    Returns:
+        The path relative to the root, or the path unchanged if it lies outside
+    """
+    path = str(file_path)
+    return path[len(root_prefix):] if path.startswith(root_prefix) else path
+
+
 @click.group()
 @click.version_option(message='%(version)s')
 def main():
@@ -62,7 +133,6 @@ def main():
     
     Use 'license-header <command> --help' for more information on a specific command.
     """
-    check_python_version()
 
 
 @main.command()
@@ -76,7 +146,9 @@ def main():
 @click.option('--no-wrap-comments', is_flag=True, help='Disable automatic comment wrapping (use header text as-is)')
 @click.option('--fallback-comment-style', type=click.Choice(['hash', 'slash', 'none']), default=None, help='Comment style for unknown file types (hash=#, slash=//, none=no wrapping)')
 @click.option('--use-block-comments', is_flag=True, help='Use block comments (/* */) instead of line comments where supported')
-def apply(config, header, path, output, include_extension, exclude_path, dry_run, no_wrap_comments, fallback_comment_style, use_block_comments):
+@click.option('--parallel', type=click.Choice(['process', 'thread', 'none']), default=None, help='Concurrency backend for large runs (process=multiprocessing, thread=I/O threads, none=serial)')
+@click.option('--cache/--no-cache', default=None, help='Skip unchanged files already known to be compliant and record the files given a header (cache kept in .license-header-cache/)')
+def apply(config, header, path, output, include_extension, exclude_path, dry_run, no_wrap_comments, fallback_comment_style, use_block_comments, parallel, cache):
     """Apply license headers to source files (modifies files in-place).
     
     Supports multi-language comment wrapping. Header file should contain raw
@@ -84,9 +156,14 @@ def apply(config, header, path, output, include_extension, exclude_path, dry_run
     header with the appropriate comment syntax for each file type (Python, C,
     C++, C#, TypeScript, JavaScript, Java, Rust).
     """
+    _init_logging()
     logger.info(f"Apply command called with path='{path}', dry_run={dry_run}")
     
     try:
+        # Imported per command so --help and other commands skip loading them
+        from .apply import apply_headers
+        from .reports import generate_reports
+        
         # Build CLI args dictionary
         cli_args = {
             'header': header,
@@ -99,6 +176,8 @@ def apply(config, header, path, output, include_extension, exclude_path, dry_run
             'no_wrap_comments': no_wrap_comments,
             'fallback_comment_style': fallback_comment_style,
             'use_block_comments': use_block_comments if use_block_comments else None,
+            'parallel': parallel,
+            'cache': cache,
         }
         
         # Merge configuration
@@ -141,21 +220,16 @@ def apply(config, header, path, output, include_extension, exclude_path, dry_run
         
         if dry_run:
             click.echo("[DRY RUN] Files that would be modified:")
-            for file_path in result.modified_files:
-                click.echo(f"  - {file_path}")
+            _echo_lines(f"  - {file_path}" for file_path in result.modified_files)
             click.echo()
             click.echo("[DRY RUN] No files were actually modified.")
         elif result.modified_files:
             click.echo(f"Modified {len(result.modified_files)} file(s):")
-            for file_path in result.modified_files[:10]:  # Show first 10
-                click.echo(f"  - {file_path}")
-            if len(result.modified_files) > 10:
-                click.echo(f"  ... and {len(result.modified_files) - 10} more")
+            _echo_preview(result.modified_files, 10, lambda file_path: f"  - {file_path}")
         
         if result.failed_files:
             click.echo(f"\nFailed to process {len(result.failed_files)} file(s):")
-            for file_path in result.failed_files:
-                click.echo(f"  - {file_path}")
+            _echo_lines(f"  - {file_path}" for file_path in result.failed_files)
         
         # Generate reports if output directory specified
         if cfg.output_dir and not dry_run:
@@ -192,16 +266,23 @@ def apply(config, header, path, output, include_extension, exclude_path, dry_run
 @click.option('--no-wrap-comments', is_flag=True, help='Disable automatic comment wrapping (check for header text as-is)')
 @click.option('--fallback-comment-style', type=click.Choice(['hash', 'slash', 'none']), default=None, help='Comment style for unknown file types (hash=#, slash=//, none=no wrapping)')
 @click.option('--use-block-comments', is_flag=True, help='Expect block comments (/* */) instead of line comments where supported')
-def check(config, header, path, output, include_extension, exclude_path, dry_run, no_wrap_comments, fallback_comment_style, use_block_comments):
+@click.option('--parallel', type=click.Choice(['process', 'thread', 'none']), default=None, help='Concurrency backend for large runs (process=multiprocessing, thread=I/O threads, none=serial)')
+@click.option('--cache/--no-cache', default=None, help='Skip files found compliant by an earlier check and unchanged since (cache kept in .license-header-cache/)')
+def check(config, header, path, output, include_extension, exclude_path, dry_run, no_wrap_comments, fallback_comment_style, use_block_comments, parallel, cache):
     """Check source files for correct license headers.
     
     Supports multi-language comment detection. Header file should contain raw
     license text without comment markers. The tool automatically checks for
     the header wrapped with the appropriate comment syntax for each file type.
     """
+    _init_logging()
     logger.info(f"Check command called with path='{path}', dry_run={dry_run}")
     
     try:
+        # Imported per command so --help and other commands skip loading them
+        from .check import check_headers
+        from .reports import generate_reports
+        
         # Build CLI args dictionary
         cli_args = {
             'header': header,
@@ -214,6 +295,8 @@ def check(config, header, path, output, include_extension, exclude_path, dry_run
             'no_wrap_comments': no_wrap_comments,
             'fallback_comment_style': fallback_comment_style,
             'use_block_comments': use_block_comments if use_block_comments else None,
+            'parallel': parallel,
+            'cache': cache,
         }
         
         # Merge configuration
@@ -247,7 +330,7 @@ def check(config, header, path, output, include_extension, exclude_path, dry_run
         click.echo(f"  Scanned: {result.total_scanned()}")
         click.echo(f"  Eligible: {result.total_eligible()}")
         click.echo(f"  Compliant: {len(result.compliant_files)}")
-        click.echo(f"  Non-compliant: {len(result.non_compliant_files)}")
+        click.echo(f"  Non-compliant: {result.non_compliant_count()}")
         click.echo(f"  Skipped: {len(result.skipped_files)}")
         click.echo(f"  Failed: {len(result.failed_files)}")
         click.echo()
@@ -255,15 +338,13 @@ def check(config, header, path, output, include_extension, exclude_path, dry_run
         # Display non-compliant files
         if result.non_compliant_files:
             click.echo(f"Files missing license headers ({len(result.non_compliant_files)}):")
-            for file_path in result.non_compliant_files:
-                click.echo(f"  - {file_path}")
+            _echo_lines(f"  - {file_path}" for file_path in result.non_compliant_files)
             click.echo()
         
         # Display failed files
         if result.failed_files:
             click.echo(f"Failed to check {len(result.failed_files)} file(s):")
-            for file_path in result.failed_files:
-                click.echo(f"  - {file_path}")
+            _echo_lines(f"  - {file_path}" for file_path in result.failed_files)
             click.echo()
         
         # Generate reports if output directory specified and not dry-run
@@ -287,8 +368,8 @@ def check(config, header, path, output, include_extension, exclude_path, dry_run
         
         # Determine exit code
         # Check mode should fail by default when there are non-compliant files
-        if result.non_compliant_files or result.failed_files:
-            logger.error(f"Check failed: {len(result.non_compliant_files)} non-compliant, {len(result.failed_files)} failed")
+        if not result.is_compliant():
+            logger.error(f"Check failed: {result.non_compliant_count()} non-compliant, {len(result.failed_files)} failed")
             click.echo("Check FAILED: Files are missing license headers or could not be checked.", err=True)
             sys.exit(1)
         else:
@@ -313,7 +394,9 @@ def check(config, header, path, output, include_extension, exclude_path, dry_run
 @click.option('--dry-run', is_flag=True, help='Preview changes without modifying files')
 @click.option('--fallback-comment-style', type=click.Choice(['hash', 'slash', 'none']), default='hash', help='Comment style for unknown file types (hash=#, slash=//, none=no wrapping)')
 @click.option('--use-block-comments', is_flag=True, help='Use block comments (/* */) instead of line comments where supported')
-def upgrade(from_header, to_header, path, output, include_extension, exclude_path, dry_run, fallback_comment_style, use_block_comments):
+@click.option('--parallel', type=click.Choice(['process', 'thread', 'none']), default='process', help='Concurrency backend for large runs (process=multiprocessing, thread=I/O threads, none=serial)')
+@click.option('--verbose', is_flag=True, help='List every upgraded and failed file instead of the first few')
+def upgrade(from_header, to_header, path, output, include_extension, exclude_path, dry_run, fallback_comment_style, use_block_comments, parallel, verbose):
     """Upgrade license headers from V1/old format to V2 format.
     
     This command transitions files from an old header (V1 with embedded comment
@@ -334,6 +417,7 @@ def upgrade(from_header, to_header, path, output, include_extension, exclude_pat
     
     SAFETY: Always run with --dry-run first to preview changes.
     """
+    _init_logging()
     logger.info(f"Upgrade command called with from='{from_header}', to='{to_header}', path='{path}', dry_run={dry_run}")
     
     # Prevent accidental self-referential upgrade
@@ -343,6 +427,12 @@ def upgrade(from_header, to_header, path, output, include_extension, exclude_pat
     try:
         from pathlib import Path as PathLib
         
+        # Imported per command so --help and other commands skip loading them
+        from .apply import UpgradeResult, _UpgradeOptions, _upgrade_one, build_header_lookup
+        from .reports import generate_reports
+        from .scanner import ScanResult, iter_eligible_files
+        from .utils import iter_parallel_map
+        
         # Find repo root
         repo_root = find_repo_root(PathLib.cwd())
         
@@ -376,43 +466,59 @@ def upgrade(from_header, to_header, path, output, include_extension, exclude_pat
             scan_path = repo_root / scan_path
         
         # Use defaults if not specified
-        include_exts = list(include_extension) if include_extension else ['.py', '.js', '.ts', '.java', '.cpp', '.c', '.h', '.cs', '.rs']
-        exclude_paths = list(exclude_path) if exclude_path else ['node_modules', '.git', '__pycache__', 'venv', 'env', '.venv', 'dist', 'build']
+        include_exts = list(include_extension or DEFAULT_INCLUDE_EXTENSIONS)
+        exclude_paths = list(exclude_path or DEFAULT_EXCLUDE_PATHS)
         
-        # Scan for files
+        # Stream eligible files from the walk straight into the workers, so
+        # files are upgraded while the rest of the tree is still being scanned
         logger.info(f"Scanning {scan_path} for eligible files...")
-        scan_result = scan_repository(
+        scan_result = ScanResult()
+        eligible = iter_eligible_files(
             root_path=scan_path,
             include_extensions=include_exts,
             exclude_patterns=exclude_paths,
             repo_root=repo_root,
+            result=scan_result,
         )
         
-        click.echo(f"Found {len(scan_result.eligible_files)} eligible files to check")
-        click.echo()
-        
         # Process files
         result = UpgradeResult()
         
-        for file_path in scan_result.eligible_files:
-            try:
-                # Prepare target header for this specific file (wrap with comments)
-                wrapped_to_header = prepare_header_for_file(
-                    raw_header=to_header_content,
-                    file_path=file_path,
-                    wrap_comments=True,
-                    fallback_style_name=fallback_comment_style,
-                    use_block_comments=use_block_comments
-                )
-                
-                # Perform upgrade
-                status = upgrade_header_in_file(
-                    file_path=file_path,
-                    from_header=from_header_content,
-                    to_header=wrapped_to_header,
-                    dry_run=dry_run
-                )
-                
+        # Wrap the target header once per extension rather than once per file
+        header_for = build_header_lookup(
+            to_header_content,
+            wrap_comments=True,
+            fallback_style_name=fallback_comment_style,
+            use_block_comments=use_block_comments
+        )
+        options = _UpgradeOptions(from_header=from_header_content, dry_run=dry_run)
+        
+        files, header_files, mode_files = itertools.tee(eligible, 3)
+        
+        # Large runs are spread across a pool; results come back lazily in
+        # scan order. The scanner's file modes spare each worker a stat
+        # before writing.
+        outcomes = iter_parallel_map(
+            _upgrade_one,
+            parallel,
+            files,
+            map(header_for, header_files),
+            itertools.repeat(options),
+            map(scan_result.file_modes.get, mode_files)
+        )
+        
+        # Count finished files in place on stderr; the total is unknown until
+        # the walk ends. Off a terminal only the label is printed.
+        with click.progressbar(
+            outcomes,
+            label='Files processed',
+            show_pos=True,
+            update_min_steps=PROGRESS_MIN_STEPS,
+            file=sys.stderr
+        ) as progress:
+            # Each outcome is taken before its file, since the walk records a
+            # file only once it has been handed out
+            for (status, error_msg), file_path in zip(progress, scan_result.eligible_files):
                 if status == 'upgraded':
                     result.upgraded_files.append(file_path)
                 elif status == 'already_target':
@@ -422,18 +528,16 @@ def upgrade(from_header, to_header, path, output, include_extension, exclude_pat
                 elif status.startswith('error:'):
                     result.failed_files.append(file_path)
                     result.error_messages[file_path] = status[6:]  # Remove 'error:' prefix
-                    
-            except Exception as e:
-                logger.error(f"Failed to process {file_path}: {e}")
-                result.failed_files.append(file_path)
-                result.error_messages[file_path] = str(e)
+                elif status == 'failed':
+                    logger.error(f"Failed to process {file_path}: {error_msg}")
+                    result.failed_files.append(file_path)
+                    result.error_messages[file_path] = error_msg
+        
+        click.echo(f"Found {len(scan_result.eligible_files)} eligible files to check")
+        click.echo()
         
         # Track skipped files from scan
-        result.skipped_files.extend(scan_result.skipped_binary)
-        result.skipped_files.extend(scan_result.skipped_excluded)
-        result.skipped_files.extend(scan_result.skipped_symlink)
-        result.skipped_files.extend(scan_result.skipped_permission)
-        result.skipped_files.extend(scan_result.skipped_extension)
+        result.skipped_files = scan_result.skipped_files()
         
         # Display summary
         click.echo(f"Summary:")
@@ -445,40 +549,31 @@ def upgrade(from_header, to_header, path, output, include_extension, exclude_pat
         click.echo(f"  Failed: {len(result.failed_files)}")
         click.echo()
         
+        # Paths are shown relative to the repo root with a plain prefix check
+        root_prefix = os.path.join(str(repo_root), '')
+        
+        def show_path(file_path: Path) -> str:
+            return f"  - {_display_path(file_path, root_prefix)}"
+        
         if dry_run:
             click.echo("[DRY RUN] Files that would be upgraded:")
-            for file_path in result.upgraded_files[:20]:
-                try:
-                    rel_path = file_path.relative_to(repo_root)
-                except ValueError:
-                    rel_path = file_path
-                click.echo(f"  - {rel_path}")
-            if len(result.upgraded_files) > 20:
-                click.echo(f"  ... and {len(result.upgraded_files) - 20} more")
+            _echo_preview(result.upgraded_files, None if verbose else 20, show_path)
             click.echo()
             click.echo("[DRY RUN] No files were actually modified.")
         elif result.upgraded_files:
             click.echo(f"Upgraded {len(result.upgraded_files)} file(s):")
-            for file_path in result.upgraded_files[:10]:
-                try:
-                    rel_path = file_path.relative_to(repo_root)
-                except ValueError:
-                    rel_path = file_path
-                click.echo(f"  - {rel_path}")
-            if len(result.upgraded_files) > 10:
-                click.echo(f"  ... and {len(result.upgraded_files) - 10} more")
+            _echo_preview(result.upgraded_files, None if verbose else 10, show_path)
         
         if result.failed_files:
             click.echo(f"\nFailed to process {len(result.failed_files)} file(s):")
-            for file_path in result.failed_files[:10]:
-                try:
-                    rel_path = file_path.relative_to(repo_root)
-                except ValueError:
-                    rel_path = file_path
-                error_msg = result.error_messages.get(file_path, 'Unknown error')
-                click.echo(f"  - {rel_path}: {error_msg}")
-            if len(result.failed_files) > 10:
-                click.echo(f"  ... and {len(result.failed_files) - 10} more")
+            _echo_preview(
+                result.failed_files,
+                None if verbose else 10,
+                lambda file_path: (
+                    f"{show_path(file_path)}: "
+                    f"{result.error_messages.get(file_path, 'Unknown error')}"
+                )
+            )
         
         # Generate reports if output directory specified and not dry-run
         if output and not dry_run:
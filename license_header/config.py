@@ -17,18 +17,42 @@ Configuration module for license-header tool.
 Handles loading and merging configuration from CLI arguments and config files.
 """
 
-import json
 import logging
-from dataclasses import dataclass, field
+import os
+import stat
+from dataclasses import MISSING, dataclass, field, fields
+from functools import lru_cache
 from pathlib import Path
+from types import MappingProxyType
 from typing import Dict, List, Optional
 
-import click
-
 logger = logging.getLogger(__name__)
 
+# Default file selection, shared by Config, merge_config, and the CLI; each
+# user gets a fresh list
+DEFAULT_INCLUDE_EXTENSIONS = ('.py', '.js', '.ts', '.java', '.cpp', '.c', '.h', '.cs', '.rs')
+DEFAULT_EXCLUDE_PATHS = ('node_modules', '.git', '__pycache__', 'venv', 'env', '.venv', 'dist', 'build')
+
+
+def _config_error(message: str) -> Exception:
+    """
+    Build the error raised for invalid configuration.
+    
+    click is imported here rather than at module level, so importing this
+    module (as every pool worker and library caller does) does not load it
+    until an error is actually reported.
+    
+    Args:
+        message: Error message shown to the user
+        
+    Returns:
+        click.ClickException carrying the message
+    """
+    import click
+    return click.ClickException(message)
 
-@dataclass
+
+@dataclass(slots=True)
 class Config:
     """Configuration schema for license-header tool."""
     
@@ -36,8 +60,8 @@ class Config:
     header_file: str
     
     # Optional configuration with defaults
-    include_extensions: List[str] = field(default_factory=lambda: ['.py', '.js', '.ts', '.java', '.cpp', '.c', '.h', '.cs', '.rs'])
-    exclude_paths: List[str] = field(default_factory=lambda: ['node_modules', '.git', '__pycache__', 'venv', 'env', '.venv', 'dist', 'build'])
+    include_extensions: List[str] = field(default_factory=lambda: list(DEFAULT_INCLUDE_EXTENSIONS))
+    exclude_paths: List[str] = field(default_factory=lambda: list(DEFAULT_EXCLUDE_PATHS))
     output_dir: Optional[str] = None
     dry_run: bool = False
     mode: str = 'apply'  # 'apply' or 'check'
@@ -56,6 +80,15 @@ class Config:
     upgrade_from_header: Optional[str] = None  # Path to source header for upgrade
     upgrade_to_header: Optional[str] = None  # Path to target header for upgrade
     
+    # Concurrency backend for per-file work: 'process', 'thread', or 'none'
+    parallel: str = 'process'
+    
+    # Drop written files from the OS page cache (posix_fadvise DONTNEED)
+    release_page_cache: bool = False
+    
+    # Reuse compliant results for files unchanged since the last check
+    cache: bool = False
+    
     # Per-language comment overrides (extension -> style)
     # Keys are file extensions (e.g., '.py'), values are style names ('hash', 'slash', 'block')
     language_comment_overrides: Dict[str, str] = field(default_factory=dict)
@@ -78,42 +111,86 @@ def find_repo_root(start_path: Path) -> Path:
     Raises:
         ValueError: If no repository root is found
     """
-    current = start_path.resolve()
+    return _find_repo_root_cached(str(start_path.resolve()))
+
+
+@lru_cache(maxsize=64)
+def _find_repo_root_cached(start: str) -> Path:
+    """
+    Walk up from a resolved start directory to the nearest .git, once per path.
     
-    # Check if we're already in a git repo
-    while current != current.parent:
-        if (current / '.git').exists():
-            return current
-        current = current.parent
+    Each probe is a single lstat; a .git file (worktrees, submodules)
+    counts as well as a directory.
+    
+    Args:
+        start: Resolved starting path
+        
+    Returns:
+        Path to repository root, or the start path if none is found
+    """
+    current = start
+    parent = os.path.dirname(current)
+    
+    # Check if we're already in a git repo; the filesystem root is not probed
+    while current != parent:
+        try:
+            os.lstat(os.path.join(current, '.git'))
+            return Path(current)
+        except OSError:
+            pass
+        current, parent = parent, os.path.dirname(parent)
     
     # If no .git found, use the current working directory
-    return start_path.resolve()
+    return Path(start)
 
 
-def load_config_file(config_path: Path) -> dict:
+def clear_caches() -> None:
+    """
+    Forget cached repository roots and header contents.
+    
+    Needed only when a .git directory is created or removed while the
+    process runs, e.g. between tests that reuse a directory, or when a
+    header file is rewritten without changing its size or mtime.
+    """
+    _find_repo_root_cached.cache_clear()
+    _read_header_cached.cache_clear()
+
+
+def load_config_file(config_path: Path, missing_ok: bool = False) -> Optional[dict]:
     """
     Load configuration from a JSON file.
     
     Args:
         config_path: Path to the configuration file
+        missing_ok: Return None instead of raising if the file does not exist
         
     Returns:
-        Dictionary containing configuration values
+        Dictionary containing configuration values, or None if the file is
+        missing and missing_ok is set
         
     Raises:
         click.ClickException: If the file cannot be read or parsed
     """
+    # Only runs that read a config file need the json module
+    import json
+    
+    from .utils import read_file_bytes
+    
     try:
-        with open(config_path, 'r', encoding='utf-8') as f:
-            config_data = json.load(f)
+        # One read of the raw bytes; json.loads detects UTF-8 (with or
+        # without a BOM), UTF-16, and UTF-32 itself, so there is no text
+        # wrapper in between
+        config_data = json.loads(read_file_bytes(config_path)[0])
         logger.info(f"Loaded configuration from {config_path}")
         return config_data
     except FileNotFoundError:
-        raise click.ClickException(f"Configuration file not found: {config_path}")
+        if missing_ok:
+            return None
+        raise _config_error(f"Configuration file not found: {config_path}")
     except json.JSONDecodeError as e:
-        raise click.ClickException(f"Invalid JSON in configuration file {config_path}: {e}")
+        raise _config_error(f"Invalid JSON in configuration file {config_path}: {e}")
     except Exception as e:
-        raise click.ClickException(f"Error reading configuration file {config_path}: {e}")
+        raise _config_error(f"Error reading configuration file {config_path}: {e}")
 
 
 def validate_path_in_repo(path: Path, repo_root: Path, path_description: str) -> None:
@@ -128,15 +205,20 @@ def validate_path_in_repo(path: Path, repo_root: Path, path_description: str) ->
     Raises:
         click.ClickException: If path traverses above repo root
     """
+    # Symlinks must still be resolved, or a link inside the repo could point
+    # outside it; the containment test itself is done on plain strings
     try:
-        resolved_path = path.resolve()
-        # Check if the resolved path is within the repo root
-        resolved_path.relative_to(repo_root)
-    except (ValueError, RuntimeError):
-        raise click.ClickException(
-            f"{path_description} '{path}' traverses above repository root '{repo_root}'. "
-            "This is not allowed for security reasons."
-        )
+        resolved = os.path.realpath(path)
+        root = os.fspath(repo_root)
+        if os.path.commonpath([resolved, root]) == root:
+            return
+    except (ValueError, OSError):
+        pass
+    
+    raise _config_error(
+        f"{path_description} '{path}' traverses above repository root '{repo_root}'. "
+        "This is not allowed for security reasons."
+    )
 
 
 def load_header_content(header_file: str, repo_root: Path) -> str:
@@ -163,25 +245,53 @@ def load_header_content(header_file: str, repo_root: Path) -> str:
     if not Path(header_file).is_absolute():
         validate_path_in_repo(header_path, repo_root, "Header file path")
     
-    # Check file exists
-    if not header_path.exists():
-        raise click.ClickException(
+    # One stat both proves existence and tells a regular file apart
+    try:
+        st = os.stat(header_path)
+    except FileNotFoundError:
+        raise _config_error(
             f"Header file not found: {header_file}\n"
             f"Resolved to: {header_path}\n"
             f"Please ensure the header file exists and the path is correct."
         )
+    except OSError as e:
+        raise _config_error(f"Error reading header file {header_path}: {e}")
     
-    if not header_path.is_file():
-        raise click.ClickException(f"Header path is not a file: {header_path}")
+    if not stat.S_ISREG(st.st_mode):
+        raise _config_error(f"Header path is not a file: {header_path}")
     
-    # Read header content
+    # Read header content; unchanged headers are served from the cache
     try:
-        with open(header_path, 'r', encoding='utf-8') as f:
-            content = f.read()
+        content = _read_header_cached(str(header_path), st.st_mtime_ns, st.st_size)
         logger.info(f"Loaded header content from {header_path}")
         return content
     except Exception as e:
-        raise click.ClickException(f"Error reading header file {header_path}: {e}")
+        raise _config_error(f"Error reading header file {header_path}: {e}")
+
+
+@lru_cache(maxsize=32)
+def _read_header_cached(path: str, mtime_ns: int, size: int) -> str:
+    """
+    Read and decode a header file, once per (path, mtime, size).
+    
+    The file is read through a raw descriptor and decoded once; newlines
+    are normalized the way text mode would.
+    
+    Args:
+        path: Header file path
+        mtime_ns: Modification time of the file, part of the cache key
+        size: Size of the file, part of the cache key
+        
+    Returns:
+        Content of the header file
+    """
+    # Imported here so that importing config stays cheap for the CLI
+    from .utils import read_file_bytes
+    
+    content = read_file_bytes(path)[0].decode('utf-8')
+    if '\r' in content:
+        content = content.replace('\r\n', '\n').replace('\r', '\n')
+    return content
 
 
 def validate_extensions(extensions: List[str]) -> None:
@@ -194,9 +304,12 @@ def validate_extensions(extensions: List[str]) -> None:
     Note:
         Logs warnings for unusual extensions but does not fail
     """
-    for ext in extensions:
-        if not ext.startswith('.'):
-            logger.warning(f"Extension '{ext}' does not start with '.'. This may not match files as expected.")
+    bad = [ext for ext in extensions if not ext.startswith('.')]
+    if bad:
+        logger.warning(
+            f"Extensions {', '.join(repr(ext) for ext in bad)} do not start with '.'. "
+            "These may not match files as expected."
+        )
 
 
 def validate_exclude_patterns(patterns: List[str]) -> None:
@@ -217,11 +330,78 @@ def validate_exclude_patterns(patterns: List[str]) -> None:
             )
 
 
+# Valid setting values. The lists keep a stable order for error messages;
+# membership is tested against the frozensets.
+
 # Valid header version strings
 VALID_HEADER_VERSIONS = ['v1', 'v2']
+_HEADER_VERSION_SET = frozenset(VALID_HEADER_VERSIONS)
 
 # Valid comment override styles
 VALID_COMMENT_OVERRIDE_STYLES = ['hash', 'slash', 'block', 'none']
+_COMMENT_OVERRIDE_STYLE_SET = frozenset(VALID_COMMENT_OVERRIDE_STYLES)
+
+# Valid fallback comment styles
+VALID_FALLBACK_COMMENT_STYLES = ['hash', 'slash', 'none']
+_FALLBACK_COMMENT_STYLE_SET = frozenset(VALID_FALLBACK_COMMENT_STYLES)
+
+# Valid concurrency backends for per-file processing
+VALID_PARALLEL_MODES = ['process', 'thread', 'none']
+_PARALLEL_MODE_SET = frozenset(VALID_PARALLEL_MODES)
+
+
+def _is_one_of(value, allowed: frozenset) -> bool:
+    """
+    Check a setting value against a set of allowed strings.
+    
+    Values from a config file may be any JSON type; anything other than a
+    string is rejected before the (hashing) set lookup.
+    
+    Args:
+        value: Setting value to check
+        allowed: Allowed string values
+        
+    Returns:
+        True if value is one of the allowed strings
+    """
+    return isinstance(value, str) and value in allowed
+
+# Config fields merge_config fills from defaults, the config file and CLI
+_CONFIG_INIT_FIELDS = tuple(f.name for f in fields(Config) if f.init)
+
+# Defaults merge_config starts from, read once from the Config fields so
+# there is a single source of truth. The lists and dict a Config holds are
+# fresh copies made when it is built.
+_DEFAULT_CONFIG = MappingProxyType({
+    f.name: f.default if f.default is not MISSING else f.default_factory()
+    for f in fields(Config)
+    if f.init and f.name != 'header_file'
+})
+
+# Keys a config file may set
+_CONFIG_FILE_KEYS = frozenset([
+    'include_extensions', 'exclude_paths', 'output_dir', 'header_file',
+    'wrap_comments', 'fallback_comment_style', 'use_block_comments',
+    'header_version', 'upgrade_from_header', 'upgrade_to_header',
+    'language_comment_overrides', 'parallel', 'release_page_cache',
+    'cache',
+])
+
+# CLI option names that differ from the config key they set
+_CLI_KEY_MAP = MappingProxyType({
+    'include_extension': 'include_extensions',
+    'exclude_path': 'exclude_paths',
+    'header': 'header_file',
+})
+
+# CLI options that only take effect when given: multiple-value options
+# passed zero times and unset flags leave the config file's value alone
+_CLI_IF_SET_KEYS = frozenset(['include_extension', 'exclude_path', 'no_wrap_comments'])
+
+# Flags that set a fixed value on another config key
+_CLI_FLAG_VALUES = MappingProxyType({
+    'no_wrap_comments': ('wrap_comments', False),
+})
 
 
 def validate_header_version(version: str, mode: str) -> None:
@@ -235,15 +415,15 @@ def validate_header_version(version: str, mode: str) -> None:
     Raises:
         click.ClickException: If version is invalid or V1 is used outside upgrade mode
     """
-    if version not in VALID_HEADER_VERSIONS:
-        raise click.ClickException(
+    if not _is_one_of(version, _HEADER_VERSION_SET):
+        raise _config_error(
             f"Invalid header_version '{version}'. "
             f"Valid options are: {VALID_HEADER_VERSIONS}"
         )
     
     # V1 headers are only allowed in upgrade mode
     if version == 'v1' and mode != 'upgrade':
-        raise click.ClickException(
+        raise _config_error(
             f"Header version 'v1' is only allowed in upgrade mode. "
             f"For regular {mode} operations, use 'v2' headers. "
             "To migrate from V1 to V2, use the 'upgrade' command."
@@ -269,7 +449,7 @@ def validate_upgrade_config(
     # In upgrade mode, both from and to headers are required
     if mode == 'upgrade':
         if not upgrade_from_header or not upgrade_to_header:
-            raise click.ClickException(
+            raise _config_error(
                 "Upgrade mode requires both 'upgrade_from_header' and 'upgrade_to_header' to be set. "
                 "Specify them via:\n"
                 "  - CLI flags: --from-header and --to-header\n"
@@ -295,7 +475,7 @@ def validate_language_comment_overrides(overrides: Dict[str, str]) -> None:
         click.ClickException: If any override value is invalid
     """
     if not isinstance(overrides, dict):
-        raise click.ClickException(
+        raise _config_error(
             f"Invalid type for 'language_comment_overrides': expected a dictionary, but got {type(overrides).__name__}."
         )
     
@@ -303,20 +483,25 @@ def validate_language_comment_overrides(overrides: Dict[str, str]) -> None:
         # Empty overrides are valid - fall back to built-in defaults
         return
     
-    for extension, style in overrides.items():
-        # Validate extension format
-        if not extension.startswith('.'):
-            raise click.ClickException(
-                f"Invalid extension '{extension}' in language_comment_overrides. "
-                "Extensions must start with '.' (e.g., '.py', '.js')."
-            )
-        
-        # Validate style value
-        if style not in VALID_COMMENT_OVERRIDE_STYLES:
-            raise click.ClickException(
-                f"Invalid comment style '{style}' for extension '{extension}' in language_comment_overrides. "
-                f"Valid styles are: {VALID_COMMENT_OVERRIDE_STYLES}"
-            )
+    # Validate extension format
+    bad_extensions = [ext for ext in overrides if not ext.startswith('.')]
+    if bad_extensions:
+        raise _config_error(
+            f"Invalid extension '{bad_extensions[0]}' in language_comment_overrides. "
+            "Extensions must start with '.' (e.g., '.py', '.js')."
+        )
+    
+    # Validate style values
+    bad_styles = [
+        (ext, style) for ext, style in overrides.items()
+        if not _is_one_of(style, _COMMENT_OVERRIDE_STYLE_SET)
+    ]
+    if bad_styles:
+        extension, style = bad_styles[0]
+        raise _config_error(
+            f"Invalid comment style '{style}' for extension '{extension}' in language_comment_overrides. "
+            f"Valid styles are: {VALID_COMMENT_OVERRIDE_STYLES}"
+        )
 
 
 def merge_config(
@@ -345,22 +530,7 @@ def merge_config(
         repo_root = find_repo_root(Path.cwd())
     
     # Start with defaults from Config dataclass
-    config_data = {
-        'include_extensions': ['.py', '.js', '.ts', '.java', '.cpp', '.c', '.h', '.cs', '.rs'],
-        'exclude_paths': ['node_modules', '.git', '__pycache__', 'venv', 'env', '.venv', 'dist', 'build'],
-        'output_dir': None,
-        'dry_run': False,
-        'mode': 'apply',
-        'path': '.',
-        'strict': False,
-        'wrap_comments': True,
-        'fallback_comment_style': 'hash',
-        'use_block_comments': False,
-        'header_version': 'v2',
-        'upgrade_from_header': None,
-        'upgrade_to_header': None,
-        'language_comment_overrides': {},
-    }
+    config_data = dict(_DEFAULT_CONFIG)
     
     # Load config file if specified or if default exists
     config_file_data = {}
@@ -372,42 +542,26 @@ def merge_config(
             validate_path_in_repo(config_path, repo_root, "Configuration file path")
         config_file_data = load_config_file(config_path)
     else:
-        # Check for default config file
+        # Check for default config file; opening it is the existence probe
         default_config = repo_root / 'license-header.config.json'
-        if default_config.exists():
-            config_file_data = load_config_file(default_config)
+        config_file_data = load_config_file(default_config, missing_ok=True)
+        if config_file_data is not None:
             logger.info(f"Using default configuration file: {default_config}")
     
     # Merge: config file overrides defaults
     if config_file_data:
-        # Map config file keys to internal keys
-        for key in ['include_extensions', 'exclude_paths', 'output_dir', 'header_file',
-                    'wrap_comments', 'fallback_comment_style', 'use_block_comments',
-                    'header_version', 'upgrade_from_header', 'upgrade_to_header',
-                    'language_comment_overrides']:
-            if key in config_file_data and config_file_data[key] is not None:
+        # Only keys present in the file are visited
+        for key in _CONFIG_FILE_KEYS.intersection(config_file_data):
+            if config_file_data[key] is not None:
                 config_data[key] = config_file_data[key]
     
     # Merge: CLI args override everything
     for key, value in cli_args.items():
-        if value is not None:
-            # Handle special CLI argument names
-            if key == 'include_extension':
-                # CLI can pass multiple --include-extension flags
-                if value:
-                    config_data['include_extensions'] = value
-            elif key == 'exclude_path':
-                # CLI can pass multiple --exclude-path flags
-                if value:
-                    config_data['exclude_paths'] = value
-            elif key == 'header':
-                config_data['header_file'] = value
-            elif key == 'no_wrap_comments':
-                # Handle the --no-wrap-comments flag
-                if value:
-                    config_data['wrap_comments'] = False
-            else:
-                config_data[key] = value
+        if value is None or (not value and key in _CLI_IF_SET_KEYS):
+            continue
+        if key in _CLI_FLAG_VALUES:
+            key, value = _CLI_FLAG_VALUES[key]
+        config_data[_CLI_KEY_MAP.get(key, key)] = value
     
     # Validate required fields - check for default LICENSE_HEADER if not specified
     if 'header_file' not in config_data:
@@ -416,7 +570,7 @@ def merge_config(
             config_data['header_file'] = 'LICENSE_HEADER'
             logger.info(f"Using default header file: {default_header}")
         else:
-            raise click.ClickException(
+            raise _config_error(
                 "Header file is required. Specify it via:\n"
                 "  - CLI flag: --header <path>\n"
                 "  - Config file: 'header_file' key\n"
@@ -424,14 +578,21 @@ def merge_config(
             )
     
     # Validate fallback comment style
-    valid_fallback_styles = ['hash', 'slash', 'none']
-    if config_data['fallback_comment_style'] not in valid_fallback_styles:
+    if not _is_one_of(config_data['fallback_comment_style'], _FALLBACK_COMMENT_STYLE_SET):
         logger.warning(
             f"Invalid fallback_comment_style '{config_data['fallback_comment_style']}'. "
-            f"Using 'hash'. Valid options: {valid_fallback_styles}"
+            f"Using 'hash'. Valid options: {VALID_FALLBACK_COMMENT_STYLES}"
         )
         config_data['fallback_comment_style'] = 'hash'
     
+    # Validate concurrency backend
+    if not _is_one_of(config_data['parallel'], _PARALLEL_MODE_SET):
+        logger.warning(
+            f"Invalid parallel mode '{config_data['parallel']}'. "
+            f"Using 'process'. Valid options: {VALID_PARALLEL_MODES}"
+        )
+        config_data['parallel'] = 'process'
+    
     # Validate and warn about extensions and patterns
     validate_extensions(config_data['include_extensions'])
     validate_exclude_patterns(config_data['exclude_paths'])
@@ -447,8 +608,7 @@ def merge_config(
     validate_upgrade_config(upgrade_from, upgrade_to, mode)
     
     # Validate language comment overrides
-    language_overrides = config_data.get('language_comment_overrides', {})
-    validate_language_comment_overrides(language_overrides)
+    validate_language_comment_overrides(config_data['language_comment_overrides'])
     
     # Validate upgrade header paths are within repo if specified
     if upgrade_from:
@@ -463,24 +623,11 @@ def merge_config(
             upgrade_to_path = repo_root / upgrade_to_path
         validate_path_in_repo(upgrade_to_path, repo_root, "Upgrade target header path")
     
-    # Create Config object
-    config = Config(
-        header_file=config_data['header_file'],
-        include_extensions=config_data['include_extensions'],
-        exclude_paths=config_data['exclude_paths'],
-        output_dir=config_data.get('output_dir'),
-        dry_run=config_data.get('dry_run', False),
-        mode=config_data.get('mode', 'apply'),
-        path=config_data.get('path', '.'),
-        strict=config_data.get('strict', False),
-        wrap_comments=config_data.get('wrap_comments', True),
-        fallback_comment_style=config_data.get('fallback_comment_style', 'hash'),
-        use_block_comments=config_data.get('use_block_comments', False),
-        header_version=header_version,
-        upgrade_from_header=upgrade_from,
-        upgrade_to_header=upgrade_to,
-        language_comment_overrides=language_overrides,
-    )
+    # Create Config object with its own copies of the mutable values
+    config_data['include_extensions'] = list(config_data['include_extensions'])
+    config_data['exclude_paths'] = list(config_data['exclude_paths'])
+    config_data['language_comment_overrides'] = dict(config_data['language_comment_overrides'])
+    config = Config(**{name: config_data[name] for name in _CONFIG_INIT_FIELDS})
     
     # Store repo root
     config._repo_root = repo_root
@@ -495,7 +642,9 @@ def merge_config(
             output_path = repo_root / output_path
         validate_path_in_repo(output_path, repo_root, "Output directory")
     
-    logger.info(f"Configuration loaded successfully: {config}")
+    # The Config repr lists every setting; only build it if it will be logged
+    if logger.isEnabledFor(logging.INFO):
+        logger.info(f"Configuration loaded successfully: {config}")
     return config
 
 
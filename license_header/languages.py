@@ -19,16 +19,21 @@ for multi-language header wrapping support.
 """
 
 import logging
-from dataclasses import dataclass, field
-from typing import Dict, List, Optional
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class CommentStyle:
     """Describes comment syntax for a programming language.
     
+    Instances are immutable and hashable, so wrapped headers can be
+    memoized per style.
+    
     Attributes:
         line_prefix: Prefix for line comments (e.g., '# ' for Python, '// ' for C)
         block_start: Start marker for block comments (e.g., '/*' for C)
@@ -55,7 +60,7 @@ class CommentStyle:
         return self.block_start is not None and self.block_end is not None
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class LanguageInfo:
     """Information about a programming language.
     
@@ -66,7 +71,7 @@ class LanguageInfo:
         preferred_style: Preferred comment style ('line' or 'block')
     """
     name: str
-    extensions: List[str]
+    extensions: Tuple[str, ...]
     comment_style: CommentStyle
     preferred_style: str = 'line'
 
@@ -96,49 +101,49 @@ RUST_STYLE = CommentStyle(
 DEFAULT_LANGUAGES: Dict[str, LanguageInfo] = {
     'python': LanguageInfo(
         name='Python',
-        extensions=['.py', '.pyi', '.pyw'],
+        extensions=('.py', '.pyi', '.pyw'),
         comment_style=PYTHON_STYLE,
         preferred_style='line',
     ),
     'c': LanguageInfo(
         name='C',
-        extensions=['.c', '.h'],
+        extensions=('.c', '.h'),
         comment_style=C_STYLE,
         preferred_style='line',
     ),
     'cpp': LanguageInfo(
         name='C++',
-        extensions=['.cpp', '.hpp', '.cc', '.hh', '.cxx', '.hxx'],
+        extensions=('.cpp', '.hpp', '.cc', '.hh', '.cxx', '.hxx'),
         comment_style=C_STYLE,
         preferred_style='line',
     ),
     'csharp': LanguageInfo(
         name='C#',
-        extensions=['.cs'],
+        extensions=('.cs',),
         comment_style=C_STYLE,
         preferred_style='line',
     ),
     'java': LanguageInfo(
         name='Java',
-        extensions=['.java'],
+        extensions=('.java',),
         comment_style=C_STYLE,
         preferred_style='line',
     ),
     'javascript': LanguageInfo(
         name='JavaScript',
-        extensions=['.js', '.mjs', '.cjs'],
+        extensions=('.js', '.mjs', '.cjs'),
         comment_style=C_STYLE,
         preferred_style='line',
     ),
     'typescript': LanguageInfo(
         name='TypeScript',
-        extensions=['.ts', '.mts', '.cts', '.tsx'],
+        extensions=('.ts', '.mts', '.cts', '.tsx'),
         comment_style=C_STYLE,
         preferred_style='line',
     ),
     'rust': LanguageInfo(
         name='Rust',
-        extensions=['.rs'],
+        extensions=('.rs',),
         comment_style=RUST_STYLE,
         preferred_style='line',
     ),
@@ -162,10 +167,11 @@ def build_extension_map(languages: Dict[str, LanguageInfo]) -> Dict[str, str]:
     for lang_name, lang_info in languages.items():
         for ext in lang_info.extensions:
             ext_lower = ext.lower()
-            if ext_lower in ext_map:
+            previous = ext_map.get(ext_lower)
+            if previous is not None and previous != lang_name:
                 logger.warning(
                     f"Extension '{ext}' is mapped to multiple languages: "
-                    f"'{ext_map[ext_lower]}' and '{lang_name}'. Using '{lang_name}'."
+                    f"'{previous}' and '{lang_name}'. Using '{lang_name}'."
                 )
             ext_map[ext_lower] = lang_name
     return ext_map
@@ -174,6 +180,34 @@ def build_extension_map(languages: Dict[str, LanguageInfo]) -> Dict[str, str]:
 # Default extension-to-language mapping
 DEFAULT_EXTENSION_MAP = build_extension_map(DEFAULT_LANGUAGES)
 
+# Default extension straight to its LanguageInfo, so lookups with the
+# default tables take one dict hit instead of two
+_DEFAULT_EXTENSION_INFO: Dict[str, LanguageInfo] = {
+    ext: DEFAULT_LANGUAGES[lang_name] for ext, lang_name in DEFAULT_EXTENSION_MAP.items()
+}
+
+# Default extension straight to its CommentStyle
+_DEFAULT_EXTENSION_STYLE: Dict[str, CommentStyle] = {
+    ext: info.comment_style for ext, info in _DEFAULT_EXTENSION_INFO.items()
+}
+
+
+@lru_cache(maxsize=256)
+def _normalize_extension(extension: str) -> str:
+    """
+    Lowercase an extension and ensure it has a leading dot, once per spelling.
+    
+    Args:
+        extension: File extension (with or without leading dot)
+        
+    Returns:
+        Normalized extension, e.g. '.py'
+    """
+    ext = extension.lower()
+    if not ext.startswith('.'):
+        ext = '.' + ext
+    return ext
+
 
 def get_language_for_extension(
     extension: str,
@@ -191,16 +225,15 @@ def get_language_for_extension(
     Returns:
         LanguageInfo for the extension, or None if not found
     """
+    ext = _normalize_extension(extension)
+    if extension_map is None and languages is None:
+        return _DEFAULT_EXTENSION_INFO.get(ext)
+    
     if extension_map is None:
         extension_map = DEFAULT_EXTENSION_MAP
     if languages is None:
         languages = DEFAULT_LANGUAGES
     
-    # Ensure extension has leading dot and is lowercase
-    ext = extension.lower()
-    if not ext.startswith('.'):
-        ext = '.' + ext
-    
     lang_name = extension_map.get(ext)
     if lang_name is None:
         return None
@@ -232,24 +265,44 @@ def get_comment_style_for_extension(
         CommentStyle for the extension, fallback style if not found, or None
         if fallback_style was explicitly set to None
     """
-    # Use default fallback if not specified (using sentinel)
-    if fallback_style is _USE_DEFAULT_FALLBACK:
-        fallback_style = DEFAULT_FALLBACK_STYLE
-    
-    lang_info = get_language_for_extension(extension, extension_map, languages)
-    if lang_info is None:
-        logger.debug(f"Using fallback comment style for extension '{extension}'")
-        return fallback_style
+    if extension_map is None and languages is None:
+        style = _DEFAULT_EXTENSION_STYLE.get(_normalize_extension(extension))
+        if style is not None:
+            return style
+    else:
+        lang_info = get_language_for_extension(extension, extension_map, languages)
+        if lang_info is not None:
+            return lang_info.comment_style
     
-    return lang_info.comment_style
+    logger.debug(f"Using fallback comment style for extension '{extension}'")
+    # Use default fallback if not specified (using sentinel); only unknown
+    # extensions get this far
+    if fallback_style is _USE_DEFAULT_FALLBACK:
+        return DEFAULT_FALLBACK_STYLE
+    return fallback_style
+
+
+# Comment prefixes that mark a header as already wrapped, in match priority order
+COMMENT_MARKER_PREFIXES = ('#', '//', '/*', '*', '<!--', '"""', "'''", ';', '--')
 
+# Finds which prefix a line starts with in one match; the alternation keeps
+# the priority order above
+_COMMENT_MARKER_RE = re.compile('|'.join(re.escape(prefix) for prefix in COMMENT_MARKER_PREFIXES))
 
+# Line starts accepted after a block comment opener or continuation; every
+# other prefix must simply repeat on each line
+_BLOCK_MARKER_LINE_STARTS = {'/*': ('*', '/*'), '*': ('*',)}
+
+
+@lru_cache(maxsize=64)
 def is_header_already_wrapped(header_text: str) -> bool:
     """
     Detect if a header already has comment markers.
     
     This checks if all non-empty lines start with a consistent comment prefix,
     which indicates it was already wrapped and should not be wrapped again.
+    Results are memoized per header text, since a run checks the same
+    header for every comment style it wraps.
     
     Args:
         header_text: Header text to check
@@ -262,50 +315,23 @@ def is_header_already_wrapped(header_text: str) -> bool:
     
     lines = header_text.strip().splitlines()
     if not lines:
-        return False
-    
-    # Find first non-empty line to determine the potential comment prefix
-    first_line_stripped = ''
-    for line in lines:
-        if line.strip():
-            first_line_stripped = line.lstrip()
-            break
-    
-    if not first_line_stripped:
         return False  # Header is all whitespace
     
-    # Common comment prefixes
-    comment_prefixes = ['#', '//', '/*', '*', '<!--', '"""', "'''", ';', '--']
-    
-    # Find which prefix the first line uses
-    detected_prefix = None
-    for prefix in comment_prefixes:
-        if first_line_stripped.startswith(prefix):
-            detected_prefix = prefix
-            break
-    
-    if detected_prefix is None:
+    # After strip() the first line is the first non-empty one and has no
+    # leading whitespace; its prefix is detected with one precompiled match
+    match = _COMMENT_MARKER_RE.match(lines[0])
+    if match is None:
         return False  # First line doesn't start with a comment prefix
     
-    # Check that all non-empty lines start with the same prefix
-    for line in lines:
-        stripped = line.strip()
-        if stripped:
-            # For block comment style, allow lines starting with * or the detected prefix
-            if detected_prefix == '/*':
-                # Block comment start - check if other lines start with * or */
-                if not (stripped.startswith('*') or stripped.startswith('/*')):
-                    return False
-            elif detected_prefix == '*':
-                # Inside block comment - allow * and */
-                if not stripped.startswith('*'):
-                    return False
-            else:
-                # Line comment - all lines must start with same prefix
-                if not stripped.startswith(detected_prefix):
-                    return False
+    detected_prefix = match.group()
+    allowed_starts = _BLOCK_MARKER_LINE_STARTS.get(detected_prefix, detected_prefix)
     
-    return True
+    # Check that all non-empty lines start with the same prefix
+    return all(
+        stripped.startswith(allowed_starts)
+        for stripped in map(str.strip, lines)
+        if stripped
+    )
 
 
 def wrap_header_with_comments(
@@ -334,6 +360,29 @@ def wrap_header_with_comments(
     if comment_style is None:
         raise ValueError("comment_style parameter cannot be None")
     
+    return _wrap_header_cached(header_text, comment_style, use_block_comments)
+
+
+@lru_cache(maxsize=128)
+def _wrap_header_cached(
+    header_text: str,
+    comment_style: CommentStyle,
+    use_block_comments: bool
+) -> str:
+    """
+    Wrap a header once per (header, style, block setting).
+    
+    Many extensions share a comment style, so runs over mixed trees wrap
+    the same header with the same style repeatedly.
+    
+    Args:
+        header_text: Raw header text without comment markers
+        comment_style: Comment style to use
+        use_block_comments: If True, use block comments instead of line comments
+        
+    Returns:
+        Header text wrapped with appropriate comment syntax
+    """
     # Check if header already has comment markers
     if is_header_already_wrapped(header_text):
         logger.debug("Header already has comment markers, skipping wrapping")
@@ -343,28 +392,29 @@ def wrap_header_with_comments(
     lines = header_text.rstrip().splitlines()
     
     if use_block_comments and comment_style.supports_block_comments():
-        # Use block comment style
-        result_lines = [comment_style.block_start]
+        # Use block comment style; empty lines just get the prefix stripped
         line_prefix = comment_style.block_line_prefix or ' * '
-        for line in lines:
-            if line.strip():
-                result_lines.append(f"{line_prefix}{line}")
-            else:
-                # Empty lines in block comments just get the prefix stripped
-                result_lines.append(line_prefix.rstrip())
-        result_lines.append(comment_style.block_end)
-        return '\n'.join(result_lines) + '\n'
+        bare_prefix = line_prefix.rstrip()
+        # The trailing '' makes join emit the final newline, so the result
+        # is built in one allocation
+        return '\n'.join([
+            comment_style.block_start,
+            *(line_prefix + line if line and not line.isspace() else bare_prefix for line in lines),
+            comment_style.block_end,
+            '',
+        ])
     
     elif comment_style.supports_line_comments():
-        # Use line comment style
-        result_lines = []
-        for line in lines:
-            if line.strip():
-                result_lines.append(f"{comment_style.line_prefix}{line}")
-            else:
-                # Empty lines just get the comment prefix (stripped of trailing space)
-                result_lines.append(comment_style.line_prefix.rstrip())
-        return '\n'.join(result_lines) + '\n'
+        # Use line comment style; empty lines just get the comment prefix
+        # (stripped of trailing space)
+        line_prefix = comment_style.line_prefix
+        bare_prefix = line_prefix.rstrip()
+        if not lines:
+            return '\n'
+        return '\n'.join([
+            *(line_prefix + line if line and not line.isspace() else bare_prefix for line in lines),
+            '',
+        ])
     
     else:
         # No comment style available, return header as-is
@@ -390,6 +440,29 @@ def unwrap_header_comments(
         Raw header text without comment markers
     """
     lines = wrapped_header.rstrip().splitlines()
+    
+    # Everything derived from the style is constant across lines
+    line_prefix = comment_style.line_prefix
+    line_prefix_bare = line_prefix.rstrip() if line_prefix else None
+    
+    if not comment_style.supports_block_comments():
+        # Line comments only: strip the prefix, with or without its
+        # trailing space (a bare prefix is an empty comment line)
+        if line_prefix:
+            result_lines = [
+                line[len(line_prefix):] if line.startswith(line_prefix)
+                else '' if line.startswith(line_prefix_bare)
+                else line
+                for line in lines
+            ]
+        else:
+            result_lines = lines
+        return '\n'.join(result_lines).rstrip() + '\n' if result_lines else ''
+    
+    block_start = comment_style.block_start.strip()
+    block_end = comment_style.block_end.strip()
+    block_prefix = comment_style.block_line_prefix
+    block_prefix_stripped = block_prefix.strip() if block_prefix else None
     result_lines = []
     in_block = False
     
@@ -397,45 +470,77 @@ def unwrap_header_comments(
         stripped = line.strip()
         
         # Check for block comment markers
-        if comment_style.supports_block_comments():
-            if stripped == comment_style.block_start.strip():
-                in_block = True
-                continue
-            if stripped == comment_style.block_end.strip():
-                in_block = False
-                continue
-            
-            if in_block:
-                # Remove block line prefix
-                prefix = comment_style.block_line_prefix
-                if prefix and line.startswith(prefix):
-                    result_lines.append(line[len(prefix):])
-                elif prefix and line.strip().startswith(prefix.strip()):
-                    result_lines.append(line.strip()[len(prefix.strip()):].lstrip())
-                else:
-                    result_lines.append(line)
-                continue
+        if stripped == block_start:
+            in_block = True
+            continue
+        if stripped == block_end:
+            in_block = False
+            continue
         
-        # Check for line comment prefix
-        if comment_style.supports_line_comments():
-            prefix = comment_style.line_prefix
-            if prefix:
-                # Handle both with and without trailing space
-                if line.startswith(prefix):
-                    result_lines.append(line[len(prefix):])
-                elif line.startswith(prefix.rstrip()):
-                    # Empty comment line
-                    result_lines.append('')
-                else:
-                    result_lines.append(line)
+        if in_block:
+            # Remove block line prefix
+            if block_prefix and line.startswith(block_prefix):
+                result_lines.append(line[len(block_prefix):])
+            elif block_prefix and stripped.startswith(block_prefix_stripped):
+                result_lines.append(stripped[len(block_prefix_stripped):].lstrip())
             else:
                 result_lines.append(line)
+        elif line_prefix and line.startswith(line_prefix):
+            result_lines.append(line[len(line_prefix):])
+        elif line_prefix and line.startswith(line_prefix_bare):
+            # Empty comment line
+            result_lines.append('')
         else:
             result_lines.append(line)
     
     return '\n'.join(result_lines).rstrip() + '\n' if result_lines else ''
 
 
+# Styles detect_header_comment_style checks by default, in priority order
+_DEFAULT_DETECT_STYLES = (PYTHON_STYLE, C_STYLE, RUST_STYLE)
+
+# Leading whitespace str.lstrip() would remove
+_LEADING_WHITESPACE_RE = re.compile(r'\s*')
+
+
+@lru_cache(maxsize=16)
+def _compile_style_detector(
+    styles: Tuple[CommentStyle, ...]
+) -> Optional[Tuple[re.Pattern, Dict[str, CommentStyle]]]:
+    """
+    Compile the header markers of a set of styles into one alternation.
+    
+    For each style in order, its block start, line prefix, and line prefix
+    without trailing space are tried in turn. Regex alternation takes the
+    first alternative that matches, so the match picks the same style a
+    loop over the styles would.
+    
+    Args:
+        styles: Comment styles in priority order
+        
+    Returns:
+        Tuple of (compiled pattern, marker -> style), or None if no style
+        has any marker
+    """
+    styles_by_marker: Dict[str, CommentStyle] = {}
+    for style in styles:
+        markers = [style.block_start] if style.block_start else []
+        if style.line_prefix:
+            markers += [style.line_prefix, style.line_prefix.rstrip()]
+        for marker in markers:
+            styles_by_marker.setdefault(marker, style)
+    
+    if not styles_by_marker:
+        return None
+    pattern = re.compile('|'.join(re.escape(marker) for marker in styles_by_marker))
+    return pattern, styles_by_marker
+
+
+# Detector for the default styles, built once so default calls skip
+# hashing the style tuple
+_DEFAULT_STYLE_DETECTOR = _compile_style_detector(_DEFAULT_DETECT_STYLES)
+
+
 def detect_header_comment_style(
     content: str,
     known_styles: Optional[List[CommentStyle]] = None
@@ -453,26 +558,21 @@ def detect_header_comment_style(
     Returns:
         Detected CommentStyle or None if no comments detected
     """
-    if known_styles is None:
-        known_styles = [PYTHON_STYLE, C_STYLE, RUST_STYLE]
-    
-    first_lines = content.lstrip().splitlines()[:10]  # Check first 10 lines
-    if not first_lines:
+    # Only the first non-blank line matters; slice it out without copying
+    # or splitting the rest of the file
+    start = _LEADING_WHITESPACE_RE.match(content).end()
+    if start == len(content):
         return None
+    end = content.find('\n', start)
+    first_line = content[start:end if end >= 0 else len(content)].splitlines()[0]
     
-    first_line = first_lines[0]
-    
-    for style in known_styles:
-        # Check for block comment start (use full prefix for exact matching)
-        if style.block_start and first_line.lstrip().startswith(style.block_start):
-            return style
-        
-        # Check for line comment prefix (use full prefix to avoid false positives)
-        if style.line_prefix and first_line.startswith(style.line_prefix):
-            return style
-        
-        # Also check without leading space (for lines that just have the comment marker)
-        if style.line_prefix and first_line.startswith(style.line_prefix.rstrip()):
-            return style
+    if known_styles is None:
+        detector = _DEFAULT_STYLE_DETECTOR
+    else:
+        detector = _compile_style_detector(tuple(known_styles))
+    if detector is None:
+        return None
+    pattern, styles_by_marker = detector
     
-    return None
+    match = pattern.match(first_line)
+    return styles_by_marker[match.group()] if match else None
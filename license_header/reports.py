@@ -27,6 +27,13 @@ from typing import List, Union, Optional
 from .apply import ApplyResult, UpgradeResult
 from .check import CheckResult
 
+# orjson is optional; when installed it serializes large reports several
+# times faster than the json module, with byte-identical output
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
 
@@ -42,23 +49,53 @@ def _format_file_list(files: List[Path], repo_root: Optional[Path] = None, limit
     Returns:
         List of formatted file path strings
     """
-    formatted = []
     files_to_format = files[:limit] if limit else files
+    if not repo_root:
+        return [str(file_path) for file_path in files_to_format]
+    
+    # Scanned paths are built by joining names onto the root, so a plain
+    # string prefix check handles almost every file without relative_to
+    root_prefix = os.path.join(str(repo_root), '')
+    prefix_len = len(root_prefix)
     
+    formatted = []
     for file_path in files_to_format:
-        if repo_root:
-            try:
-                rel_path = file_path.relative_to(repo_root)
-                formatted.append(str(rel_path))
-            except ValueError:
-                # File is not relative to repo root
-                formatted.append(str(file_path))
-        else:
-            formatted.append(str(file_path))
+        path = str(file_path)
+        if path.startswith(root_prefix):
+            formatted.append(path[prefix_len:])
+            continue
+        try:
+            rel_path = file_path.relative_to(repo_root)
+            formatted.append(str(rel_path))
+        except ValueError:
+            # File is not relative to repo root
+            formatted.append(path)
     
     return formatted
 
 
+def _dump_json(data: dict) -> bytes:
+    """
+    Serialize report data as indented UTF-8 JSON.
+    
+    Uses orjson when it is installed, falling back to the json module for
+    data orjson rejects (such as strings with lone surrogates) so those
+    fail the same way with or without it.
+    
+    Args:
+        data: Report data
+        
+    Returns:
+        JSON document as bytes
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+        except orjson.JSONEncodeError:
+            pass
+    return json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8')
+
+
 def generate_json_report(
     result: Union[ApplyResult, CheckResult, UpgradeResult],
     output_path: Path,
@@ -131,7 +168,7 @@ def generate_json_report(
                 'scanned': result.total_scanned(),
                 'eligible': result.total_eligible(),
                 'compliant': len(result.compliant_files),
-                'non_compliant': len(result.non_compliant_files),
+                'non_compliant': result.non_compliant_count(),
                 'skipped': len(result.skipped_files),
                 'failed': len(result.failed_files),
             },
@@ -143,13 +180,16 @@ def generate_json_report(
             }
         }
     
+    # Serialize before opening the file, so an encoding error cannot leave
+    # a truncated report behind
+    content = _dump_json(report_data)
+    
     try:
         # Ensure parent directory exists
         output_path.parent.mkdir(parents=True, exist_ok=True)
         
         # Write JSON report
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(report_data, f, indent=2, ensure_ascii=False)
+        output_path.write_bytes(content)
         
         logger.info(f"JSON report written to {output_path}")
     
@@ -285,7 +325,7 @@ def generate_markdown_report(
         lines.append(f"- **Scanned:** {result.total_scanned()}")
         lines.append(f"- **Eligible:** {result.total_eligible()}")
         lines.append(f"- **Compliant:** {len(result.compliant_files)}")
-        lines.append(f"- **Non-Compliant:** {len(result.non_compliant_files)}")
+        lines.append(f"- **Non-Compliant:** {result.non_compliant_count()}")
         lines.append(f"- **Skipped:** {len(result.skipped_files)}")
         lines.append(f"- **Failed:** {len(result.failed_files)}")
         lines.append("")
@@ -18,11 +18,15 @@ Provides deterministic repository traversal to identify eligible source files
 based on configured extensions, excludes, and binary detection.
 """
 
+import fnmatch
+import itertools
 import logging
 import os
+import re
 from dataclasses import dataclass, field
-from pathlib import Path
-from typing import List
+from functools import lru_cache
+from pathlib import Path, PurePath
+from typing import Callable, Dict, Iterator, List, Mapping, Optional, Set, Tuple
 
 logger = logging.getLogger(__name__)
 
@@ -40,7 +44,7 @@ DEFAULT_EXCLUDE_DIRS = [
 ]
 
 
-@dataclass
+@dataclass(slots=True)
 class ScanResult:
     """Result of a repository scan."""
     
@@ -50,6 +54,23 @@ class ScanResult:
     skipped_symlink: List[Path] = field(default_factory=list)
     skipped_permission: List[Path] = field(default_factory=list)
     skipped_extension: List[Path] = field(default_factory=list)
+    # Size in bytes, modification time (ns), and st_mode of each eligible
+    # file, as seen during the scan
+    file_sizes: Dict[Path, int] = field(default_factory=dict)
+    file_mtimes: Dict[Path, int] = field(default_factory=dict)
+    file_modes: Dict[Path, int] = field(default_factory=dict)
+    # Eligible files whose stat matched a known_text_files entry
+    unchanged_files: Set[Path] = field(default_factory=set)
+    
+    def skipped_files(self) -> List[Path]:
+        """Return all skipped files in one list, grouped by reason."""
+        return list(itertools.chain(
+            self.skipped_binary,
+            self.skipped_excluded,
+            self.skipped_symlink,
+            self.skipped_permission,
+            self.skipped_extension,
+        ))
     
     def total_files(self) -> int:
         """Return total number of files scanned."""
@@ -77,19 +98,19 @@ def is_binary_file(file_path: Path) -> bool:
         True if file appears to be binary, False otherwise
     """
     try:
-        from license_header.utils import detect_bom
+        from license_header.utils import detect_bom_in_bytes, read_file_prefix
+        
+        # Read first 8KB once for both the BOM and the binary content checks
+        chunk = read_file_prefix(file_path, 8192)
         
         # Check for BOM first - if present, it's a text file with specific encoding
-        bom, encoding = detect_bom(file_path)
+        bom, encoding = detect_bom_in_bytes(chunk)
         if bom is not None:
             # File has BOM, treat as text
             return False
         
-        # Read first 8KB to check for binary content
-        with open(file_path, 'rb') as f:
-            chunk = f.read(8192)
-            # Check for null bytes which indicate binary content
-            return b'\x00' in chunk
+        # Check for null bytes which indicate binary content
+        return b'\x00' in chunk
     except (OSError, IOError) as e:
         logger.warning(f"Could not read file for binary detection {file_path}: {e}")
         # If we can't read it, treat it as binary to be safe
@@ -99,58 +120,86 @@ def is_binary_file(file_path: Path) -> bool:
 # Recursive wildcard prefix used in glob patterns
 _RECURSIVE_PREFIX = '**/'
 
+# Windows paths compare case-insensitively, as PurePath.match does there
+_GLOB_FLAGS = re.IGNORECASE if os.name == 'nt' else 0
 
-def _try_directory_patterns(rel_path: Path, pattern: str) -> bool:
+
+def _glob_variants(pattern: str) -> List[str]:
     """
-    Try matching a pattern as a directory by adding directory wildcards.
+    List the globs an exclude pattern is matched as.
+    
+    Patterns that don't end with a wildcard are also tried as a directory,
+    so 'vendor' or '**/vendor' matches 'vendor/file.js', and patterns
+    starting with '**/' are also tried without it, so '**/vendor' matches
+    at the root.
     
     Args:
-        rel_path: Path relative to repository root
-        pattern: Pattern to try
+        pattern: Exclude pattern
         
     Returns:
-        True if any directory variant matches, False otherwise
+        Glob patterns to match with PurePath.match semantics
     """
-    # Try both recursive and single-level directory patterns
-    for suffix in ('/**', '/*'):
-        if rel_path.match(pattern + suffix):
-            return True
-    return False
+    variants = [pattern]
+    if not pattern.endswith('*'):
+        # '/**' and '/*' match the same one trailing component
+        variants.append(pattern + '/*')
+        if pattern.startswith(_RECURSIVE_PREFIX):
+            variants.append(pattern[len(_RECURSIVE_PREFIX):] + '/*')
+    return variants
 
 
-def _matches_glob_pattern(rel_path: Path, pattern: str) -> bool:
+@lru_cache(maxsize=32)
+def _compile_exclude_patterns(exclude_patterns: Tuple[str, ...]) -> Callable[[Tuple[str, ...]], bool]:
     """
-    Check if a relative path matches a glob pattern.
+    Compile exclude patterns once for matching many paths.
     
-    Handles both explicit glob patterns and directory-based patterns by trying
-    multiple variations.
+    Memoized per pattern tuple, so repeated scans and per-path
+    matches_exclude_pattern calls with the same excludes share one matcher.
+    Each glob is split into components, and each component into a regex, the
+    way PurePath.match compares them: right-aligned, one path component per
+    glob component, so '*' and '**' never cross a separator. Absolute and
+    empty globs never match a relative path and are dropped. A pattern equal
+    to any path component matches as a plain directory name.
     
     Args:
-        rel_path: Path relative to repository root
-        pattern: Glob pattern to match against
+        exclude_patterns: Tuple of exclude patterns/globs
         
     Returns:
-        True if the path matches the pattern, False otherwise
+        Function that takes the components of a path relative to the
+        repository root and returns True if any pattern matches it
     """
-    # Direct match
-    if rel_path.match(pattern):
-        return True
+    names = frozenset(exclude_patterns)
     
-    # For patterns that don't end with wildcards, also try matching as directory patterns
-    # This allows patterns like 'vendor' or '**/vendor' to match 'vendor/file.js'
-    if not pattern.endswith('*'):
-        # Try the pattern as a directory
-        if _try_directory_patterns(rel_path, pattern):
+    # Components are stored last-first, in the order they are compared
+    globs = []
+    seen = set()
+    for pattern in exclude_patterns:
+        for variant in _glob_variants(pattern):
+            pure = PurePath(variant)
+            if pure.anchor or not pure.parts or pure.parts in seen:
+                continue
+            seen.add(pure.parts)
+            globs.append(tuple(
+                re.compile(fnmatch.translate(part), _GLOB_FLAGS).match
+                for part in reversed(pure.parts)
+            ))
+    
+    def matches(parts: Tuple[str, ...]) -> bool:
+        if not names.isdisjoint(parts):
             return True
         
-        # For patterns starting with **, also try without the ** prefix
-        # This handles cases like '**/vendor' matching 'vendor/file.js' at root
-        if pattern.startswith(_RECURSIVE_PREFIX):
-            stripped_pattern = pattern[len(_RECURSIVE_PREFIX):]
-            if _try_directory_patterns(rel_path, stripped_pattern):
+        count = len(parts)
+        for glob in globs:
+            if len(glob) > count:
+                continue
+            for i, match in enumerate(glob, 1):
+                if match(parts[-i]) is None:
+                    break
+            else:
                 return True
+        return False
     
-    return False
+    return matches
 
 
 def matches_exclude_pattern(path: Path, repo_root: Path, exclude_patterns: List[str]) -> bool:
@@ -181,17 +230,7 @@ def matches_exclude_pattern(path: Path, repo_root: Path, exclude_patterns: List[
         # Get path relative to repo root for matching
         rel_path = abs_path.relative_to(abs_repo_root)
         
-        # Check each pattern
-        for pattern in exclude_patterns:
-            # Try glob pattern matching
-            if _matches_glob_pattern(rel_path, pattern):
-                return True
-            
-            # Also check if pattern is a simple directory name that appears in the path
-            # This ensures backward compatibility with simple patterns like 'node_modules'
-            # which should match any occurrence of that directory in the path
-            if pattern in rel_path.parts:
-                return True
+        return _compile_exclude_patterns(tuple(exclude_patterns))(rel_path.parts)
                 
     except ValueError:
         # Path is not relative to repo_root, exclude it
@@ -201,36 +240,60 @@ def matches_exclude_pattern(path: Path, repo_root: Path, exclude_patterns: List[
     return False
 
 
-def scan_repository(
+def _sorted_dir_entries(dir_path: str) -> List[os.DirEntry]:
+    """
+    List a directory in the order its paths sort in.
+    
+    Args:
+        dir_path: Directory to list
+        
+    Returns:
+        Directory entries sorted by name (case-folded where paths are)
+    """
+    with os.scandir(dir_path) as it:
+        entries = list(it)
+    # Path ordering compares normcase'd parts, so a depth-first walk over
+    # names in this order yields paths already sorted
+    entries.sort(key=lambda entry: os.path.normcase(entry.name))
+    return entries
+
+
+def iter_eligible_files(
     root_path: Path,
     include_extensions: List[str],
     exclude_patterns: List[str],
     repo_root: Path,
-) -> ScanResult:
+    result: ScanResult,
+    known_text_files: Optional[Mapping[str, Tuple[int, int]]] = None,
+) -> Iterator[Path]:
     """
-    Scan repository directory tree for eligible source files.
+    Walk the repository and yield eligible source files as they are found.
     
-    Performs an iterative (non-recursive) walk of the directory tree,
-    applying filters for extensions, exclude patterns, binary detection,
-    and symlink handling.
+    Lets callers start processing files while the walk is still running.
+    Eligible files are yielded in sorted order and also appended to
+    result.eligible_files; skipped files and eligible file sizes and
+    mtimes are recorded on result as a side channel.
     
     Args:
         root_path: Root path to start scanning from
         include_extensions: List of file extensions to include (e.g., ['.py', '.js'])
         exclude_patterns: List of path patterns to exclude (in addition to defaults)
         repo_root: Repository root path
+        result: ScanResult that collects skipped files and sizes
+        known_text_files: Optional map of path string to (st_mtime_ns, st_size)
+            for files already known to be text. A file whose stat still
+            matches skips binary detection and is added to
+            result.unchanged_files.
         
-    Returns:
-        ScanResult object with categorized files
+    Yields:
+        Paths of eligible files, in sorted order
         
     Note:
-        - Results are deterministically sorted
         - Symlinks are not followed
         - Binary files are detected and skipped
         - Permission errors are logged but don't abort the scan
+        - Skipped-file lists are sorted once the walk finishes
     """
-    result = ScanResult()
-    
     # Combine default excludes with user patterns
     all_exclude_patterns = DEFAULT_EXCLUDE_DIRS + exclude_patterns
     
@@ -238,106 +301,154 @@ def scan_repository(
     logger.info(f"Include extensions: {include_extensions}")
     logger.info(f"Exclude patterns: {all_exclude_patterns}")
     
-    # Use os.walk for iterative directory traversal
-    # This handles deep directory trees without recursion limits
+    # Resolve the scan root against the repository root once. Symlinked
+    # directories and files are never followed, so every path below the root
+    # resolves to root_rel plus its walk components, and the exclude checks
+    # can extend a tuple of components instead of resolving each path
+    root_str = os.fspath(root_path)
     try:
-        for dirpath_str, dirnames, filenames in os.walk(root_path, topdown=True, followlinks=False):
-            dirpath = Path(dirpath_str)
-            
-            # Skip if this directory matches exclude patterns
-            if matches_exclude_pattern(dirpath, repo_root, all_exclude_patterns):
-                logger.debug(f"Skipping excluded directory: {dirpath}")
-                # Clear dirnames to prevent os.walk from descending
-                dirnames.clear()
+        root_rel = Path(root_path).resolve().relative_to(Path(repo_root).resolve())
+    except ValueError:
+        root_rel = None
+    
+    # Compile the excludes once; paths are tracked as tuples of components
+    # relative to the repository root. A pattern equal to an entry's name
+    # always matches, so names are tested against a set before any globs.
+    is_excluded = _compile_exclude_patterns(tuple(all_exclude_patterns))
+    exclude_names = frozenset(all_exclude_patterns)
+    
+    # Normalize extensions once for case-insensitive comparison
+    normalized_extensions = frozenset(ext.lower() for ext in include_extensions)
+    
+    try:
+        # Skip if the scan root itself is outside the repo or excluded
+        if root_rel is None:
+            logger.warning(f"Path {root_path} is not within repo root {repo_root}")
+            return
+        if is_excluded(root_rel.parts):
+            logger.debug(f"Skipping excluded directory: {root_path}")
+            return
+        
+        # Iterative depth-first walk with an explicit stack of directory
+        # listings; handles deep trees without recursion limits
+        try:
+            stack = [(iter(_sorted_dir_entries(root_str)), root_rel.parts)]
+        except OSError as e:
+            logger.warning(f"Could not list directory {root_path}: {e}")
+            stack = []
+        
+        while stack:
+            entries, dir_rel = stack[-1]
+            entry = next(entries, None)
+            if entry is None:
+                stack.pop()
                 continue
             
-            # Filter out excluded subdirectories from dirnames
-            # Modifying dirnames in-place affects which directories os.walk descends into
-            dirs_to_remove = []
-            for dirname in dirnames:
-                subdir = dirpath / dirname
-                
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                is_dir = False
+            
+            name = entry.name
+            
+            if is_dir:
                 # Check if it's a symlink
-                if subdir.is_symlink():
-                    logger.debug(f"Skipping symlink directory: {subdir}")
-                    dirs_to_remove.append(dirname)
+                if entry.is_symlink():
+                    logger.debug(f"Skipping symlink directory: {entry.path}")
                     continue
                 
                 # Check if it matches exclude patterns
-                if matches_exclude_pattern(subdir, repo_root, all_exclude_patterns):
-                    logger.debug(f"Skipping excluded directory: {subdir}")
-                    dirs_to_remove.append(dirname)
+                subdir_rel = dir_rel + (name,)
+                if name in exclude_names or is_excluded(subdir_rel):
+                    logger.debug(f"Skipping excluded directory: {entry.path}")
                     continue
+                
+                try:
+                    stack.append((iter(_sorted_dir_entries(entry.path)), subdir_rel))
+                except OSError as e:
+                    logger.warning(f"Could not list directory {entry.path}: {e}")
+                continue
             
-            # Remove excluded directories
-            for dirname in dirs_to_remove:
-                dirnames.remove(dirname)
-            
-            # Sort dirnames for deterministic traversal order
-            dirnames.sort()
+            filepath = Path(entry.path)
             
-            # Process files in this directory
-            for filename in sorted(filenames):  # Sort for deterministic order
-                filepath = dirpath / filename
+            try:
+                # The directory listing already knows the entry type, so
+                # skipped files cost no stat call
+                if entry.is_symlink():
+                    logger.debug(f"Skipping symlink file: {filepath}")
+                    result.skipped_symlink.append(filepath)
+                    continue
                 
-                try:
-                    # Skip symlinks
-                    if filepath.is_symlink():
-                        logger.debug(f"Skipping symlink file: {filepath}")
-                        result.skipped_symlink.append(filepath)
-                        continue
-                    
-                    # Check if it's a regular file
-                    if not filepath.is_file():
-                        logger.debug(f"Skipping non-file: {filepath}")
-                        continue
-                    
-                    # Check if file matches exclude patterns
-                    if matches_exclude_pattern(filepath, repo_root, all_exclude_patterns):
-                        logger.debug(f"Skipping excluded file: {filepath}")
-                        result.skipped_excluded.append(filepath)
-                        continue
-                    
-                    # Check file extension
-                    file_ext = filepath.suffix.lower()  # Case-insensitive comparison
-                    
-                    # Normalize extensions in include_extensions for case-insensitive comparison
-                    normalized_extensions = [ext.lower() for ext in include_extensions]
-                    
-                    if file_ext not in normalized_extensions:
-                        logger.debug(f"Skipping file with non-matching extension: {filepath}")
-                        result.skipped_extension.append(filepath)
-                        continue
-                    
-                    # Check if file is binary
-                    if is_binary_file(filepath):
-                        logger.debug(f"Skipping binary file: {filepath}")
-                        result.skipped_binary.append(filepath)
-                        continue
-                    
-                    # File passed all filters - it's eligible
-                    logger.debug(f"Eligible file: {filepath}")
-                    result.eligible_files.append(filepath)
-                    
-                except PermissionError as e:
-                    logger.warning(f"Permission denied reading {filepath}: {e}")
-                    result.skipped_permission.append(filepath)
-                except (OSError, IOError) as e:
-                    logger.warning(f"Error accessing {filepath}: {e}")
-                    result.skipped_permission.append(filepath)
+                # Check if it's a regular file
+                if not entry.is_file(follow_symlinks=False):
+                    logger.debug(f"Skipping non-file: {filepath}")
+                    continue
+                
+                # Check if file matches exclude patterns
+                if name in exclude_names or is_excluded(dir_rel + (name,)):
+                    logger.debug(f"Skipping excluded file: {filepath}")
+                    result.skipped_excluded.append(filepath)
+                    continue
+                
+                # Check file extension (case-insensitive), taken from the name
+                # with the same rule as PurePath.suffix
+                dot_idx = name.rfind('.')
+                file_ext = name[dot_idx:].lower() if 0 < dot_idx < len(name) - 1 else ''
+                
+                if file_ext not in normalized_extensions:
+                    logger.debug(f"Skipping file with non-matching extension: {filepath}")
+                    result.skipped_extension.append(filepath)
+                    continue
+                
+                # Only files with a matching extension need a stat; the size,
+                # mtime, and mode are reused by check, apply, and upgrade
+                st = entry.stat(follow_symlinks=False)
+                stamp = (st.st_mtime_ns, st.st_size)
+                
+                # A file unchanged since it was last seen as text needs no sniff
+                unchanged = (
+                    known_text_files is not None
+                    and known_text_files.get(str(filepath)) == stamp
+                )
+                
+                # Check if file is binary
+                if not unchanged and is_binary_file(filepath):
+                    logger.debug(f"Skipping binary file: {filepath}")
+                    result.skipped_binary.append(filepath)
+                    continue
+                
+            except PermissionError as e:
+                logger.warning(f"Permission denied reading {filepath}: {e}")
+                result.skipped_permission.append(filepath)
+                continue
+            except (OSError, IOError) as e:
+                logger.warning(f"Error accessing {filepath}: {e}")
+                result.skipped_permission.append(filepath)
+                continue
+            
+            # File passed all filters - it's eligible
+            logger.debug(f"Eligible file: {filepath}")
+            result.eligible_files.append(filepath)
+            result.file_sizes[filepath] = st.st_size
+            result.file_mtimes[filepath] = st.st_mtime_ns
+            result.file_modes[filepath] = st.st_mode
+            if unchanged:
+                result.unchanged_files.add(filepath)
+            yield filepath
     
     except PermissionError as e:
         logger.error(f"Permission denied accessing directory {root_path}: {e}")
     except Exception as e:
         logger.error(f"Error scanning directory {root_path}: {e}", exc_info=True)
     
-    # Sort all results for deterministic output
-    result.eligible_files.sort()
-    result.skipped_binary.sort()
-    result.skipped_excluded.sort()
-    result.skipped_symlink.sort()
-    result.skipped_permission.sort()
-    result.skipped_extension.sort()
+    finally:
+        # Sort skipped results for deterministic output; eligible files were
+        # already produced in sorted order
+        result.skipped_binary.sort()
+        result.skipped_excluded.sort()
+        result.skipped_symlink.sort()
+        result.skipped_permission.sort()
+        result.skipped_extension.sort()
     
     logger.info(f"Scan complete: {len(result.eligible_files)} eligible files, "
                 f"{len(result.skipped_binary)} binary, "
@@ -345,5 +456,42 @@ def scan_repository(
                 f"{len(result.skipped_symlink)} symlinks, "
                 f"{len(result.skipped_permission)} permission errors, "
                 f"{len(result.skipped_extension)} wrong extension")
+
+
+def scan_repository(
+    root_path: Path,
+    include_extensions: List[str],
+    exclude_patterns: List[str],
+    repo_root: Path,
+) -> ScanResult:
+    """
+    Scan repository directory tree for eligible source files.
+    
+    Performs an iterative (non-recursive) walk of the directory tree,
+    applying filters for extensions, exclude patterns, binary detection,
+    and symlink handling.
+    
+    Args:
+        root_path: Root path to start scanning from
+        include_extensions: List of file extensions to include (e.g., ['.py', '.js'])
+        exclude_patterns: List of path patterns to exclude (in addition to defaults)
+        repo_root: Repository root path
+        
+    Returns:
+        ScanResult object with categorized files
+        
+    Note:
+        - Results are deterministically sorted
+        - Symlinks are not followed
+        - Binary files are detected and skipped
+        - Permission errors are logged but don't abort the scan
+    """
+    result = ScanResult()
+    
+    for _ in iter_eligible_files(root_path, include_extensions, exclude_patterns, repo_root, result):
+        pass
+    
+    # Sort for deterministic output (already ordered by the walk)
+    result.eligible_files.sort()
     
     return result
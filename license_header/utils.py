@@ -18,9 +18,14 @@ Provides helper functions for BOM detection, shebang handling, and file encoding
 """
 
 import codecs
+import itertools
 import logging
+import mmap
+import os
+from concurrent.futures import Executor
+from functools import partial
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
@@ -51,6 +56,232 @@ BOM_TO_WRITE_ENCODING = {
     BOM_UTF16_BE: 'utf-16-be',
 }
 
+# First bytes of every known BOM; anything else rules a BOM out in one test
+_BOM_LEAD_BYTES = frozenset(bom[0] for bom in BOM_TO_ENCODING)
+
+
+# Minimum number of files before per-file work is dispatched to a pool.
+# Below this, pool start-up costs more than it saves.
+PARALLEL_MIN_FILES = 256
+
+# Number of files handed to a pool worker per task
+PARALLEL_CHUNKSIZE = 32
+
+# Upper bound on I/O threads; per-file work mostly waits on read/write/rename
+MAX_IO_THREADS = 32
+
+# Files at least this large are memory-mapped when only a prefix is needed,
+# so the kernel faults in just the leading pages instead of buffering reads
+MMAP_THRESHOLD = 16 * 1024
+
+# Raw read-only descriptors skip the buffered io stack; close-on-exec keeps
+# them out of any child processes
+_READ_OPEN_FLAGS = os.O_RDONLY | getattr(os, 'O_CLOEXEC', 0) | getattr(os, 'O_BINARY', 0)
+
+
+def _create_executor(parallel: str, file_count: int) -> Optional[Executor]:
+    """
+    Create the pool used to process a batch of files, if any.
+    
+    Args:
+        parallel: Concurrency backend ('process', 'thread', or 'none')
+        file_count: Number of files to be processed
+        
+    Returns:
+        An executor for the chosen backend, or None to process serially
+    """
+    if parallel == 'none' or file_count < PARALLEL_MIN_FILES:
+        return None
+    
+    # The pool modules (multiprocessing in particular) are only loaded for
+    # runs large enough to use them
+    from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+    
+    cpus = os.cpu_count() or 1
+    if parallel == 'thread':
+        # Threads overlap I/O waits even on a single core
+        workers = min(MAX_IO_THREADS, cpus * 4)
+        logger.info(f"Processing files with {workers} I/O threads")
+        return ThreadPoolExecutor(max_workers=workers)
+    
+    if cpus > 1:
+        logger.info(f"Processing files in parallel with {cpus} workers")
+        return ProcessPoolExecutor(max_workers=cpus)
+    
+    return None
+
+
+def _call_with_args(func: Callable, args: Tuple) -> object:
+    """Call func with a tuple of positional arguments (picklable star-call)."""
+    return func(*args)
+
+
+def parallel_map(func: Callable, parallel: str, *iterables: Iterable) -> List:
+    """
+    Apply a per-file function across argument lists, using a pool for large runs.
+    
+    With the process backend, func and its arguments must be picklable.
+    Results are returned in input order regardless of backend, so callers
+    can zip them back onto their file lists deterministically.
+    
+    The iterables may be lazy, e.g. fed by a directory walk still in
+    progress. Only the first PARALLEL_MIN_FILES items are looked at before
+    work starts; the pool then picks up items as they are produced.
+    
+    Args:
+        func: Function called with one item from each iterable
+        parallel: Concurrency backend ('process', 'thread', or 'none')
+        *iterables: Equal-length argument iterables, the first being the files
+        
+    Returns:
+        List of results in input order
+    """
+    return list(iter_parallel_map(func, parallel, *iterables))
+
+
+def iter_parallel_map(func: Callable, parallel: str, *iterables: Iterable) -> Iterator:
+    """
+    Lazy form of parallel_map, yielding each result as it completes.
+    
+    Results still come in input order, so a caller can report progress by
+    files finished rather than files handed out. A serial run calls func
+    only as results are consumed, so the input iterables advance in step
+    with the output.
+    
+    Args:
+        func: Function called with one item from each iterable
+        parallel: Concurrency backend ('process', 'thread', or 'none')
+        *iterables: Equal-length argument iterables, the first being the files
+        
+    Yields:
+        Results in input order
+    """
+    args = zip(*iterables)
+    head = list(itertools.islice(args, PARALLEL_MIN_FILES))
+    
+    executor = _create_executor(parallel, len(head))
+    if executor is None:
+        for item in itertools.chain(head, args):
+            yield func(*item)
+        return
+    
+    with executor:
+        yield from executor.map(
+            partial(_call_with_args, func),
+            itertools.chain(head, args),
+            chunksize=PARALLEL_CHUNKSIZE
+        )
+
+
+def read_file_prefix(file_path: Path, nbytes: int) -> bytes:
+    """
+    Read up to nbytes from the start of a file.
+    
+    Small files are read with a single os.read; files of at least
+    MMAP_THRESHOLD bytes are mapped read-only and sliced, which avoids the
+    buffered-reader stack entirely.
+    
+    Args:
+        file_path: Path to the file to read
+        nbytes: Maximum number of bytes to return
+        
+    Returns:
+        The leading bytes of the file (shorter if the file is smaller)
+        
+    Raises:
+        OSError: If the file cannot be opened or read
+    """
+    fd = os.open(file_path, _READ_OPEN_FLAGS)
+    try:
+        size = os.fstat(fd).st_size
+        if size >= MMAP_THRESHOLD:
+            with mmap.mmap(fd, 0, access=mmap.ACCESS_READ) as mm:
+                # Only the leading pages are touched, front to back; let the
+                # kernel read them ahead in one go on a cold cache
+                if hasattr(mmap, 'MADV_SEQUENTIAL'):
+                    mm.madvise(mmap.MADV_SEQUENTIAL, 0, min(size, nbytes))
+                return mm[:nbytes]
+        return os.read(fd, nbytes)
+    finally:
+        os.close(fd)
+
+
+def read_file_bytes(file_path: Path) -> Tuple[bytes, int]:
+    """
+    Read a whole file through a raw descriptor.
+    
+    The size from fstat sizes the first read, so an unchanged regular file
+    is read with one os.read plus the read that confirms end of file.
+    
+    Args:
+        file_path: Path to the file to read
+        
+    Returns:
+        Tuple of (file bytes, st_mode of the open file)
+        
+    Raises:
+        OSError: If the file cannot be opened or read
+    """
+    fd = os.open(file_path, _READ_OPEN_FLAGS)
+    try:
+        st = os.fstat(fd)
+        chunks = []
+        chunk = os.read(fd, st.st_size + 1)
+        while chunk:
+            chunks.append(chunk)
+            chunk = os.read(fd, 64 * 1024)
+    finally:
+        os.close(fd)
+    data = chunks[0] if len(chunks) == 1 else b''.join(chunks)
+    return data, st.st_mode
+
+
+def release_page_cache(file_path: Path) -> None:
+    """
+    Advise the kernel that a file's cached pages will not be read again.
+    
+    Uses posix_fadvise(POSIX_FADV_DONTNEED); a no-op on platforms without
+    it. The advice is best-effort, so failures are logged and ignored.
+    
+    Args:
+        file_path: Path to the file whose pages can be dropped
+    """
+    if not hasattr(os, 'posix_fadvise'):
+        return
+    
+    try:
+        fd = os.open(file_path, _READ_OPEN_FLAGS)
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        finally:
+            os.close(fd)
+    except OSError as e:
+        logger.debug(f"Could not release page cache for {file_path}: {e}")
+
+
+def detect_bom_in_bytes(data: bytes) -> Tuple[Optional[bytes], str]:
+    """
+    Detect BOM (Byte Order Mark) at the start of raw file bytes.
+    
+    Args:
+        data: Leading bytes of a file (at least 4 bytes when available)
+        
+    Returns:
+        Tuple of (BOM bytes or None, encoding name)
+        If no BOM found, returns (None, 'utf-8')
+    """
+    # Most files start with an ordinary character; skip the table for them
+    if not data or data[0] not in _BOM_LEAD_BYTES:
+        return None, 'utf-8'
+    
+    # Check for BOMs (order matters - check longer ones first)
+    for bom, encoding in BOM_TO_ENCODING.items():
+        if data.startswith(bom):
+            return bom, encoding
+    
+    # No BOM found
+    return None, 'utf-8'
+
 
 def detect_bom(file_path: Path) -> Tuple[Optional[bytes], str]:
     """
@@ -66,16 +297,10 @@ def detect_bom(file_path: Path) -> Tuple[Optional[bytes], str]:
     try:
         with open(file_path, 'rb') as f:
             # Read first few bytes to check for BOM
-            start = f.read(4)
-            
-            # Check for BOMs (order matters - check longer ones first)
-            for bom, encoding in BOM_TO_ENCODING.items():
-                if start.startswith(bom):
-                    logger.debug(f"Detected BOM {encoding} in {file_path}")
-                    return bom, encoding
-            
-            # No BOM found
-            return None, 'utf-8'
+            bom, encoding = detect_bom_in_bytes(f.read(4))
+            if bom is not None:
+                logger.debug(f"Detected BOM {encoding} in {file_path}")
+            return bom, encoding
     except (OSError, IOError) as e:
         logger.warning(f"Error detecting BOM in {file_path}: {e}")
         return None, 'utf-8'
@@ -125,24 +350,170 @@ def read_file_with_encoding(file_path: Path) -> Tuple[str, Optional[bytes], str]
     """
     Read file content while preserving BOM information.
     
+    The file is read once in binary mode; the BOM is detected from the
+    leading bytes and the rest decoded strictly, UTF-8 when there is none.
+    Newlines are left untranslated so the original style is preserved.
+    
     Args:
         file_path: Path to file to read
         
     Returns:
         Tuple of (content, BOM bytes or None, encoding)
     """
-    bom, encoding = detect_bom(file_path)
-    
     try:
-        # Read with newline=None to get universal newlines but preserve original style
-        with open(file_path, 'r', encoding=encoding, newline='') as f:
-            content = f.read()
-        return content, bom, encoding
+        data, _ = read_file_bytes(file_path)
+        bom, encoding = detect_bom_in_bytes(data)
+        if bom is not None:
+            logger.debug(f"Detected BOM {encoding} in {file_path}")
+        return data.decode(encoding), bom, encoding
     except (OSError, IOError, UnicodeDecodeError) as e:
         logger.error(f"Error reading file {file_path}: {e}")
         raise
 
 
+def decode_prefix_with_encoding(
+    data: bytes,
+    final: bool
+) -> Tuple[str, Optional[bytes], str]:
+    """
+    Decode the leading bytes of a file as read_file_with_encoding would.
+    
+    The BOM is detected from the bytes themselves. Unless final is set, a
+    multi-byte sequence cut off at the end is dropped rather than treated
+    as a decode error.
+    
+    Args:
+        data: Leading bytes of the file
+        final: True if data holds the whole file
+        
+    Returns:
+        Tuple of (content, BOM bytes or None, encoding)
+        
+    Raises:
+        UnicodeDecodeError: If the bytes are not valid in the detected encoding
+    """
+    bom, encoding = detect_bom_in_bytes(data)
+    decoder = codecs.getincrementaldecoder(encoding)()
+    return decoder.decode(data, final=final), bom, encoding
+
+
+def encode_file_content(
+    content: str,
+    bom: Optional[bytes] = None,
+    encoding: str = 'utf-8'
+) -> bytes:
+    """
+    Encode file content to the bytes write_file_with_encoding would write.
+    
+    Line endings in the content are kept as-is.
+    
+    Args:
+        content: Content to encode
+        bom: BOM bytes to prepend (if any)
+        encoding: Encoding to use
+        
+    Returns:
+        Encoded file bytes, including the BOM if present
+    """
+    if bom is not None:
+        # Determine the write encoding based on the BOM
+        write_encoding = BOM_TO_WRITE_ENCODING.get(bom, encoding.replace('-sig', ''))
+        return bom + content.encode(write_encoding)
+    return content.encode(encoding)
+
+
+# Per-process sequence for temp file names; combined with the pid it keeps
+# names unique across pool workers without tempfile's random-name machinery
+_temp_counter = itertools.count()
+
+# Exclusive creation; close-on-exec keeps the descriptor out of any child
+# process started before it is closed
+_TEMP_OPEN_FLAGS = (
+    os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, 'O_CLOEXEC', 0)
+    | getattr(os, 'O_NOFOLLOW', 0) | getattr(os, 'O_BINARY', 0)
+)
+
+
+def _create_temp_file(directory: Path, name: str) -> Tuple[int, str]:
+    """
+    Exclusively create a hidden temp file next to a target file.
+    
+    Args:
+        directory: Directory to create the temp file in
+        name: Name of the target file the temp file stands in for
+        
+    Returns:
+        Tuple of (open file descriptor, temp file path)
+        
+    Raises:
+        OSError: If the file cannot be created
+    """
+    while True:
+        temp_path = os.path.join(directory, f'.{name}.{os.getpid()}.{next(_temp_counter)}.tmp')
+        try:
+            return os.open(temp_path, _TEMP_OPEN_FLAGS, 0o600), temp_path
+        except FileExistsError:
+            # Left behind by an earlier run with the same pid; try the next name
+            continue
+
+
+def atomic_write_bytes(
+    file_path: Path,
+    data: bytes,
+    mode: Optional[int] = None
+) -> os.stat_result:
+    """
+    Atomically replace a file's content with the given bytes.
+    
+    Writes to a temporary file in the target's directory (so the rename
+    stays on one filesystem) and renames it over the target.
+    
+    Args:
+        file_path: Path to file to write
+        data: Complete new file content
+        mode: Permission bits for the new file (None keeps the temp file's 0600)
+        
+    Returns:
+        Stat of the temp file taken before the rename, so it describes the
+        written content even if the target is changed again afterwards
+        
+    Raises:
+        OSError: If the file cannot be written or renamed
+    """
+    temp_fd, temp_path = _create_temp_file(file_path.parent, file_path.name)
+    
+    try:
+        # Write through the descriptor _create_temp_file returned rather than
+        # reopening the temp file by path
+        with os.fdopen(temp_fd, 'wb') as temp_file:
+            temp_file.write(data)
+            
+            if mode is not None:
+                try:
+                    if hasattr(os, 'fchmod'):
+                        os.fchmod(temp_file.fileno(), mode)
+                    else:
+                        os.chmod(temp_path, mode)
+                except OSError:
+                    # If we can't preserve permissions, continue anyway
+                    pass
+            
+            temp_file.flush()
+            written_stat = os.fstat(temp_file.fileno())
+        
+        # Atomic rename
+        os.replace(temp_path, file_path)
+        return written_stat
+    
+    except Exception:
+        # Clean up temp file on error
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
+
+
 def write_file_with_encoding(
     file_path: Path,
     content: str,
@@ -159,19 +530,9 @@ def write_file_with_encoding(
         encoding: Encoding to use
     """
     try:
-        # If we have a BOM, write it in binary mode first
-        if bom is not None:
-            # Determine the write encoding based on the BOM
-            write_encoding = BOM_TO_WRITE_ENCODING.get(bom, encoding.replace('-sig', ''))
-            with open(file_path, 'wb') as f:
-                f.write(bom)
-                # Use newline='' mode encoding to preserve line endings
-                # Encode the content with the proper encoding, preserving CRLF/LF
-                f.write(content.encode(write_encoding))
-        else:
-            # Use newline='' to preserve original line endings in the content
-            with open(file_path, 'w', encoding=encoding, newline='') as f:
-                f.write(content)
+        data = encode_file_content(content, bom, encoding)
+        with open(file_path, 'wb') as f:
+            f.write(data)
     except (OSError, IOError) as e:
         logger.error(f"Error writing file {file_path}: {e}")
         raise
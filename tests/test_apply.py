@@ -22,9 +22,15 @@ from pathlib import Path
 from license_header.apply import (
     ApplyResult,
     UpgradeResult,
+    build_header_lookup,
+    _quick_compliance_check,
+    prepare_header_for_file,
     normalize_header,
+    detect_newline_style,
     has_header,
+    has_header_bytes,
     insert_header,
+    insert_header_bytes,
     apply_header_to_file,
     apply_headers,
     strip_comment_markers,
@@ -36,11 +42,16 @@ from license_header.apply import (
 )
 from license_header.config import merge_config
 from license_header.utils import (
+    atomic_write_bytes,
     has_shebang,
     extract_shebang,
     detect_bom,
+    encode_file_content,
+    read_file_bytes,
+    read_file_prefix,
     read_file_with_encoding,
     write_file_with_encoding,
+    MMAP_THRESHOLD,
 )
 
 
@@ -157,6 +168,26 @@ class TestUtilityFunctions:
         assert bom == codecs.BOM_UTF32_BE
         assert encoding == 'utf-32'
     
+    def test_detect_bom_in_bytes(self):
+        """Test BOM detection on buffers, including ones too short for a BOM."""
+        import codecs
+        from license_header.utils import detect_bom_in_bytes
+        assert detect_bom_in_bytes(b'') == (None, 'utf-8')
+        assert detect_bom_in_bytes(b'\xff') == (None, 'utf-8')
+        assert detect_bom_in_bytes(b'print(1)') == (None, 'utf-8')
+        assert detect_bom_in_bytes(codecs.BOM_UTF8 + b'x') == (codecs.BOM_UTF8, 'utf-8-sig')
+        assert detect_bom_in_bytes(codecs.BOM_UTF16_BE + b'\x00x') == (codecs.BOM_UTF16_BE, 'utf-16')
+        assert detect_bom_in_bytes(codecs.BOM_UTF32_LE) == (codecs.BOM_UTF32_LE, 'utf-32')
+    
+    def test_encode_file_content(self):
+        """Test encoding content with and without a BOM."""
+        import codecs
+        assert encode_file_content("a\r\nb\n") == b"a\r\nb\n"
+        assert encode_file_content("x\n", codecs.BOM_UTF8, 'utf-8-sig') == codecs.BOM_UTF8 + b"x\n"
+        assert encode_file_content("x", codecs.BOM_UTF16_LE, 'utf-16') == (
+            codecs.BOM_UTF16_LE + "x".encode('utf-16-le')
+        )
+    
     def test_read_write_file_preserves_bom(self, tmp_path):
         """Test that reading and writing preserves BOM."""
         file_path = tmp_path / "test_bom.txt"
@@ -209,6 +240,25 @@ class TestUtilityFunctions:
         assert b'\r\n' in raw_bytes, "CRLF line endings should be preserved"
         assert raw_bytes.count(b'\r\n') == 4, "Should have 4 CRLF sequences"
     
+    def test_read_utf16_with_crlf(self, tmp_path):
+        """Test that UTF-16 content is decoded without the BOM and keeps CRLF."""
+        import codecs
+        file_path = tmp_path / "test_utf16.txt"
+        file_path.write_bytes(codecs.BOM_UTF16_LE + "a\r\nb\n".encode('utf-16-le'))
+        
+        content, bom, encoding = read_file_with_encoding(file_path)
+        assert content == "a\r\nb\n"
+        assert bom == codecs.BOM_UTF16_LE
+        assert encoding == 'utf-16'
+    
+    def test_read_invalid_utf8_raises(self, tmp_path):
+        """Test that non-UTF-8 bytes without a BOM raise UnicodeDecodeError."""
+        file_path = tmp_path / "test_latin1.txt"
+        file_path.write_bytes(b"caf\xe9\n")
+        
+        with pytest.raises(UnicodeDecodeError):
+            read_file_with_encoding(file_path)
+    
     def test_read_write_preserves_lf_with_bom(self, tmp_path):
         """Test that LF line endings are preserved when writing BOM files."""
         import codecs
@@ -266,6 +316,143 @@ class TestNormalizeHeader:
         assert result == "# Line 1\n# Line 2\n# Line 3\n"
 
 
+class TestDetectNewlineStyle:
+    """Test detect_newline_style function."""
+    
+    def test_lf_only(self):
+        """Test content without any carriage returns."""
+        assert detect_newline_style("a\nb\nc\n") == '\n'
+    
+    def test_crlf_only(self):
+        """Test content using CRLF throughout."""
+        assert detect_newline_style("a\r\nb\r\n") == '\r\n'
+    
+    def test_mixed_predominantly_lf(self):
+        """Test that LF wins when it is the majority style."""
+        assert detect_newline_style("a\r\nb\nc\nd\n") == '\n'
+    
+    def test_lone_cr_is_not_crlf(self):
+        """Test that bare CR characters are not counted as CRLF."""
+        assert detect_newline_style("a\rb\rc\n") == '\n'
+    
+    def test_empty_content(self):
+        """Test empty content defaults to LF."""
+        assert detect_newline_style("") == '\n'
+
+
+class TestBuildHeaderLookup:
+    """Test build_header_lookup function."""
+    
+    def test_matches_prepare_header_for_file(self):
+        """Test that cached headers match direct preparation."""
+        lookup = build_header_lookup("Copyright 2025\n")
+        for name in ('a.py', 'b.js', 'c.rs', 'd.unknown'):
+            expected = prepare_header_for_file("Copyright 2025\n", Path(name))
+            assert lookup(Path(name)) == expected
+    
+    def test_reuses_header_per_extension(self):
+        """Test that files sharing an extension share one prepared header."""
+        lookup = build_header_lookup("Copyright 2025\n")
+        first = lookup(Path('src/a.py'))
+        assert lookup(Path('other/b.py')) is first
+        assert lookup(Path('C.PY')) is first
+        assert lookup(Path('main.c')) != first
+    
+    def test_no_wrap_returns_raw_header(self):
+        """Test that disabling wrapping returns the raw header."""
+        lookup = build_header_lookup("Copyright 2025\n", wrap_comments=False)
+        assert lookup(Path('a.py')) == "Copyright 2025\n"
+        assert lookup(Path('b.js')) == "Copyright 2025\n"
+    
+    def test_no_wrap_skips_prepare(self, monkeypatch):
+        """Test that disabling wrapping never prepares per-file headers."""
+        import license_header.apply as apply_module
+        
+        def fail_prepare(**kwargs):
+            raise AssertionError('prepare not expected')
+        monkeypatch.setattr(apply_module, 'prepare_header_for_file', fail_prepare)
+        
+        lookup = build_header_lookup("Copyright 2025\n", wrap_comments=False)
+        assert lookup(Path('a.py')) == "Copyright 2025\n"
+
+
+class TestQuickComplianceCheck:
+    """Test _quick_compliance_check and the prefix reader behind it."""
+    
+    def test_read_prefix_small_and_large(self, tmp_path):
+        """Test prefix reads below and above the mmap threshold."""
+        small = tmp_path / "small.py"
+        small.write_bytes(b"abcdef")
+        assert read_file_prefix(small, 3) == b"abc"
+        assert read_file_prefix(small, 100) == b"abcdef"
+        
+        large = tmp_path / "large.py"
+        large.write_bytes(b"x" * MMAP_THRESHOLD + b"tail")
+        assert read_file_prefix(large, 4) == b"xxxx"
+    
+    def test_read_file_bytes(self, tmp_path):
+        """Test whole-file reads return the bytes and the file mode."""
+        import stat
+        empty = tmp_path / "empty.py"
+        empty.write_bytes(b"")
+        assert read_file_bytes(empty)[0] == b""
+        
+        data = bytes(range(256)) * 1000
+        big = tmp_path / "big.py"
+        big.write_bytes(data)
+        big.chmod(0o640)
+        content, mode = read_file_bytes(big)
+        assert content == data
+        assert stat.S_IMODE(mode) == 0o640
+    
+    def test_exact_header_lf_and_crlf(self, tmp_path):
+        """Test that LF and CRLF files starting with the header match."""
+        header = "# Copyright 2025\n"
+        lf_file = tmp_path / "lf.py"
+        lf_file.write_bytes(b"# Copyright 2025\nprint(1)\n")
+        crlf_file = tmp_path / "crlf.py"
+        crlf_file.write_bytes(b"# Copyright 2025\r\nprint(1)\r\n")
+        assert _quick_compliance_check(lf_file, header) is True
+        assert _quick_compliance_check(crlf_file, header) is True
+    
+    def test_header_with_bom(self, tmp_path):
+        """Test that UTF-8 and UTF-16 BOM files are recognized."""
+        import codecs
+        header = "# Copyright 2025\n"
+        utf8_file = tmp_path / "bom8.py"
+        utf8_file.write_bytes(codecs.BOM_UTF8 + b"# Copyright 2025\nx = 1\n")
+        utf16_file = tmp_path / "bom16.py"
+        utf16_file.write_bytes(
+            codecs.BOM_UTF16_LE + "# Copyright 2025\nx = 1\n".encode('utf-16-le')
+        )
+        assert _quick_compliance_check(utf8_file, header) is True
+        assert _quick_compliance_check(utf16_file, header) is True
+    
+    def test_shebang_and_blank_lines(self, tmp_path):
+        """Test that headers after a shebang or blank lines are found."""
+        header = "# Copyright 2025\n"
+        shebang = tmp_path / "script.py"
+        shebang.write_bytes(b"#!/usr/bin/env python\n# Copyright 2025\n")
+        blank = tmp_path / "blank.py"
+        blank.write_bytes(b"\n\n# Copyright 2025\n")
+        assert _quick_compliance_check(shebang, header) is True
+        assert _quick_compliance_check(blank, header) is True
+    
+    def test_undetermined_cases_return_none(self, tmp_path):
+        """Test that missing headers and undecodable prefixes defer to a full read."""
+        header = "# Copyright 2025\n"
+        missing = tmp_path / "plain.py"
+        missing.write_bytes(b"print(1)\n")
+        binary = tmp_path / "binary.py"
+        binary.write_bytes(b"\x80\x81# Copyright 2025\n")
+        late = tmp_path / "late.py"
+        late.write_bytes(b"\n" * 8192 + b"# Copyright 2025\n")
+        assert _quick_compliance_check(missing, header) is None
+        assert _quick_compliance_check(binary, header) is None
+        assert _quick_compliance_check(late, header) is None
+        assert has_header(late.read_text(), header)
+
+
 class TestHasHeader:
     """Test has_header function."""
     
@@ -326,6 +513,13 @@ class TestHasHeader:
         header2 = "# Copyright 2025\n# Licensed under MIT\n"
         content2 = "\n\n# Copyright 2025\ncode"
         assert not has_header(content2, header2), "Partial multiline header should not be detected"
+    
+    def test_has_header_blank_lines_with_whitespace(self):
+        """Test that whitespace-only leading lines are skipped but indentation is not."""
+        header = "# Copyright 2025\n"
+        assert has_header(" \t\n\r\n# Copyright 2025\ncode", header)
+        assert not has_header("\n  # Copyright 2025\ncode", header)
+        assert not has_header(" \n \n", header)
 
 
 class TestInsertHeader:
@@ -408,6 +602,81 @@ class TestInsertHeader:
         assert "python#" not in result, "Header should not be concatenated to shebang"
 
 
+class TestHasHeaderBytes:
+    """Test has_header_bytes function."""
+    
+    def test_normalized_header_forms_cached(self):
+        """Test that header normalization is shared across calls."""
+        from license_header.apply import _normalized_header_forms
+        text, data = _normalized_header_forms("# Copyright \u00e9  \n\n")
+        assert text == "# Copyright \u00e9\n"
+        assert data == text.encode('utf-8')
+        assert _normalized_header_forms("# Copyright \u00e9  \n\n")[0] is text
+    
+    def test_matches_has_header(self):
+        """Test that the byte-level check agrees with has_header."""
+        header = "# Copyright 2025\n"
+        contents = [
+            "# Copyright 2025\nx = 1\n",
+            "# Copyright 2025\r\nx = 1\r\n",
+            "#!/usr/bin/env python\n# Copyright 2025\n",
+            "#!/usr/bin/env python",
+            "\n\n  \n# Copyright 2025\n",
+            "\x1c# Copyright 2025\n",
+            "x = 1\n# Copyright 2025\n",
+            "",
+        ]
+        for content in contents:
+            assert has_header_bytes(content.encode('ascii'), header) == has_header(content, header)
+    
+    def test_atomic_write_bytes(self, tmp_path):
+        """Test atomic replacement with and without an explicit mode."""
+        file_path = tmp_path / "target.py"
+        file_path.write_bytes(b"old\n")
+        
+        atomic_write_bytes(file_path, b"new\r\n", 0o644)
+        assert file_path.read_bytes() == b"new\r\n"
+        assert os.stat(file_path).st_mode & 0o777 == 0o644
+        assert [p.name for p in tmp_path.iterdir()] == ["target.py"]
+    
+    def test_atomic_write_bytes_skips_stale_temp(self, tmp_path, monkeypatch):
+        """Test that a leftover temp file with the next name is not clobbered."""
+        import itertools
+        import license_header.utils as utils_module
+        monkeypatch.setattr(utils_module, '_temp_counter', itertools.count())
+        
+        stale = tmp_path / f".target.py.{os.getpid()}.0.tmp"
+        stale.write_bytes(b"stale")
+        file_path = tmp_path / "target.py"
+        
+        atomic_write_bytes(file_path, b"new\n")
+        assert file_path.read_bytes() == b"new\n"
+        assert stale.read_bytes() == b"stale"
+
+
+class TestInsertHeaderBytes:
+    """Test insert_header_bytes function."""
+    
+    def test_matches_insert_header(self):
+        """Test that byte-level insertion matches the str implementation."""
+        header = "# Copyright 2025\n# Ünïcode Author\n"
+        contents = [
+            "print('héllo')\n",
+            "#!/usr/bin/env python\r\nx = '€'\r\n",
+            "#!/bin/sh",
+            "",
+            "a\r\nb\nc\r\n",
+        ]
+        for content in contents:
+            expected = insert_header(content, header).encode('utf-8')
+            assert insert_header_bytes(content.encode('utf-8'), header) == expected
+    
+    def test_shebang_without_newline(self):
+        """Test that a shebang-only file gets a newline before the header."""
+        result = insert_header_bytes(b"#!/bin/sh", "# Copyright 2025\n")
+        assert result == b"#!/bin/sh\n# Copyright 2025\n"
+
+
 class TestApplyHeaderToFile:
     """Test apply_header_to_file function."""
     
@@ -455,6 +724,19 @@ class TestApplyHeaderToFile:
         assert content.startswith("#!/usr/bin/env python\n# Copyright 2025\n")
         assert "print('hello')" in content
     
+    def test_apply_header_with_drop_cache(self, tmp_path, monkeypatch):
+        """Test that dropping the page cache advises on the written file."""
+        import license_header.apply as apply_module
+        released = []
+        monkeypatch.setattr(apply_module, 'release_page_cache', released.append)
+        
+        file_path = tmp_path / "test.py"
+        file_path.write_text("print('hello')\n")
+        
+        assert apply_header_to_file(file_path, "# Copyright 2025\n", drop_cache=True)
+        assert file_path.read_text() == "# Copyright 2025\nprint('hello')\n"
+        assert released == [file_path]
+    
     def test_apply_header_preserves_bom(self, tmp_path):
         """Test that BOM is preserved."""
         file_path = tmp_path / "test.py"
@@ -542,6 +824,29 @@ class TestApplyHeaderToFile:
         assert "# Copyright 2025" in output_file1.read_text()
         assert "# Copyright 2025" in output_file2.read_text()
     
+    def test_apply_header_to_output_dir_symlinked_root(self, tmp_path):
+        """Test structure preservation when the scan root is reached via a symlink."""
+        real_dir = tmp_path / "real"
+        (real_dir / "pkg").mkdir(parents=True)
+        link_dir = tmp_path / "link"
+        try:
+            link_dir.symlink_to(real_dir, target_is_directory=True)
+        except (OSError, NotImplementedError):
+            pytest.skip("Symlinks not supported")
+        
+        file_path = real_dir / "pkg" / "mod.py"
+        file_path.write_text("x = 1\n")
+        outside = tmp_path / "outside.py"
+        outside.write_text("y = 2\n")
+        
+        output_dir = tmp_path / "output"
+        header = "# Copyright 2025\n"
+        apply_header_to_file(link_dir / "pkg" / "mod.py", header, output_dir=output_dir, scan_root=link_dir)
+        apply_header_to_file(outside, header, output_dir=output_dir, scan_root=real_dir)
+        
+        assert (output_dir / "pkg" / "mod.py").read_text() == "# Copyright 2025\nx = 1\n"
+        assert (output_dir / "outside.py").read_text() == "# Copyright 2025\ny = 2\n"
+    
     def test_apply_header_preserves_permissions(self, tmp_path):
         """Test that file permissions are preserved."""
         if os.name == 'nt':  # Skip on Windows
@@ -823,6 +1128,80 @@ class TestApplyHeaders:
         # Verify good file was modified correctly
         assert "# Copyright 2025" in good_file.read_text()
 
+    def test_apply_headers_parallel(self, tmp_path, monkeypatch):
+        """Test that the process pool path matches the serial results."""
+        import license_header.utils as utils_module
+        monkeypatch.setattr(utils_module, 'PARALLEL_MIN_FILES', 2)
+        monkeypatch.setattr(utils_module.os, 'cpu_count', lambda: 2)
+        
+        # Create header file
+        header_file = tmp_path / "HEADER.txt"
+        header_file.write_text("# Copyright 2025\n")
+        
+        # Create a mix of compliant, non-compliant, and undecodable files
+        for i in range(5):
+            (tmp_path / f"file{i}.py").write_text(f"print({i})\n")
+        (tmp_path / "done.py").write_text("# Copyright 2025\nprint('done')\n")
+        (tmp_path / "bad.py").write_bytes(b'# invalid UTF-8: \xe9\n')
+        
+        cli_args = {'header': str(header_file)}
+        config = merge_config(cli_args, repo_root=tmp_path)
+        result = apply_headers(config)
+        
+        assert [f.name for f in result.modified_files] == [f"file{i}.py" for i in range(5)]
+        assert [f.name for f in result.already_compliant] == ['done.py']
+        assert [f.name for f in result.failed_files] == ['bad.py']
+        assert (tmp_path / "file3.py").read_text() == "# Copyright 2025\nprint(3)\n"
+    
+    def test_apply_headers_thread_pool(self, tmp_path, monkeypatch):
+        """Test that the thread pool backend keeps results in scan order."""
+        import license_header.utils as utils_module
+        monkeypatch.setattr(utils_module, 'PARALLEL_MIN_FILES', 2)
+        
+        header_file = tmp_path / "HEADER.txt"
+        header_file.write_text("# Copyright 2025\n")
+        for i in range(6):
+            (tmp_path / f"file{i}.py").write_text(f"print({i})\n")
+        (tmp_path / "done.py").write_text("# Copyright 2025\nprint('done')\n")
+        
+        cli_args = {'header': str(header_file), 'parallel': 'thread'}
+        config = merge_config(cli_args, repo_root=tmp_path)
+        result = apply_headers(config)
+        
+        assert [f.name for f in result.modified_files] == [f"file{i}.py" for i in range(6)]
+        assert [f.name for f in result.already_compliant] == ['done.py']
+        assert (tmp_path / "file5.py").read_text() == "# Copyright 2025\nprint(5)\n"
+    
+    @pytest.mark.parametrize('parallel', ['none', 'thread'])
+    def test_parallel_map_lazy_iterables(self, parallel, monkeypatch):
+        """Test that parallel_map accepts generators and keeps input order."""
+        import operator
+        import license_header.utils as utils_module
+        from license_header.utils import parallel_map
+        monkeypatch.setattr(utils_module, 'PARALLEL_MIN_FILES', 4)
+        
+        for count in (3, 50):
+            numbers = (i for i in range(count))
+            results = parallel_map(operator.mul, parallel, numbers, iter(range(count)))
+            assert results == [i * i for i in range(count)]
+    
+    def test_iter_parallel_map_serial_is_lazy(self):
+        """Test that a serial iter_parallel_map runs each call as it is consumed."""
+        from license_header.utils import iter_parallel_map
+        
+        calls = []
+        
+        def record(n):
+            calls.append(n)
+            return n * 2
+        
+        results = iter_parallel_map(record, 'none', iter(range(3)))
+        assert calls == []
+        assert next(results) == 0
+        assert calls == [0]
+        assert list(results) == [2, 4]
+        assert calls == [0, 1, 2]
+    
     def test_utf16_with_shebang_bom_stripped(self, tmp_path):
         """Test that UTF-16 files with BOM and shebang correctly strip BOM character."""
         import codecs
@@ -955,6 +1334,42 @@ class TestApplyHeaders:
                 i += 1
         
         assert bom_count == 1, f"Expected 1 BOM, found {bom_count}"
+    
+    def test_apply_headers_walk_order_and_skips(self, tmp_path):
+        """Test that streamed results follow scan order and keep skipped files."""
+        header_file = tmp_path / "HEADER.txt"
+        header_file.write_text("# Copyright 2025\n")
+        (tmp_path / "b").mkdir()
+        (tmp_path / "b" / "inner.py").write_text("print('inner')\n")
+        (tmp_path / "a.py").write_text("print('a')\n")
+        (tmp_path / "c.py").write_text("print('c')\n")
+        (tmp_path / "notes.txt").write_text("notes\n")
+        
+        config = merge_config({'header': str(header_file)}, repo_root=tmp_path)
+        result = apply_headers(config)
+        
+        assert result.modified_files == sorted(result.modified_files)
+        assert [f.name for f in result.modified_files] == ['a.py', 'inner.py', 'c.py']
+        assert tmp_path / "notes.txt" in result.skipped_files
+    
+    def test_added_headers_logged_as_summary(self, tmp_path, caplog):
+        """Test that applying headers produces one info record, not one per file."""
+        import logging
+        
+        header_file = tmp_path / "HEADER.txt"
+        header_file.write_text("# Copyright 2025\n")
+        for i in range(3):
+            (tmp_path / f"file{i}.py").write_text("print()\n")
+        
+        config = merge_config({'header': str(header_file)}, repo_root=tmp_path)
+        
+        with caplog.at_level(logging.INFO, logger='license_header.apply'):
+            result = apply_headers(config)
+        
+        assert len(result.modified_files) == 3
+        messages = [r.getMessage() for r in caplog.records if r.name == 'license_header.apply']
+        assert 'Added header to 3 files' in messages
+        assert not any(m.startswith('Added header to:') for m in messages)
 
 
 # ============================================================
@@ -1031,6 +1446,17 @@ class TestStripCommentMarkers:
         assert "Copyright 2025" in result
         assert "Licensed under MIT" in result
     
+    def test_strip_mixed_line_prefixes(self):
+        """Test that each line comment marker drops at most one space."""
+        text = "-- SQL line\n; ini line\n//tight\n#  indented\nplain"
+        result = strip_comment_markers(text)
+        assert result == "SQL line\nini line\ntight\n indented\nplain\n"
+    
+    def test_strip_trims_blank_edge_lines(self):
+        """Test that blank marker lines at either end are dropped."""
+        assert strip_comment_markers("#\n#   body\n#\n#  more\n#\n") == "body\n\n more\n"
+        assert strip_comment_markers("#\n#\n") == "\n"
+    
     def test_strip_empty_string(self):
         """Test stripping from empty string."""
         assert strip_comment_markers("") == ""
@@ -1098,6 +1524,14 @@ class TestDetectHeaderInContent:
         v1_content = "# Copyright 2025\n# Licensed under MIT\ndef hello():\n    pass\n"
         found, start, end = detect_header_in_content(v1_content, raw_header)
         assert found is True
+    
+    def test_detect_header_block_boundary(self):
+        """Test that the header block ends at the first indented code line."""
+        raw_header = "Copyright 2025\n"
+        content = "# Copyright 2025\r\n\r\n   x = 1\r\n# trailing comment\r\n"
+        found, start, end = detect_header_in_content(content, raw_header)
+        assert found is True
+        assert content[start:end] == "# Copyright 2025\r\n\r\n"
 
 
 class TestRemoveHeaderFromContent:
@@ -1227,6 +1661,88 @@ class TestUpgradeHeaderInFile:
         assert content.startswith("#!/usr/bin/env python\n")
         assert "# New Copyright" in content
         assert "# Old Copyright" not in content
+    
+    def test_skips_decided_from_prefix(self, tmp_path, monkeypatch):
+        """Test that large files needing no rewrite are not read in full."""
+        import license_header.apply as apply_module
+        
+        full_reads = []
+        original = apply_module.read_file_bytes
+        
+        def counting_read(file_path):
+            full_reads.append(file_path.name)
+            return original(file_path)
+        monkeypatch.setattr(apply_module, 'read_file_bytes', counting_read)
+        
+        body = "x = 1\n" * 5000
+        (tmp_path / "none.py").write_text(body)
+        (tmp_path / "target.py").write_text("# New Copyright\n" + body)
+        (tmp_path / "source.py").write_text("# Old Copyright\n" + body)
+        
+        from_header = "# Old Copyright\n"
+        to_header = "# New Copyright\n"
+        
+        assert upgrade_header_in_file(tmp_path / "none.py", from_header, to_header) == 'no_source'
+        assert upgrade_header_in_file(tmp_path / "target.py", from_header, to_header) == 'already_target'
+        assert full_reads == []
+        
+        assert upgrade_header_in_file(tmp_path / "source.py", from_header, to_header) == 'upgraded'
+        assert full_reads == ['source.py']
+        assert (tmp_path / "source.py").read_text() == "# New Copyright\n" + body
+    
+    def test_long_comment_block_read_in_full(self, tmp_path):
+        """Test that a comment block running past the prefix is still matched."""
+        file_path = tmp_path / "test.py"
+        from_header = "".join(f"# Old Copyright line {i}\n" for i in range(400))
+        body = "x = 1\n" * 10000
+        file_path.write_text(from_header + body)
+        
+        status = upgrade_header_in_file(file_path, from_header, "# New Copyright\n")
+        
+        assert status == 'upgraded'
+        assert file_path.read_text() == "# New Copyright\n" + body
+    
+    def test_scanned_file_mode_skips_stat(self, tmp_path, monkeypatch):
+        """Test that a file mode from the scanner is used without a stat call."""
+        import license_header.apply as apply_module
+        
+        file_path = tmp_path / "test.py"
+        file_path.write_text("# Old Copyright\ndef hello():\n    pass\n")
+        file_path.chmod(0o600)
+        
+        def no_stat(path):
+            raise AssertionError(f"unexpected stat of {path}")
+        monkeypatch.setattr(apply_module.os, 'stat', no_stat)
+        
+        status = upgrade_header_in_file(
+            file_path, "# Old Copyright\n", "# New Copyright\n", file_mode=0o100640
+        )
+        monkeypatch.undo()
+        
+        assert status == 'upgraded'
+        assert file_path.stat().st_mode & 0o777 == 0o640
+    
+    def test_upgrade_splices_original_bytes(self, tmp_path):
+        """Test that BOM, CRLF, and non-ASCII text survive the byte-level splice."""
+        file_path = tmp_path / "test.py"
+        file_path.write_bytes(
+            b'\xef\xbb\xbf#!/usr/bin/env python\r\n# \xc3\x84lt Copyright\r\nname = "\xe2\x82\xac"\r\n'
+        )
+        
+        status = upgrade_header_in_file(file_path, "# \u00c4lt Copyright\n", "# N\u00e9w Copyright\n")
+        
+        assert status == 'upgraded'
+        assert file_path.read_bytes() == (
+            b'\xef\xbb\xbf#!/usr/bin/env python\r\n# N\xc3\xa9w Copyright\r\nname = "\xe2\x82\xac"\r\n'
+        )
+    
+    def test_invalid_bytes_past_prefix_not_read(self, tmp_path):
+        """Test that undecodable bytes after the prefix do not fail a skip."""
+        file_path = tmp_path / "test.py"
+        file_path.write_bytes(b"def hello():\n    pass\n" * 500 + b"\xff\xfe\n")
+        
+        status = upgrade_header_in_file(file_path, "# Old Copyright\n", "# New Copyright\n")
+        assert status == 'no_source'
 
 
 # ============================================================
@@ -0,0 +1,290 @@
+# Copyright 2025 John Brosnihan
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Tests for cache module.
+"""
+
+import os
+import time
+from pathlib import Path
+
+from license_header.cache import (
+    RACY_MTIME_WINDOW_NS,
+    check_cache_key,
+    check_cache_path,
+    load_check_cache,
+    merge_check_cache_entries,
+    save_check_cache,
+)
+from license_header.check import check_headers
+from license_header.config import Config
+from license_header.scanner import ScanResult
+
+# An mtime safely outside the racy window of any run started now
+OLD_MTIME_NS = time.time_ns() - 10 * RACY_MTIME_WINDOW_NS
+
+
+def _make_config(repo_root: Path, header: str = '# Copyright 2025\n') -> Config:
+    """Build a check configuration with the cache enabled."""
+    config = Config(header_file='HEADER.txt', cache=True, wrap_comments=False)
+    config._repo_root = repo_root
+    config._header_content = header
+    config.include_extensions = ['.py']
+    config.exclude_paths = []
+    return config
+
+
+def _write_old(path: Path, text: str) -> None:
+    """Write a file and backdate its mtime out of the racy window."""
+    path.write_text(text)
+    os.utime(path, ns=(OLD_MTIME_NS, OLD_MTIME_NS))
+
+
+class TestCheckCacheFile:
+    """Test loading and saving the check cache."""
+    
+    def test_missing_cache_is_empty(self, tmp_path):
+        """Test that a missing cache file loads as empty."""
+        assert load_check_cache(tmp_path / 'none.ndjson', 'key') == {}
+    
+    def test_round_trip(self, tmp_path):
+        """Test that saved entries load back under the same key."""
+        cache_file = check_cache_path(tmp_path)
+        entries = {
+            str(tmp_path / 'a.py'): (OLD_MTIME_NS, 10),
+            str(tmp_path / 'b.py'): (OLD_MTIME_NS, 0),
+        }
+        save_check_cache(cache_file, 'key', entries)
+        
+        assert load_check_cache(cache_file, 'key') == entries
+        assert (tmp_path / '.license-header-cache' / '.gitignore').read_text() == '*\n'
+    
+    def test_key_mismatch_is_empty(self, tmp_path):
+        """Test that a cache written with other settings is ignored."""
+        cache_file = check_cache_path(tmp_path)
+        save_check_cache(cache_file, 'old', {str(tmp_path / 'a.py'): (OLD_MTIME_NS, 1)})
+        assert load_check_cache(cache_file, 'new') == {}
+    
+    def test_corrupt_cache_is_empty(self, tmp_path):
+        """Test that a malformed cache file is ignored."""
+        cache_file = tmp_path / 'check.ndjson'
+        cache_file.write_text('{"version": "v1", "key": "key"}\nnot json\n')
+        assert load_check_cache(cache_file, 'key') == {}
+    
+    def test_merge_replaces_scanned_files_only(self, tmp_path):
+        """Test that merging keeps other entries and drops recent mtimes."""
+        started = time.time_ns()
+        scan_result = ScanResult()
+        for name, mtime in (('old.py', OLD_MTIME_NS), ('new.py', started), ('bad.py', OLD_MTIME_NS)):
+            path = tmp_path / name
+            scan_result.eligible_files.append(path)
+            scan_result.file_mtimes[path] = mtime
+            scan_result.file_sizes[path] = 1
+        written = tmp_path / 'written.py'
+        just_written = tmp_path / 'just_written.py'
+        scan_result.eligible_files.extend([written, just_written])
+        previous = {
+            str(tmp_path / 'bad.py'): (OLD_MTIME_NS, 1),
+            str(tmp_path / 'elsewhere.py'): (OLD_MTIME_NS, 5),
+        }
+        
+        written_ns = time.time_ns()
+        
+        entries = merge_check_cache_entries(
+            previous, scan_result, [tmp_path / 'old.py', tmp_path / 'new.py'], started,
+            {written: (OLD_MTIME_NS, 12), just_written: (written_ns, 12)}
+        )
+        
+        # Written files keep the stat of what was written, however recent
+        assert entries == {
+            str(tmp_path / 'elsewhere.py'): (OLD_MTIME_NS, 5),
+            str(tmp_path / 'old.py'): (OLD_MTIME_NS, 1),
+            str(written): (OLD_MTIME_NS, 12),
+            str(just_written): (written_ns, 12),
+        }
+    
+    def test_key_depends_on_header_settings(self, tmp_path):
+        """Test that header text and wrapping settings change the key."""
+        config = _make_config(tmp_path)
+        key = check_cache_key(config, 'Copyright\n')
+        
+        assert check_cache_key(config, 'Copyright\n') == key
+        assert check_cache_key(config, 'Copyright 2026\n') != key
+        config.wrap_comments = True
+        assert check_cache_key(config, 'Copyright\n') != key
+
+
+class TestCheckHeadersCache:
+    """Test check_headers with the cache enabled."""
+    
+    def test_unchanged_compliant_files_not_reopened(self, tmp_path, monkeypatch):
+        """Test that a second run skips reading unchanged compliant files."""
+        import license_header.check as check_module
+        import license_header.scanner as scanner_module
+        
+        _write_old(tmp_path / 'good.py', '# Copyright 2025\nprint()\n')
+        _write_old(tmp_path / 'bad.py', 'print()\n')
+        config = _make_config(tmp_path)
+        
+        first = check_headers(config)
+        assert [f.name for f in first.compliant_files] == ['good.py']
+        
+        opened = []
+        original_check = check_module.check_file_header
+        original_binary = scanner_module.is_binary_file
+        
+        def counting_check(file_path, header):
+            opened.append(file_path.name)
+            return original_check(file_path, header)
+        
+        def counting_binary(file_path):
+            opened.append(file_path.name)
+            return original_binary(file_path)
+        
+        monkeypatch.setattr(check_module, 'check_file_header', counting_check)
+        monkeypatch.setattr(scanner_module, 'is_binary_file', counting_binary)
+        
+        second = check_headers(config)
+        assert [f.name for f in second.compliant_files] == ['good.py']
+        assert [f.name for f in second.non_compliant_files] == ['bad.py']
+        assert sorted(opened) == ['bad.py', 'bad.py']
+    
+    def test_modified_file_is_rechecked(self, tmp_path):
+        """Test that a changed mtime or size invalidates a cached file."""
+        good = tmp_path / 'good.py'
+        _write_old(good, '# Copyright 2025\nprint()\n')
+        config = _make_config(tmp_path)
+        check_headers(config)
+        
+        _write_old(good, 'print("header removed")\n')
+        result = check_headers(config)
+        
+        assert result.compliant_files == []
+        assert result.non_compliant_files == [good]
+    
+    def test_header_change_invalidates_cache(self, tmp_path):
+        """Test that results are not reused under a different header."""
+        _write_old(tmp_path / 'good.py', '# Copyright 2025\nprint()\n')
+        check_headers(_make_config(tmp_path))
+        
+        result = check_headers(_make_config(tmp_path, header='# Copyright 2026\n'))
+        
+        assert result.compliant_files == []
+        assert len(result.non_compliant_files) == 1
+    
+    def test_dry_run_does_not_write_cache(self, tmp_path):
+        """Test that a dry run leaves no cache behind."""
+        _write_old(tmp_path / 'good.py', '# Copyright 2025\nprint()\n')
+        config = _make_config(tmp_path)
+        config.dry_run = True
+        
+        check_headers(config)
+        
+        assert not check_cache_path(tmp_path).exists()
+    
+    def test_cache_disabled_by_default(self, tmp_path):
+        """Test that no cache is written unless enabled."""
+        _write_old(tmp_path / 'good.py', '# Copyright 2025\nprint()\n')
+        config = _make_config(tmp_path)
+        config.cache = False
+        
+        result = check_headers(config)
+        
+        assert len(result.compliant_files) == 1
+        assert not check_cache_path(tmp_path).exists()
+
+
+class TestApplyHeadersCache:
+    """Test apply_headers with the cache enabled."""
+    
+    def test_check_after_apply_reads_nothing(self, tmp_path, monkeypatch):
+        """Test that files apply wrote or found compliant are cached for check."""
+        import license_header.check as check_module
+        import license_header.scanner as scanner_module
+        from license_header.apply import apply_headers
+        
+        _write_old(tmp_path / 'new.py', 'print()\n')
+        _write_old(tmp_path / 'done.py', '# Copyright 2025\nprint()\n')
+        config = _make_config(tmp_path)
+        
+        applied = apply_headers(config)
+        assert [f.name for f in applied.modified_files] == ['new.py']
+        assert set(applied.written_stats) == {tmp_path / 'new.py'}
+        
+        opened = []
+        monkeypatch.setattr(check_module, 'check_file_header', lambda f, h: opened.append(f))
+        monkeypatch.setattr(scanner_module, 'is_binary_file', lambda f: opened.append(f))
+        
+        result = check_headers(config)
+        
+        assert [f.name for f in result.compliant_files] == ['done.py', 'new.py']
+        assert opened == []
+    
+    def test_file_edited_after_write_is_rechecked(self, tmp_path, monkeypatch):
+        """Test that a written file edited before the merge is read again by check."""
+        import license_header.apply as apply_module
+        
+        target = tmp_path / 'new.py'
+        _write_old(target, 'print()\n')
+        config = _make_config(tmp_path)
+        
+        original_merge = apply_module.merge_check_cache_entries
+        
+        def edit_then_merge(*args, **kwargs):
+            target.write_text('print()\n')
+            return original_merge(*args, **kwargs)
+        monkeypatch.setattr(apply_module, 'merge_check_cache_entries', edit_then_merge)
+        
+        applied = apply_module.apply_headers(config)
+        
+        # The entry describes the content apply wrote, not the edited file
+        assert applied.modified_files == [target]
+        written = applied.written_stats[target]
+        cached = load_check_cache(check_cache_path(tmp_path), check_cache_key(config, '# Copyright 2025\n'))
+        assert cached[str(target)] == written
+        assert written[1] != target.stat().st_size
+        assert [f.name for f in check_headers(config).non_compliant_files] == ['new.py']
+    
+    def test_unchanged_compliant_files_skipped(self, tmp_path, monkeypatch):
+        """Test that apply does not reopen cached compliant files."""
+        import license_header.apply as apply_module
+        
+        _write_old(tmp_path / 'done.py', '# Copyright 2025\nprint()\n')
+        config = _make_config(tmp_path)
+        check_headers(config)
+        
+        opened = []
+        original = apply_module._apply_header_with_stat
+        
+        def counting_apply(**kwargs):
+            opened.append(kwargs['file_path'])
+            return original(**kwargs)
+        monkeypatch.setattr(apply_module, '_apply_header_with_stat', counting_apply)
+        
+        result = apply_module.apply_headers(config)
+        
+        assert [f.name for f in result.already_compliant] == ['done.py']
+        assert opened == []
+    
+    def test_dry_run_apply_does_not_cache_unwritten_files(self, tmp_path):
+        """Test that a dry run does not record files it would modify."""
+        from license_header.apply import apply_headers
+        
+        _write_old(tmp_path / 'new.py', 'print()\n')
+        config = _make_config(tmp_path)
+        config.dry_run = True
+        
+        apply_headers(config)
+        
+        assert not check_cache_path(tmp_path).exists()
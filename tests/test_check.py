@@ -70,6 +70,23 @@ class TestCheckResult:
         result.compliant_files = [Path('a.py')]
         result.failed_files = [Path('b.py')]
         assert result.is_compliant() is False
+    
+    def test_uses_slots(self):
+        """Test that results carry no per-instance __dict__."""
+        result = CheckResult()
+        assert not hasattr(result, '__dict__')
+        with pytest.raises(AttributeError):
+            result.unknown_field = []
+    
+    def test_streamed_non_compliant_counts(self):
+        """Test that streamed non-compliant files count toward the totals."""
+        result = CheckResult()
+        result.compliant_files = [Path('a.py')]
+        result.non_compliant_files = [Path('b.py')]
+        result.streamed_non_compliant = 2
+        assert result.non_compliant_count() == 3
+        assert result.total_eligible() == 4
+        assert result.is_compliant() is False
 
 
 class TestCheckFileHeader:
@@ -124,6 +141,93 @@ class TestCheckFileHeader:
             # Should raise OSError
             with pytest.raises(OSError):
                 check_file_header(file_path, header)
+    
+    def test_large_file_reads_only_prefix(self, monkeypatch):
+        """Test that a header-sized prefix settles large files either way."""
+        import license_header.check as check_module
+        
+        def fail_full_read(file_path):
+            raise AssertionError('full read not expected')
+        monkeypatch.setattr(check_module, 'read_file_with_encoding', fail_full_read)
+        
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmpdir_path = Path(tmpdir)
+            header = '# Copyright 2024\n'
+            body = 'x = 1\n' * 100000
+            
+            with_header = tmpdir_path / 'with.py'
+            with_header.write_text(f'#!/usr/bin/env python\n\n{header}{body}')
+            assert check_file_header(with_header, header) is True
+            
+            without_header = tmpdir_path / 'without.py'
+            without_header.write_text(body)
+            assert check_file_header(without_header, header) is False
+    
+    def test_prefix_of_blank_lines_falls_back_to_full_read(self):
+        """Test that a header past the prefix's blank lines is still found."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmpdir_path = Path(tmpdir)
+            header = '# Copyright 2024\n'
+            file_path = tmpdir_path / 'test.py'
+            file_path.write_text('\n' * 1000 + header + 'print("hello")\n')
+            
+            assert check_file_header(file_path, header) is True
+    
+    def test_blank_lines_in_large_file_use_mapped_window(self, monkeypatch):
+        """Test that a header below many blank lines is found without a full read."""
+        import license_header.check as check_module
+        
+        def fail_full_read(file_path):
+            raise AssertionError('full read not expected')
+        monkeypatch.setattr(check_module, 'read_file_with_encoding', fail_full_read)
+        
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmpdir_path = Path(tmpdir)
+            header = '# Copyright 2024\n'
+            blanks = '\n' * 5000
+            body = 'x = 1\n' * 20000
+            
+            with_header = tmpdir_path / 'with.py'
+            with_header.write_text(f'#!/usr/bin/env python\n{blanks}{header}{body}')
+            assert check_file_header(with_header, header) is True
+            
+            without_header = tmpdir_path / 'without.py'
+            without_header.write_text(f'{blanks}{body}')
+            assert check_file_header(without_header, header) is False
+    
+    def test_decode_prefix_with_encoding(self):
+        """Test decoding a prefix that cuts a multi-byte character."""
+        from license_header.utils import decode_prefix_with_encoding
+        
+        data = b'\xef\xbb\xbfab\xc3\xa9'
+        assert decode_prefix_with_encoding(data[:6], final=False) == ('ab', b'\xef\xbb\xbf', 'utf-8-sig')
+        assert decode_prefix_with_encoding(data, final=True) == ('ab\u00e9', b'\xef\xbb\xbf', 'utf-8-sig')
+        with pytest.raises(UnicodeDecodeError):
+            decode_prefix_with_encoding(data[:6], final=True)
+    
+    def test_exact_header_bytes_skip_decoding(self, monkeypatch):
+        """Test that a file starting with the header bytes is never decoded."""
+        import license_header.check as check_module
+        
+        def fail_decode(data, final):
+            raise AssertionError('decode not expected')
+        monkeypatch.setattr(check_module, 'decode_prefix_with_encoding', fail_decode)
+        
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmpdir_path = Path(tmpdir)
+            header = '# Copyright 2024 \u00e9\n'
+            
+            lf_file = tmpdir_path / 'lf.py'
+            lf_file.write_bytes(header.encode('utf-8') + b'x = 1\n' * 1000)
+            assert check_file_header(lf_file, header) is True
+            
+            crlf_file = tmpdir_path / 'crlf.py'
+            crlf_file.write_bytes(b'\xef\xbb\xbf' + header.replace('\n', '\r\n').encode('utf-8') + b'x = 1\r\n')
+            assert check_file_header(crlf_file, header) is True
+            
+            short_ascii = tmpdir_path / 'short.py'
+            short_ascii.write_bytes(b'print(1)\n')
+            assert check_file_header(short_ascii, header) is False
 
 
 class TestCheckHeaders:
@@ -248,6 +352,147 @@ class TestCheckHeaders:
             assert len(result.compliant_files) == 0
             assert len(result.non_compliant_files) == 0
             assert result.is_compliant() is True
+    
+    def test_non_compliant_sink_streams_paths(self):
+        """Test that a sink receives non-compliant paths instead of the result list."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmpdir_path = Path(tmpdir)
+            
+            header_file = tmpdir_path / 'HEADER.txt'
+            header_file.write_text('# Copyright 2024\n')
+            (tmpdir_path / 'a.py').write_text('print()\n')
+            (tmpdir_path / 'b.py').write_text('# Copyright 2024\nprint()\n')
+            (tmpdir_path / 'c.py').write_text('print()\n')
+            
+            config = Config(header_file=str(header_file))
+            config._repo_root = tmpdir_path
+            config._header_content = '# Copyright 2024\n'
+            config.include_extensions = ['.py']
+            config.exclude_paths = []
+            
+            streamed = []
+            result = check_headers(config, non_compliant_sink=streamed.append)
+            
+            assert streamed == [tmpdir_path / 'a.py', tmpdir_path / 'c.py']
+            assert result.non_compliant_files == []
+            assert result.non_compliant_count() == 2
+            assert result.total_eligible() == 3
+            assert result.is_compliant() is False
+    
+    def test_missing_headers_logged_as_summary(self, caplog):
+        """Test that missing headers produce one info record, not one per file."""
+        import logging
+        
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmpdir_path = Path(tmpdir)
+            
+            header_file = tmpdir_path / 'HEADER.txt'
+            header_file.write_text('# Copyright 2024\n')
+            for i in range(3):
+                (tmpdir_path / f'file{i}.py').write_text('print()\n')
+            
+            config = Config(header_file=str(header_file))
+            config._repo_root = tmpdir_path
+            config._header_content = '# Copyright 2024\n'
+            config.include_extensions = ['.py']
+            config.exclude_paths = []
+            
+            with caplog.at_level(logging.INFO, logger='license_header.check'):
+                result = check_headers(config)
+            
+            assert len(result.non_compliant_files) == 3
+            messages = [r.getMessage() for r in caplog.records if r.name == 'license_header.check']
+            assert 'Missing header in 3 files' in messages
+            assert not any(m.startswith('File is missing header') for m in messages)
+    
+    def test_empty_file_not_opened(self, monkeypatch):
+        """Test that empty files are reported missing without being read."""
+        import license_header.check as check_module
+        
+        def fail_read(file_path, nbytes):
+            raise AssertionError('read not expected')
+        monkeypatch.setattr(check_module, 'read_file_prefix', fail_read)
+        
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmpdir_path = Path(tmpdir)
+            
+            header_file = tmpdir_path / 'HEADER.txt'
+            header_file.write_text('# Copyright 2024\n')
+            (tmpdir_path / 'empty.py').write_text('')
+            
+            config = Config(header_file=str(header_file))
+            config._repo_root = tmpdir_path
+            config._header_content = '# Copyright 2024\n'
+            config.include_extensions = ['.py']
+            config.exclude_paths = []
+            
+            result = check_headers(config)
+            
+            assert result.non_compliant_files == [tmpdir_path / 'empty.py']
+    
+    def test_header_prepared_once_per_extension(self, monkeypatch):
+        """Test that wrapped headers are built per extension, not per file."""
+        import license_header.apply as apply_module
+        calls = []
+        original = apply_module.prepare_header_for_file
+        
+        def counting_prepare(**kwargs):
+            calls.append(kwargs['file_path'].suffix)
+            return original(**kwargs)
+        monkeypatch.setattr(apply_module, 'prepare_header_for_file', counting_prepare)
+        
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmpdir_path = Path(tmpdir)
+            
+            header_file = tmpdir_path / 'HEADER.txt'
+            header_file.write_text('Copyright 2024\n')
+            
+            for i in range(5):
+                (tmpdir_path / f'file{i}.py').write_text('# Copyright 2024\nprint()\n')
+                (tmpdir_path / f'file{i}.js').write_text('console.log()\n')
+            
+            config = Config(header_file=str(header_file))
+            config._repo_root = tmpdir_path
+            config._header_content = 'Copyright 2024\n'
+            config.include_extensions = ['.py', '.js']
+            config.exclude_paths = []
+            
+            result = check_headers(config)
+            
+            assert len(result.compliant_files) == 5
+            assert len(result.non_compliant_files) == 5
+            assert sorted(calls) == ['.js', '.py']
+    
+    @pytest.mark.parametrize('parallel', ['process', 'thread'])
+    def test_parallel_matches_scan_order(self, parallel, monkeypatch):
+        """Test that pooled checks report files in deterministic scan order."""
+        import license_header.utils as utils_module
+        monkeypatch.setattr(utils_module, 'PARALLEL_MIN_FILES', 2)
+        monkeypatch.setattr(utils_module.os, 'cpu_count', lambda: 2)
+        
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmpdir_path = Path(tmpdir)
+            
+            header = '# Copyright 2024\n'
+            header_file = tmpdir_path / 'HEADER.txt'
+            header_file.write_text(header)
+            
+            for i in range(6):
+                body = f'print({i})\n'
+                (tmpdir_path / f'file{i}.py').write_text(body if i % 2 else header + body)
+            (tmpdir_path / 'bad.py').write_bytes(b'\xe9\n')
+            
+            config = Config(header_file=str(header_file), parallel=parallel)
+            config._repo_root = tmpdir_path
+            config._header_content = header
+            config.include_extensions = ['.py']
+            config.exclude_paths = []
+            
+            result = check_headers(config)
+            
+            assert [f.name for f in result.compliant_files] == ['file0.py', 'file2.py', 'file4.py']
+            assert [f.name for f in result.non_compliant_files] == ['file1.py', 'file3.py', 'file5.py']
+            assert [f.name for f in result.failed_files] == ['bad.py']
 
 
 class TestCheckMultiLanguage:
@@ -46,6 +46,68 @@ class TestCLI:
         assert 'apply' in result.output
         assert 'check' in result.output
     
+    def test_import_defers_command_modules(self):
+        """Test that importing the CLI does not load the command modules."""
+        import subprocess
+        import sys
+        
+        code = (
+            "import sys, license_header.cli; "
+            "print(sorted(m for m in sys.modules "
+            "if m.startswith(('license_header.', 'multiprocessing'))))"
+        )
+        output = subprocess.run(
+            [sys.executable, '-c', code], capture_output=True, text=True, check=True
+        ).stdout
+        assert output.strip() == "['license_header.cli', 'license_header.config']"
+    
+    def test_logging_configured_only_for_commands(self, tmp_path):
+        """Test that importing the CLI or asking for help sets up no log handlers."""
+        import subprocess
+        import sys
+        
+        code = (
+            "import logging, sys; from license_header.cli import main; "
+            "main(sys.argv[1:], standalone_mode=False); "
+            "print(len(logging.getLogger().handlers), file=sys.stderr)"
+        )
+        
+        def handler_count(*args):
+            completed = subprocess.run(
+                [sys.executable, '-c', code, *args],
+                capture_output=True, text=True, check=True, cwd=tmp_path
+            )
+            return completed.stderr.strip().splitlines()[-1]
+        
+        assert handler_count('--help') == '0'
+        assert handler_count('check', '--help') == '0'
+        
+        (tmp_path / 'LICENSE_HEADER').write_text('Copyright\n')
+        assert handler_count('check', '--dry-run') == '1'
+    
+    def test_python_version_checked_once(self, monkeypatch):
+        """Test that commands no longer re-check the Python version."""
+        import license_header.cli as cli_module
+        
+        calls = []
+        monkeypatch.setattr(cli_module, 'check_python_version', lambda: calls.append(1))
+        
+        result = self.runner.invoke(main, ['check', '--help'])
+        assert result.exit_code == 0
+        assert calls == []
+    
+    def test_unsupported_python_version_exits(self, monkeypatch):
+        """Test that an old interpreter is rejected with an error."""
+        import sys
+        from license_header.cli import check_python_version
+        
+        from collections import namedtuple
+        
+        VersionInfo = namedtuple('VersionInfo', 'major minor micro')
+        monkeypatch.setattr(sys, 'version_info', VersionInfo(3, 10, 0))
+        with pytest.raises(SystemExit):
+            check_python_version()
+    
     def test_apply_help(self):
         """Test apply --help."""
         result = self.runner.invoke(main, ['apply', '--help'])
@@ -352,6 +414,99 @@ class TestUpgradeCommand:
             assert '# New Copyright 2025' in content
             assert '# Old Copyright 2024' not in content
     
+    @pytest.mark.parametrize('parallel', ['process', 'thread'])
+    def test_upgrade_parallel(self, parallel, monkeypatch):
+        """Test that pooled upgrades match the serial results."""
+        import license_header.utils as utils_module
+        monkeypatch.setattr(utils_module, 'PARALLEL_MIN_FILES', 2)
+        monkeypatch.setattr(utils_module.os, 'cpu_count', lambda: 2)
+        
+        with self.runner.isolated_filesystem():
+            Path('OLD_HEADER.txt').write_text('# Old Copyright 2024\n')
+            Path('NEW_HEADER.txt').write_text('New Copyright 2025\n')
+            for i in range(4):
+                Path(f'file{i}.py').write_text(f'# Old Copyright 2024\nprint({i})\n')
+            Path('plain.py').write_text('print()\n')
+            
+            result = self.runner.invoke(main, [
+                'upgrade',
+                '--from-header', 'OLD_HEADER.txt',
+                '--to-header', 'NEW_HEADER.txt',
+                '--parallel', parallel
+            ])
+            assert result.exit_code == 0
+            assert 'Upgraded: 4' in result.output
+            assert 'No source header: 1' in result.output
+            assert Path('file2.py').read_text() == '# New Copyright 2025\nprint(2)\n'
+    
+    def test_upgrade_wraps_header_once_per_extension(self, monkeypatch):
+        """Test that the target header is wrapped per extension, not per file."""
+        import license_header.apply as apply_module
+        calls = []
+        original = apply_module.prepare_header_for_file
+        
+        def counting_prepare(**kwargs):
+            calls.append(kwargs['file_path'].suffix)
+            return original(**kwargs)
+        monkeypatch.setattr(apply_module, 'prepare_header_for_file', counting_prepare)
+        
+        with self.runner.isolated_filesystem():
+            Path('OLD_HEADER.txt').write_text('Old Copyright 2024\n')
+            Path('NEW_HEADER.txt').write_text('New Copyright 2025\n')
+            for i in range(3):
+                Path(f'file{i}.py').write_text('# Old Copyright 2024\nprint()\n')
+                Path(f'file{i}.js').write_text('// Old Copyright 2024\nconsole.log()\n')
+            
+            result = self.runner.invoke(main, [
+                'upgrade',
+                '--from-header', 'OLD_HEADER.txt',
+                '--to-header', 'NEW_HEADER.txt'
+            ])
+            assert result.exit_code == 0
+            assert 'Upgraded: 6' in result.output
+            assert sorted(calls) == ['.js', '.py']
+            assert Path('file1.js').read_text() == '// New Copyright 2025\nconsole.log()\n'
+    
+    def test_upgrade_lists_paths_relative_to_repo_root(self):
+        """Test that upgraded files are listed relative to the repository root."""
+        with self.runner.isolated_filesystem():
+            Path('.git').mkdir()
+            Path('OLD_HEADER.txt').write_text('Old Copyright 2024\n')
+            Path('NEW_HEADER.txt').write_text('New Copyright 2025\n')
+            Path('src').mkdir()
+            Path('src/module.py').write_text('# Old Copyright 2024\nprint()\n')
+            
+            result = self.runner.invoke(main, [
+                'upgrade',
+                '--from-header', 'OLD_HEADER.txt',
+                '--to-header', 'NEW_HEADER.txt',
+                '--dry-run'
+            ])
+            assert result.exit_code == 0
+            assert f"  - {os.path.join('src', 'module.py')}\n" in result.output
+    
+    def test_upgrade_verbose_lists_every_file(self):
+        """Test that --verbose lists all upgraded files instead of a preview."""
+        with self.runner.isolated_filesystem():
+            Path('.git').mkdir()
+            Path('OLD_HEADER.txt').write_text('Old Copyright 2024\n')
+            Path('NEW_HEADER.txt').write_text('New Copyright 2025\n')
+            for i in range(25):
+                Path(f'module_{i:02d}.py').write_text('# Old Copyright 2024\nprint()\n')
+            
+            args = ['upgrade', '--from-header', 'OLD_HEADER.txt', '--to-header', 'NEW_HEADER.txt', '--dry-run']
+            
+            result = self.runner.invoke(main, args)
+            assert result.exit_code == 0
+            assert 'Files processed' in result.output
+            assert '  - module_24.py' not in result.output
+            assert '  ... and 5 more' in result.output
+            
+            result = self.runner.invoke(main, args + ['--verbose'])
+            assert result.exit_code == 0
+            assert '  - module_24.py' in result.output
+            assert '... and' not in result.output
+    
     def test_upgrade_already_target(self):
         """Test upgrade command skips files that already have target header."""
         with self.runner.isolated_filesystem():
@@ -670,6 +825,21 @@ class TestCheckCommandExtended:
             assert result.exit_code == 1
             assert 'Non-compliant: 1' in result.output
     
+    def test_check_lists_each_missing_file(self):
+        """Test that the missing-header listing has one line per file."""
+        with self.runner.isolated_filesystem():
+            Path('HEADER.txt').write_text('# Copyright 2025\n')
+            for name in ('a.py', 'b.py', 'c.py'):
+                Path(name).write_text('print("no header")\n')
+            
+            result = self.runner.invoke(main, ['check', '--header', 'HEADER.txt'])
+            assert result.exit_code == 1
+            listing = result.output.split('Files missing license headers (3):\n', 1)[1]
+            lines = listing.splitlines()[:4]
+            assert [line.rsplit(os.sep, 1)[-1] for line in lines[:3]] == ['a.py', 'b.py', 'c.py']
+            assert all(line.startswith('  - ') for line in lines[:3])
+            assert lines[3] == ''
+    
     def test_check_succeeds_on_compliant_files(self):
         """Test that check succeeds when all files have headers."""
         with self.runner.isolated_filesystem():
@@ -732,6 +902,20 @@ class TestApplyCommandExtended:
             assert '// Copyright 2025' in Path('test.js').read_text()
             assert '// Copyright 2025' in Path('test.rs').read_text()
     
+    def test_apply_previews_first_ten_modified_files(self):
+        """Test that apply lists ten modified files and counts the rest."""
+        with self.runner.isolated_filesystem():
+            Path('HEADER.txt').write_text('Copyright 2025\n')
+            for i in range(12):
+                Path(f'file{i:02d}.py').write_text('code\n')
+            
+            result = self.runner.invoke(main, ['apply', '--header', 'HEADER.txt'])
+            assert result.exit_code == 0
+            listing = result.output.split('Modified 12 file(s):\n', 1)[1].splitlines()
+            assert all(line.startswith('  - ') for line in listing[:10])
+            assert listing[9].endswith('file09.py')
+            assert listing[10] == '  ... and 2 more'
+    
     def test_apply_dry_run_shows_would_modify(self):
         """Test apply dry-run shows files that would be modified."""
         with self.runner.isolated_filesystem():
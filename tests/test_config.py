@@ -16,18 +16,21 @@ Tests for configuration module.
 """
 
 import json
+import logging
 import pytest
 from pathlib import Path
 from click import ClickException
 
 from license_header.config import (
     Config,
+    clear_caches,
     find_repo_root,
     load_config_file,
     validate_path_in_repo,
     load_header_content,
     merge_config,
     get_header_content,
+    validate_extensions,
 )
 
 
@@ -42,6 +45,33 @@ class TestConfig:
         assert 'node_modules' in config.exclude_paths
         assert config.dry_run is False
         assert config.mode == 'apply'
+    
+    def test_default_lists_not_shared(self):
+        """Test that each Config gets its own copy of the default lists."""
+        first = Config(header_file="test.txt")
+        first.include_extensions.append('.go')
+        assert '.go' not in Config(header_file="test.txt").include_extensions
+    
+    def test_config_uses_slots(self):
+        """Test that Config has no per-instance dict and rejects unknown attributes."""
+        config = Config(header_file="test.txt")
+        assert not hasattr(config, '__dict__')
+        with pytest.raises(AttributeError):
+            config.dryrun = True
+    
+    def test_import_defers_click_and_json(self):
+        """Test that importing the config module loads neither click nor json."""
+        import subprocess
+        import sys
+        
+        code = (
+            "import sys, license_header.config; "
+            "print('click' in sys.modules, 'json' in sys.modules)"
+        )
+        output = subprocess.run(
+            [sys.executable, '-c', code], capture_output=True, text=True, check=True
+        ).stdout
+        assert output.strip() == "False False"
         
 
 class TestFindRepoRoot:
@@ -61,6 +91,26 @@ class TestFindRepoRoot:
         """Test finding repo root when no .git exists."""
         root = find_repo_root(tmp_path)
         assert root == tmp_path
+    
+    def test_find_repo_root_cached_until_cleared(self, tmp_path):
+        """Test that results are cached per start path until clear_caches()."""
+        subdir = tmp_path / "subdir"
+        subdir.mkdir()
+        assert find_repo_root(subdir) == subdir
+        
+        (tmp_path / ".git").mkdir()
+        assert find_repo_root(subdir) == subdir
+        
+        clear_caches()
+        assert find_repo_root(subdir) == tmp_path
+    
+    def test_find_repo_root_git_file(self, tmp_path):
+        """Test that a .git file, as used by worktrees, marks the root."""
+        (tmp_path / ".git").write_text("gitdir: /elsewhere\n")
+        subdir = tmp_path / "a" / "b"
+        subdir.mkdir(parents=True)
+        
+        assert find_repo_root(subdir) == tmp_path
 
 
 class TestLoadConfigFile:
@@ -87,6 +137,20 @@ class TestLoadConfigFile:
             load_config_file(config_file)
         assert "not found" in str(exc_info.value)
     
+    def test_load_missing_config_ok(self, tmp_path):
+        """Test that a missing file returns None when missing_ok is set."""
+        assert load_config_file(tmp_path / "nonexistent.json", missing_ok=True) is None
+    
+    def test_default_config_file_picked_up(self, tmp_path):
+        """Test that merge_config reads license-header.config.json from the repo root."""
+        (tmp_path / "HEADER.txt").write_text("# Header\n")
+        (tmp_path / "license-header.config.json").write_text(
+            json.dumps({"header_file": "HEADER.txt", "exclude_paths": ["gen"]})
+        )
+        
+        config = merge_config({}, repo_root=tmp_path)
+        assert config.exclude_paths == ["gen"]
+    
     def test_load_invalid_json(self, tmp_path):
         """Test loading an invalid JSON config file."""
         config_file = tmp_path / "invalid.json"
@@ -95,6 +159,22 @@ class TestLoadConfigFile:
         with pytest.raises(ClickException) as exc_info:
             load_config_file(config_file)
         assert "Invalid JSON" in str(exc_info.value)
+    
+    def test_load_config_with_utf8_bom(self, tmp_path):
+        """Test that a config saved with a UTF-8 BOM (e.g. by Notepad) loads."""
+        config_file = tmp_path / "config.json"
+        config_file.write_bytes(b'\xef\xbb\xbf{"header_file": "H\xc3\x89ADER.txt"}')
+        
+        assert load_config_file(config_file) == {"header_file": "H\u00c9ADER.txt"}
+    
+    def test_load_invalid_utf8_config(self, tmp_path):
+        """Test that undecodable bytes are reported as a read error."""
+        config_file = tmp_path / "config.json"
+        config_file.write_bytes(b'{"header_file": "\xff"}')
+        
+        with pytest.raises(ClickException) as exc_info:
+            load_config_file(config_file)
+        assert "Error reading configuration file" in str(exc_info.value)
 
 
 class TestValidatePathInRepo:
@@ -115,6 +195,26 @@ class TestValidatePathInRepo:
         with pytest.raises(ClickException) as exc_info:
             validate_path_in_repo(outside_path, tmp_path, "Test path")
         assert "traverses above repository root" in str(exc_info.value)
+    
+    def test_dotdot_escaping_repo(self, tmp_path):
+        """Test that '..' components are resolved before the check."""
+        repo = tmp_path / "repo"
+        repo.mkdir()
+        
+        with pytest.raises(ClickException):
+            validate_path_in_repo(repo / ".." / "repo-other" / "x", repo, "Test path")
+        validate_path_in_repo(repo / "a" / ".." / "b", repo, "Test path")
+    
+    def test_symlink_escaping_repo(self, tmp_path):
+        """Test that a symlink inside the repo pointing outside is rejected."""
+        repo = tmp_path / "repo"
+        repo.mkdir()
+        outside = tmp_path / "outside"
+        outside.mkdir()
+        (repo / "link").symlink_to(outside)
+        
+        with pytest.raises(ClickException):
+            validate_path_in_repo(repo / "link" / "HEADER.txt", repo, "Test path")
 
 
 class TestLoadHeaderContent:
@@ -170,6 +270,73 @@ class TestLoadHeaderContent:
         
         result = load_header_content(str(header_file), tmp_path)
         assert result == header_content
+    
+    def test_load_header_directory(self, tmp_path):
+        """Test that a directory is rejected as a header file."""
+        (tmp_path / "HEADER").mkdir()
+        
+        with pytest.raises(ClickException) as exc_info:
+            load_header_content("HEADER", tmp_path)
+        assert "Header path is not a file" in str(exc_info.value)
+    
+    def test_load_header_crlf_normalized(self, tmp_path):
+        """Test that CRLF line endings in the header file become LF."""
+        (tmp_path / "HEADER.txt").write_bytes(b"# Copyright 2025\r\n# Acme\r\n")
+        
+        assert load_header_content("HEADER.txt", tmp_path) == "# Copyright 2025\n# Acme\n"
+    
+    def test_symlinked_header_inside_repo_allowed(self, tmp_path):
+        """Test that a header symlink resolving inside the repo is accepted."""
+        (tmp_path / "shared").mkdir()
+        (tmp_path / "shared" / "HEADER.txt").write_text("# Shared\n")
+        (tmp_path / "HEADER.txt").symlink_to(tmp_path / "shared" / "HEADER.txt")
+        
+        assert load_header_content("HEADER.txt", tmp_path) == "# Shared\n"
+    
+    def test_symlinked_header_escaping_repo_rejected(self, tmp_path):
+        """Test that a relative header path symlinked outside the repo is rejected."""
+        repo = tmp_path / "repo"
+        repo.mkdir()
+        (tmp_path / "outside.txt").write_text("# Outside\n")
+        (repo / "HEADER.txt").symlink_to(tmp_path / "outside.txt")
+        
+        with pytest.raises(ClickException) as exc_info:
+            load_header_content("HEADER.txt", repo)
+        assert "traverses above repository root" in str(exc_info.value)
+    
+    def test_load_header_cached_until_changed(self, tmp_path):
+        """Test that an unchanged header is not re-read and a changed one is."""
+        from license_header.config import _read_header_cached
+        
+        header_file = tmp_path / "HEADER.txt"
+        header_file.write_text("# Copyright 2025\n")
+        clear_caches()
+        
+        assert load_header_content("HEADER.txt", tmp_path) == "# Copyright 2025\n"
+        assert load_header_content("HEADER.txt", tmp_path) == "# Copyright 2025\n"
+        assert _read_header_cached.cache_info().hits == 1
+        
+        header_file.write_text("# Copyright 2025 Acme\n")
+        assert load_header_content("HEADER.txt", tmp_path) == "# Copyright 2025 Acme\n"
+
+
+class TestValidateExtensions:
+    """Test validate_extensions function."""
+    
+    def test_bad_extensions_reported_in_one_warning(self, caplog):
+        """Test that all extensions without a leading '.' share one warning."""
+        with caplog.at_level(logging.WARNING, logger='license_header.config'):
+            validate_extensions(['.py', 'js', 'ts'])
+        
+        messages = [r.getMessage() for r in caplog.records]
+        assert len(messages) == 1
+        assert "'js'" in messages[0] and "'ts'" in messages[0]
+    
+    def test_valid_extensions_no_warning(self, caplog):
+        """Test that well-formed extensions log nothing."""
+        with caplog.at_level(logging.WARNING, logger='license_header.config'):
+            validate_extensions(['.py', '.js'])
+        assert caplog.records == []
 
 
 class TestMergeConfig:
@@ -191,6 +358,54 @@ class TestMergeConfig:
         assert config.header_file == str(header_file)
         assert config.dry_run is True
     
+    def test_merge_defaults_match_config_fields(self, tmp_path):
+        """Test that merge_config defaults are the Config field defaults."""
+        from dataclasses import fields
+        
+        (tmp_path / "HEADER.txt").write_text("# Header\n")
+        first = merge_config({'header': 'HEADER.txt'}, repo_root=tmp_path)
+        second = merge_config({'header': 'HEADER.txt'}, repo_root=tmp_path)
+        expected = Config(header_file='HEADER.txt')
+        
+        for f in fields(Config):
+            if f.init:
+                assert getattr(first, f.name) == getattr(expected, f.name), f.name
+        assert first.include_extensions is not second.include_extensions
+        assert first.language_comment_overrides is not second.language_comment_overrides
+    
+    def test_unset_cli_flags_keep_config_file_values(self, tmp_path):
+        """Test that empty multi-value options and unset flags do not override the file."""
+        (tmp_path / "HEADER.txt").write_text("# Header\n")
+        config_file = tmp_path / "config.json"
+        config_file.write_text(json.dumps({
+            "header_file": "HEADER.txt",
+            "include_extensions": [".go"],
+            "wrap_comments": False,
+        }))
+        cli_args = {'include_extension': (), 'exclude_path': (), 'no_wrap_comments': False}
+        
+        config = merge_config(cli_args, config_file_path=str(config_file), repo_root=tmp_path)
+        
+        assert config.include_extensions == ['.go']
+        assert config.wrap_comments is False
+    
+    def test_cli_names_mapped_to_config_keys(self, tmp_path):
+        """Test that CLI option names are mapped onto their config keys."""
+        (tmp_path / "HEADER.txt").write_text("# Header\n")
+        cli_args = {
+            'header': 'HEADER.txt',
+            'include_extension': ('.rs',),
+            'exclude_path': ('gen',),
+            'no_wrap_comments': True,
+        }
+        
+        config = merge_config(cli_args, repo_root=tmp_path)
+        
+        assert config.header_file == 'HEADER.txt'
+        assert config.include_extensions == ['.rs']
+        assert config.exclude_paths == ['gen']
+        assert config.wrap_comments is False
+    
     def test_merge_with_config_file(self, tmp_path):
         """Test merging config with config file."""
         # Create header file
@@ -213,6 +428,30 @@ class TestMergeConfig:
         assert config.include_extensions == [".py"]
         assert config.exclude_paths == ["dist"]
     
+    def test_merge_defaults_are_fresh_copies(self, tmp_path):
+        """Test that configs built from defaults never share mutable values."""
+        (tmp_path / "HEADER.txt").write_text("# Header\n")
+        
+        first = merge_config({'header': 'HEADER.txt'}, repo_root=tmp_path)
+        first.include_extensions.append('.go')
+        first.exclude_paths.clear()
+        first.language_comment_overrides['.go'] = 'slash'
+        
+        second = merge_config({'header': 'HEADER.txt'}, repo_root=tmp_path)
+        assert '.go' not in second.include_extensions
+        assert 'node_modules' in second.exclude_paths
+        assert second.language_comment_overrides == {}
+    
+    def test_merge_ignores_unknown_config_file_keys(self, tmp_path):
+        """Test that a config file cannot set CLI-only keys such as mode."""
+        (tmp_path / "HEADER.txt").write_text("# Header\n")
+        config_file = tmp_path / "config.json"
+        config_file.write_text(json.dumps({"header_file": "HEADER.txt", "mode": "check", "dry_run": True}))
+        
+        config = merge_config({}, config_file_path=str(config_file), repo_root=tmp_path)
+        assert config.mode == 'apply'
+        assert config.dry_run is False
+    
     def test_merge_cli_overrides_config_file(self, tmp_path):
         """Test that CLI args override config file settings."""
         # Create header files
@@ -485,6 +724,60 @@ class TestLanguageCommentOverrides:
         
         config = merge_config({}, config_file_path=str(config_file), repo_root=tmp_path)
         assert config.language_comment_overrides == {}
+        assert config.parallel == "process"
+    
+    def test_parallel_mode_from_config_file(self, tmp_path):
+        """Test that the parallel mode is read from the config file."""
+        header_file = tmp_path / "HEADER.txt"
+        header_file.write_text("Copyright 2025\n")
+        config_file = tmp_path / "config.json"
+        config_file.write_text(json.dumps({'header_file': 'HEADER.txt', 'parallel': 'thread'}))
+        
+        config = merge_config({}, config_file_path=str(config_file), repo_root=tmp_path)
+        assert config.parallel == "thread"
+        
+        config = merge_config({'parallel': 'none'}, config_file_path=str(config_file), repo_root=tmp_path)
+        assert config.parallel == "none"
+    
+    def test_cache_from_config_file(self, tmp_path):
+        """Test that the check cache flag is read from the config file."""
+        header_file = tmp_path / "HEADER.txt"
+        header_file.write_text("Copyright 2025\n")
+        config_file = tmp_path / "config.json"
+        config_file.write_text(json.dumps({'header_file': 'HEADER.txt', 'cache': True}))
+        
+        config = merge_config({}, config_file_path=str(config_file), repo_root=tmp_path)
+        assert config.cache is True
+        
+        config = merge_config({'cache': False}, config_file_path=str(config_file), repo_root=tmp_path)
+        assert config.cache is False
+    
+    def test_invalid_parallel_mode_falls_back(self, tmp_path):
+        """Test that an unknown parallel mode falls back to 'process'."""
+        header_file = tmp_path / "HEADER.txt"
+        header_file.write_text("Copyright 2025\n")
+        
+        config = merge_config({'header': str(header_file), 'parallel': 'gpu'}, repo_root=tmp_path)
+        assert config.parallel == "process"
+    
+    def test_non_string_setting_values_handled(self, tmp_path):
+        """Test that non-string JSON values for string settings are handled cleanly."""
+        (tmp_path / "HEADER.txt").write_text("Copyright 2025\n")
+        config_file = tmp_path / "config.json"
+        config_file.write_text(json.dumps({
+            'header_file': 'HEADER.txt',
+            'parallel': ['thread'],
+            'fallback_comment_style': {'style': 'slash'},
+        }))
+        
+        config = merge_config({}, config_file_path=str(config_file), repo_root=tmp_path)
+        assert config.parallel == "process"
+        assert config.fallback_comment_style == "hash"
+        
+        config_file.write_text(json.dumps({'header_file': 'HEADER.txt', 'header_version': ['v2']}))
+        with pytest.raises(ClickException) as exc_info:
+            merge_config({}, config_file_path=str(config_file), repo_root=tmp_path)
+        assert "Invalid header_version" in str(exc_info.value)
     
     def test_invalid_extension_format_rejected(self, tmp_path):
         """Test that extensions without leading dot are rejected."""
@@ -524,6 +817,19 @@ class TestLanguageCommentOverrides:
         assert "invalid_style" in str(exc_info.value)
         assert "Valid styles" in str(exc_info.value)
     
+    def test_non_string_comment_style_rejected(self, tmp_path):
+        """Test that a non-string comment style is rejected cleanly."""
+        (tmp_path / "HEADER.txt").write_text("# Header\n")
+        config_file = tmp_path / "config.json"
+        config_file.write_text(json.dumps({
+            "header_file": "HEADER.txt",
+            "language_comment_overrides": {".py": ["hash"]}
+        }))
+        
+        with pytest.raises(ClickException) as exc_info:
+            merge_config({}, config_file_path=str(config_file), repo_root=tmp_path)
+        assert "Valid styles" in str(exc_info.value)
+    
     def test_invalid_type_for_language_overrides_rejected(self, tmp_path):
         """Test that non-dictionary type for language_comment_overrides is rejected."""
         header_file = tmp_path / "HEADER.txt"
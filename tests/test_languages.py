@@ -15,6 +15,7 @@
 Tests for multi-language comment wrapping functionality.
 """
 
+import logging
 import pytest
 from pathlib import Path
 
@@ -33,6 +34,7 @@ from license_header.languages import (
     wrap_header_with_comments,
     unwrap_header_comments,
     is_header_already_wrapped,
+    detect_header_comment_style,
 )
 from license_header.apply import prepare_header_for_file
 
@@ -40,6 +42,13 @@ from license_header.apply import prepare_header_for_file
 class TestCommentStyle:
     """Test CommentStyle dataclass."""
     
+    def test_comment_style_frozen_and_hashable(self):
+        """Test that equal styles hash alike and cannot be modified."""
+        assert hash(CommentStyle(line_prefix='# ')) == hash(PYTHON_STYLE)
+        assert {PYTHON_STYLE: 1}[CommentStyle(line_prefix='# ')] == 1
+        with pytest.raises(AttributeError):
+            PYTHON_STYLE.line_prefix = '// '
+    
     def test_line_comments_support(self):
         """Test detection of line comment support."""
         style = CommentStyle(line_prefix='# ')
@@ -136,6 +145,19 @@ class TestExtensionMapping:
         assert '.c' in ext_map
         assert ext_map['.c'] == 'c'
     
+    def test_build_extension_map_collisions(self, caplog):
+        """Test that only an extension claimed by two languages warns; the last wins."""
+        languages = {
+            'first': LanguageInfo('First', ('.x', '.X'), PYTHON_STYLE),
+            'second': LanguageInfo('Second', ('.x',), PYTHON_STYLE),
+        }
+        with caplog.at_level(logging.WARNING, logger='license_header.languages'):
+            ext_map = build_extension_map(languages)
+        
+        assert ext_map == {'.x': 'second'}
+        assert len(caplog.records) == 1
+        assert "'first' and 'second'" in caplog.records[0].getMessage()
+    
     def test_get_language_for_extension(self):
         """Test getting language info for extension."""
         lang = get_language_for_extension('.py')
@@ -159,11 +181,34 @@ class TestExtensionMapping:
         lang1 = get_language_for_extension('.py')
         lang2 = get_language_for_extension('py')
         assert lang1 == lang2
+    
+    def test_default_lookup_matches_two_stage_lookup(self):
+        """Test that the default fast path agrees with the explicit tables."""
+        for ext in list(DEFAULT_EXTENSION_MAP) + ['.unknown', 'RS']:
+            assert get_language_for_extension(ext) is get_language_for_extension(
+                ext, DEFAULT_EXTENSION_MAP, DEFAULT_LANGUAGES
+            )
+    
+    def test_custom_map_changes_seen(self):
+        """Test that lookups in a caller's map reflect later changes to it."""
+        ext_map = {}
+        assert get_language_for_extension('.PYX', ext_map) is None
+        
+        ext_map['.pyx'] = 'python'
+        assert get_language_for_extension('.PYX', ext_map).name == 'Python'
 
 
 class TestGetCommentStyle:
     """Test getting comment style for extensions."""
     
+    def test_default_lookup_matches_two_stage_lookup(self):
+        """Test that the default fast path agrees with the explicit tables."""
+        for ext in list(DEFAULT_EXTENSION_MAP) + ['.unknown', 'RS']:
+            assert get_comment_style_for_extension(ext) is get_comment_style_for_extension(
+                ext, DEFAULT_EXTENSION_MAP, DEFAULT_LANGUAGES
+            )
+        assert get_comment_style_for_extension('.unknown', fallback_style=None) is None
+    
     def test_python_comment_style(self):
         """Test Python comment style."""
         style = get_comment_style_for_extension('.py')
@@ -206,6 +251,36 @@ class TestIsHeaderAlreadyWrapped:
         """Test detection of star prefix (inside block comment)."""
         assert is_header_already_wrapped(' * Copyright 2025\n')
     
+    def test_other_marker_prefixes_detected(self):
+        """Test detection of the less common comment prefixes."""
+        assert is_header_already_wrapped('<!-- Copyright 2025 -->\n<!-- MIT -->\n')
+        assert is_header_already_wrapped('; Copyright 2025\n; MIT\n')
+        assert is_header_already_wrapped('-- Copyright 2025\n-- MIT\n')
+        assert not is_header_already_wrapped('-- Copyright 2025\n# MIT\n')
+    
+    def test_result_shared_across_styles(self):
+        """Test that wrapping one header for several styles scans it once."""
+        header = "Copyright 2025 Shared Scan\n"
+        is_header_already_wrapped.cache_clear()
+        
+        wrap_header_with_comments(header, PYTHON_STYLE)
+        wrap_header_with_comments(header, C_STYLE)
+        wrap_header_with_comments(header, C_STYLE, use_block_comments=True)
+        
+        info = is_header_already_wrapped.cache_info()
+        assert info.misses == 1
+        assert info.hits == 2
+    
+    def test_mixed_single_char_prefixes_not_detected(self):
+        """Test that lines mixing '#' and ';' prefixes are not treated as wrapped."""
+        assert not is_header_already_wrapped('# Copyright 2025\n; MIT\n')
+        assert not is_header_already_wrapped('; Copyright 2025\n\n# MIT\n')
+    
+    def test_star_block_does_not_accept_opener(self):
+        """Test that a '*' continuation header does not accept a later '/*' line."""
+        assert not is_header_already_wrapped(' * Copyright 2025\n/* MIT */\n')
+        assert is_header_already_wrapped('/* Copyright 2025\n * MIT\n */\n')
+    
     def test_raw_text_not_detected(self):
         """Test that raw text is not detected as wrapped."""
         assert not is_header_already_wrapped('Copyright 2025\n')
@@ -243,6 +318,16 @@ class TestIsHeaderAlreadyWrapped:
 class TestWrapHeaderWithComments:
     """Test header wrapping functionality."""
     
+    def test_wrap_memoized_per_equal_style(self):
+        """Test that wrapping with an equal style reuses the cached result."""
+        header = "Copyright 2025 Memo\n"
+        first = wrap_header_with_comments(header, C_STYLE)
+        second = wrap_header_with_comments(header, CommentStyle(
+            line_prefix='// ', block_start='/*', block_end=' */', block_line_prefix=' * '
+        ))
+        assert first == "// Copyright 2025 Memo\n"
+        assert second is first
+    
     def test_wrap_with_hash_comments(self):
         """Test wrapping with Python-style hash comments."""
         header = "Copyright 2025\nLicensed under MIT\n"
@@ -307,6 +392,37 @@ class TestUnwrapHeaderComments:
         wrapped = "// Copyright 2025\n// Licensed under MIT\n"
         result = unwrap_header_comments(wrapped, C_STYLE)
         assert result == "Copyright 2025\nLicensed under MIT\n"
+    
+    def test_unwrap_block_comments(self):
+        """Test unwrapping block comments, including lines missing the prefix space."""
+        wrapped = "/*\n * Copyright 2025\n *\n   *Licensed under MIT\n */\n"
+        result = unwrap_header_comments(wrapped, C_STYLE)
+        assert result == "Copyright 2025\n\nLicensed under MIT\n"
+    
+    def test_unwrap_empty_line_comment(self):
+        """Test that a bare line prefix unwraps to an empty line."""
+        wrapped = "# Copyright 2025\n#\n# MIT\n"
+        assert unwrap_header_comments(wrapped, PYTHON_STYLE) == "Copyright 2025\n\nMIT\n"
+
+
+class TestDetectHeaderCommentStyle:
+    """Test detection of the comment style of an existing header."""
+    
+    def test_default_styles_detected(self):
+        """Test detection with the built-in styles."""
+        assert detect_header_comment_style("\n  # Copyright\nimport os\n") is PYTHON_STYLE
+        assert detect_header_comment_style("/*\n * Copyright\n */\n") is C_STYLE
+        assert detect_header_comment_style("//Copyright\n") is C_STYLE
+        assert detect_header_comment_style("/// Copyright\n") is C_STYLE
+        assert detect_header_comment_style("Copyright\n# later\n") is None
+        assert detect_header_comment_style("   \n") is None
+    
+    def test_known_styles_order_respected(self):
+        """Test that the first matching style in known_styles wins."""
+        assert detect_header_comment_style("// x\n", [RUST_STYLE, C_STYLE]) is RUST_STYLE
+        html = CommentStyle(block_start='<!--', block_end='-->')
+        assert detect_header_comment_style("<!-- x -->\n", [PYTHON_STYLE, html]) is html
+        assert detect_header_comment_style("# x\n", [CommentStyle()]) is None
 
 
 class TestPrepareHeaderForFile:
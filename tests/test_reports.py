@@ -52,6 +52,13 @@ class TestFormatFileList:
         files = [Path(f'/tmp/file{i}.py') for i in range(10)]
         result = _format_file_list(files, limit=5)
         assert len(result) == 5
+    
+    def test_format_outside_and_relative_root(self):
+        """Test that paths outside the root are kept and relative roots work."""
+        repo_root = Path('/tmp/project')
+        files = [Path('/tmp/project/a.py'), Path('/tmp/other/b.py'), Path('/tmp/project-x/c.py')]
+        assert _format_file_list(files, repo_root) == ['a.py', '/tmp/other/b.py', '/tmp/project-x/c.py']
+        assert _format_file_list([Path('src/a.py')], Path('.')) == ['src/a.py']
 
 
 class TestGenerateJsonReport:
@@ -132,6 +139,30 @@ class TestGenerateJsonReport:
             assert output_path.parent.exists()
             assert output_path.exists()
 
+    
+    def test_output_same_without_orjson(self, tmp_path, monkeypatch):
+        """Test that the report is byte-identical with the json module fallback."""
+        import license_header.reports as reports_module
+        from datetime import datetime as real_datetime
+        
+        class FixedDatetime(real_datetime):
+            @classmethod
+            def now(cls, tz=None):
+                return real_datetime(2025, 1, 1, tzinfo=tz)
+        monkeypatch.setattr(reports_module, 'datetime', FixedDatetime)
+        
+        result = CheckResult()
+        result.compliant_files = [tmp_path / 'a.py', tmp_path / 'ünïcode.py']
+        result.non_compliant_files = [tmp_path / 'b "quoted".py']
+        
+        generate_json_report(result, tmp_path / 'fast.json', 'check', tmp_path)
+        monkeypatch.setattr(reports_module, 'orjson', None)
+        generate_json_report(result, tmp_path / 'plain.json', 'check', tmp_path)
+        
+        plain = (tmp_path / 'plain.json').read_bytes()
+        assert (tmp_path / 'fast.json').read_bytes() == plain
+        assert json.loads(plain)['files']['compliant'] == ['a.py', 'ünïcode.py']
+
 
 class TestGenerateMarkdownReport:
     """Test generate_markdown_report function."""
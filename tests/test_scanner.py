@@ -40,6 +40,7 @@ class TestScanResult:
         assert result.skipped_symlink == []
         assert result.skipped_permission == []
         assert result.skipped_extension == []
+        assert result.file_sizes == {}
     
     def test_total_files(self):
         """Test total_files calculation."""
@@ -50,6 +51,21 @@ class TestScanResult:
         result.skipped_binary = [Path('c.bin')]
         result.skipped_extension = [Path('d.txt')]
         assert result.total_files() == 4
+    
+    def test_skipped_files(self):
+        """Test that skipped files are combined in category order."""
+        result = ScanResult()
+        assert result.skipped_files() == []
+        
+        result.eligible_files = [Path('a.py')]
+        result.skipped_binary = [Path('c.bin')]
+        result.skipped_excluded = [Path('build/x.py')]
+        result.skipped_symlink = [Path('link.py')]
+        result.skipped_permission = [Path('locked.py')]
+        result.skipped_extension = [Path('d.txt')]
+        assert result.skipped_files() == [
+            Path('c.bin'), Path('build/x.py'), Path('link.py'), Path('locked.py'), Path('d.txt')
+        ]
 
 
 class TestIsBinaryFile:
@@ -200,6 +216,32 @@ class TestMatchesExcludePattern:
         # No match
         normal_py = tmp_path / "src" / "main.py"
         assert not matches_exclude_pattern(normal_py, tmp_path, patterns)
+    
+    def test_glob_components_do_not_cross_separators(self, tmp_path):
+        """Test that wildcards and character classes match single components."""
+        patterns = ["gen[0-9]", "src/*.py", "**/cache"]
+        
+        assert matches_exclude_pattern(tmp_path / "gen1" / "a.py", tmp_path, patterns)
+        assert matches_exclude_pattern(tmp_path / "lib" / "src" / "a.py", tmp_path, patterns)
+        assert matches_exclude_pattern(tmp_path / "cache" / "a.py", tmp_path, patterns)
+        assert not matches_exclude_pattern(tmp_path / "genX" / "a.py", tmp_path, patterns)
+        assert not matches_exclude_pattern(tmp_path / "src" / "sub" / "a.py", tmp_path, patterns)
+    
+    def test_empty_pattern_matches_nothing(self, tmp_path):
+        """Test that an empty exclude pattern is ignored."""
+        assert not matches_exclude_pattern(tmp_path / "src" / "main.py", tmp_path, [""])
+    
+    def test_compiled_patterns_are_reused(self, tmp_path):
+        """Test that the same exclude patterns share one compiled matcher."""
+        from license_header.scanner import _compile_exclude_patterns
+        
+        _compile_exclude_patterns.cache_clear()
+        for name in ("a.py", "b.py", "c.py"):
+            matches_exclude_pattern(tmp_path / "src" / name, tmp_path, ["build", "*.pyc"])
+        
+        info = _compile_exclude_patterns.cache_info()
+        assert info.misses == 1
+        assert info.hits == 2
 
 
 
@@ -619,6 +661,119 @@ class TestScanRepository:
         # Should find the file
         assert len(result.eligible_files) == 1
         assert 'file.py' in str(result.eligible_files[0])
+    
+    def test_excludes_matched_without_resolving_each_path(self, tmp_path, monkeypatch):
+        """Test that the walk matches excludes on relative paths it builds itself."""
+        import license_header.scanner as scanner_module
+        
+        def fail_match(path, repo_root, exclude_patterns):
+            raise AssertionError('per-path resolve not expected')
+        monkeypatch.setattr(scanner_module, 'matches_exclude_pattern', fail_match)
+        
+        (tmp_path / "src" / "gen").mkdir(parents=True)
+        (tmp_path / "src" / "main.py").write_text("x = 1\n")
+        (tmp_path / "src" / "gen" / "out.py").write_text("x = 1\n")
+        (tmp_path / "src" / "skip.py").write_text("x = 1\n")
+        
+        result = scan_repository(
+            root_path=tmp_path / "src",
+            include_extensions=['.py'],
+            exclude_patterns=['**/gen', 'src/skip.py'],
+            repo_root=tmp_path,
+        )
+        
+        assert result.eligible_files == [tmp_path / "src" / "main.py"]
+        assert result.skipped_excluded == [tmp_path / "src" / "skip.py"]
+    
+    def test_root_outside_repo_scans_nothing(self, tmp_path):
+        """Test that a scan root outside the repository root yields no files."""
+        (tmp_path / "repo").mkdir()
+        (tmp_path / "other").mkdir()
+        (tmp_path / "other" / "main.py").write_text("x = 1\n")
+        
+        result = scan_repository(
+            root_path=tmp_path / "other",
+            include_extensions=['.py'],
+            exclude_patterns=[],
+            repo_root=tmp_path / "repo",
+        )
+        
+        assert result.total_files() == 0
+    
+    def test_iter_eligible_files_streams_in_sorted_order(self, tmp_path):
+        """Test that the walk yields eligible files sorted and records skips."""
+        from license_header.scanner import iter_eligible_files
+        
+        (tmp_path / "a").mkdir()
+        (tmp_path / "a" / "z.py").write_text("x = 1\n")
+        (tmp_path / "a" / "b").mkdir()
+        (tmp_path / "a" / "b" / "c.py").write_text("x = 1\n")
+        (tmp_path / "a.py").write_text("x = 1\n")
+        (tmp_path / "notes.txt").write_text("text\n")
+        
+        result = ScanResult()
+        files = iter_eligible_files(tmp_path, ['.py'], [], tmp_path, result)
+        
+        # Nothing is recorded until the walk is driven
+        assert result.eligible_files == []
+        first = next(files)
+        assert first == tmp_path / "a" / "b" / "c.py"
+        assert result.eligible_files == [first]
+        
+        rest = list(files)
+        assert [first] + rest == sorted([first] + rest)
+        assert rest == [tmp_path / "a" / "z.py", tmp_path / "a.py"]
+        assert result.skipped_extension == [tmp_path / "notes.txt"]
+    
+    def test_extension_taken_from_name_like_path_suffix(self, tmp_path):
+        """Test that dotfiles and trailing dots follow Path.suffix rules."""
+        (tmp_path / ".py").write_text("x = 1\n")
+        (tmp_path / "trailing.").write_text("x = 1\n")
+        (tmp_path / "UPPER.PY").write_text("x = 1\n")
+        (tmp_path / "types.d.ts").write_text("x = 1\n")
+        
+        result = scan_repository(
+            root_path=tmp_path,
+            include_extensions=['.py', '.ts'],
+            exclude_patterns=[],
+            repo_root=tmp_path,
+        )
+        
+        assert result.eligible_files == [tmp_path / "UPPER.PY", tmp_path / "types.d.ts"]
+        assert result.skipped_extension == [tmp_path / ".py", tmp_path / "trailing."]
+    
+    def test_file_sizes_recorded(self, tmp_path):
+        """Test that the scan records the size of each eligible file."""
+        (tmp_path / "empty.py").write_text("")
+        (tmp_path / "small.py").write_text("x = 1\n")
+        (tmp_path / "notes.txt").write_text("skip me\n")
+        
+        result = scan_repository(
+            root_path=tmp_path,
+            include_extensions=['.py'],
+            exclude_patterns=[],
+            repo_root=tmp_path,
+        )
+        
+        assert result.file_sizes == {
+            tmp_path / "empty.py": 0,
+            tmp_path / "small.py": 6,
+        }
+    
+    def test_file_modes_recorded(self, tmp_path):
+        """Test that the scan records the st_mode of each eligible file."""
+        script = tmp_path / "script.py"
+        script.write_text("x = 1\n")
+        script.chmod(0o750)
+        
+        result = scan_repository(
+            root_path=tmp_path,
+            include_extensions=['.py'],
+            exclude_patterns=[],
+            repo_root=tmp_path,
+        )
+        
+        assert result.file_modes == {script: script.stat().st_mode}
 
 
 class TestAllSupportedLanguages: